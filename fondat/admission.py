@@ -0,0 +1,195 @@
+"""
+Module to control admission of concurrent work.
+
+An admission controller limits the number of operations that are performed concurrently.
+Operations that cannot be performed immediately wait in a bounded queue, in order of priority;
+operations that cannot be queued, or that wait in the queue too long, are rejected quickly
+rather than allowing latency to increase for all callers.
+"""
+
+import asyncio
+import contextlib
+import fondat.error
+import fondat.monitoring as monitoring
+import heapq
+import itertools
+import logging
+import time
+
+from collections.abc import Callable, Mapping
+from typing import Any
+
+
+_logger = logging.getLogger(__name__)
+
+
+def operation_name(operation: Any) -> str:
+    """Return the name of a bound resource operation, used to identify it for admission."""
+    res = operation.__self__.__class__
+    return f"{res.__module__}.{res.__qualname__}.{operation.__name__}"
+
+
+def op_type_priority(request: Any, operation: Any) -> int:
+    """Return a priority that admits query operations ahead of mutation operations."""
+    return 0 if operation._fondat_operation.op_type == "query" else 1
+
+
+def header_priority(header: str, priorities: Mapping[str, int], default: int = 0) -> Callable:
+    """
+    Return a function that determines priority from the value of a request header.
+
+    Parameters:
+    • header: name of request header containing priority class
+    • priorities: mapping of header values to priorities
+    • default: priority if header is absent or its value is not mapped
+    """
+
+    def priority(request: Any, operation: Any) -> int:
+        return priorities.get(request.headers.get(header), default)
+
+    return priority
+
+
+class AdmissionController:
+    """
+    Limits the number of concurrent operations, queueing operations that cannot be performed
+    immediately and shedding operations that cannot be queued.
+
+    Parameters and attributes:
+    • limit: maximum number of concurrent operations  [unlimited]
+    • limits: mapping of operation names to maximum number of concurrent calls
+    • queue: maximum number of operations to wait for admission
+    • timeout: maximum number of seconds to wait in queue  [unlimited]
+    • priority: function that returns the priority of a request to an operation
+    • status: HTTP status of error to raise when shedding an operation
+    • retry_after: number of seconds a client should wait before retrying a shed operation
+
+    Operation names are expressed as module, class and operation name, separated by periods
+    (e.g. "app.resources.UserResource.get").
+
+    The priority function is called with request and operation arguments, and returns an
+    integer; lower values are admitted first. The default priority function admits query
+    operations ahead of mutation operations.
+
+    Queue depth and wait time are recorded as "admission_queue_depth" and
+    "admission_wait_seconds" gauge measurements.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = None,
+        limits: Mapping[str, int] = None,
+        queue: int = 0,
+        timeout: float = None,
+        priority: Callable = op_type_priority,
+        status: int = 503,
+        retry_after: int = 1,
+    ):
+        self.limit = limit
+        self.limits = dict(limits or {})
+        self.queue = queue
+        self.timeout = timeout
+        self.priority = priority
+        self.status = status
+        self.retry_after = retry_after
+        self._active = 0
+        self._operations = {}  # operation name → active count
+        self._waiters = []  # heap of [priority, sequence, future, name]
+        self._queued = 0
+        self._sequence = itertools.count()
+
+    @property
+    def active(self) -> int:
+        """Number of operations currently admitted."""
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """Number of operations currently waiting for admission."""
+        return self._queued
+
+    def _can_run(self, name):
+        if self.limit is not None and self._active >= self.limit:
+            return False
+        limit = self.limits.get(name)
+        return limit is None or self._operations.get(name, 0) < limit
+
+    def _acquire(self, name):
+        self._active += 1
+        self._operations[name] = self._operations.get(name, 0) + 1
+
+    def _release(self, name):
+        self._active -= 1
+        if (count := self._operations[name] - 1) == 0:
+            del self._operations[name]
+        else:
+            self._operations[name] = count
+        self._wake()
+
+    def _wake(self):
+        blocked = []
+        while self._waiters and (self.limit is None or self._active < self.limit):
+            entry = heapq.heappop(self._waiters)
+            _, _, future, name = entry
+            if future.done():  # abandoned
+                continue
+            if not self._can_run(name):
+                blocked.append(entry)
+                continue
+            self._acquire(name)
+            self._queued -= 1
+            future.set_result(None)
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+    def _shed(self, reason):
+        error = fondat.error.get_error_for_status(self.status)(reason)
+        error.headers = {"Retry-After": str(self.retry_after)}
+        return error
+
+    async def _gauge(self, name, value):
+        try:
+            await monitoring.add({"name": name}, "gauge", value)
+        except:
+            _logger.warning("Exception recording measurement", exc_info=True)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, request: Any, operation: Any):
+        """
+        Return an asynchronous context manager that admits a request to an operation upon
+        entry, and releases its admission upon exit.
+
+        Parameters:
+        • request: HTTP request to be admitted
+        • operation: bound resource operation to be called
+        """
+        name = operation_name(operation)
+        if self._can_run(name):
+            self._acquire(name)
+        else:
+            if self._queued >= self.queue:
+                raise self._shed("admission queue is full")
+            future = asyncio.get_running_loop().create_future()
+            entry = [self.priority(request, operation), next(self._sequence), future, name]
+            heapq.heappush(self._waiters, entry)
+            self._queued += 1
+            await self._gauge("admission_queue_depth", self._queued)
+            begin = time.perf_counter()
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except BaseException as e:
+                if future.done() and not future.cancelled():  # admitted while abandoning
+                    self._release(name)
+                else:
+                    future.cancel()
+                    self._queued -= 1
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._shed("timed out waiting for admission")
+                raise
+            finally:
+                await self._gauge("admission_wait_seconds", time.perf_counter() - begin)
+        try:
+            yield
+        finally:
+            self._release(name)
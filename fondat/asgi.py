@@ -1,10 +1,12 @@
 """Module to expose resources through ASGI."""
 
+import asyncio
+import fondat.deadline
 import fondat.http
-import urllib.parse
 
 from collections.abc import Awaitable, Callable, Mapping
-from fondat.error import InternalServerError
+from fondat.error import InternalServerError, RequestTimeoutError
+from fondat.file import FileStream
 from fondat.types import Stream
 
 
@@ -19,13 +21,20 @@ def _int(s: str):
 
 
 class ReceiveStream(Stream):
-    """Stream that encapsulates the ASGI receive interface."""
+    """
+    Stream that encapsulates the ASGI receive interface.
+
+    If a deadline is in effect while waiting to receive the body, RequestTimeoutError is
+    raised when the deadline is reached.
+    """
 
     def __init__(self, scope: Mapping, receive: Awaitable):
+        super().__init__()
         for key, value in scope.get("headers"):
-            if key == "content-type":
-                self.content_type = value
-            elif key == "content-length":
+            key = key.lower()
+            if key == b"content-type":
+                self.content_type = value.decode()
+            elif key == b"content-length":
                 self.content_length = _int(value)
         self._receive = receive
         self._more = True
@@ -33,10 +42,14 @@ class ReceiveStream(Stream):
     async def __anext__(self) -> bytes:
         if not self._more:
             raise StopAsyncIteration
-        event = await self._receive()
+        timeout = fondat.deadline.remaining()
+        try:
+            event = await asyncio.wait_for(self._receive(), timeout)
+        except asyncio.TimeoutError:
+            raise RequestTimeoutError("timed out receiving request body")
         event_type = event["type"]
         if event_type == "http.disconnect":
-            raise RuntimeError  # TODO: better error type? CancelException?
+            raise asyncio.CancelledError  # client is gone; abandon work
         if event_type != "http.request":
             raise InternalServerError(
                 f"expecting http.request event type; received {event_type}"
@@ -46,7 +59,11 @@ class ReceiveStream(Stream):
 
 
 def asgi_app(
-    handler: Callable, startup: Callable = None, shutdown: Callable = None
+    handler: Callable,
+    startup: Callable = None,
+    shutdown: Callable = None,
+    *,
+    buffer_size: int = 65536,
 ) -> Callable:
     """
     Expose a Fondat HTTP request handler as an ASGI application.
@@ -55,14 +72,42 @@ def asgi_app(
     • handler: HTTP handler coroutine function
     • startup: lifespan startup coroutine function
     • shutdown: lifespan shutdown coroutine function
+    • buffer_size: maximum number of bytes to coalesce into a single response body message
 
     The HTTP handler coroutine function is called in response to ASGI HTTP protocol events.
 
     The startup and shutdown coroutine functions are called in response to ASGI lifespan
     protocol events. This allows the application to initialize and shutdown in the context of
     a running event loop.
+
+    If the client disconnects while a request is being handled, the work to handle the
+    request is cancelled.
+
+    Small chunks of a response body are coalesced into messages of up to the buffer size
+    before being sent; chunks that exceed the buffer size are sent without copying. The final
+    chunk of a response body is sent in the terminating message; a response body consisting
+    of a single chunk is sent in one message. Chunks of a stream that requires flushing are
+    each sent as soon as they are read.
+
+    If the server advertises the "http.response.zerocopysend" or "http.response.pathsend"
+    extension in the ASGI scope, a file stream response body is sent through the extension,
+    allowing the server to send file content without copying it through the application.
+    Otherwise, the file is read and sent in chunks.
     """
 
+    async def listen(receive, events, work):
+        """Relay request events to the request body; cancel work if client disconnects."""
+        more = True
+        while True:
+            event = await receive()
+            if event["type"] == "http.disconnect":
+                work.cancel()
+                return True
+            if not more:  # not expecting any more events; unconventional server
+                return False
+            more = event.get("more_body", False)
+            await events.put(event)
+
     async def lifespan(scope, receive, send):
         message = await receive()
         lifespan_type = message["type"]
@@ -81,55 +126,102 @@ def asgi_app(
         await send({"type": f"{lifespan_type}.complete"})
 
     async def http(scope, receive, send):
-        request = fondat.http.Request()
-        request.method = scope["method"]
-        request.path = scope["path"]
-        request.version = scope["http_version"]
-        for key, value in scope["headers"]:
-            request.headers.add(key.decode(), value.decode())
-        for header in request.headers.popall("cookie", ()):
-            request.cookies.load(header)
-        request.query = fondat.http.Query(
-            urllib.parse.parse_qsl((scope.get("query_string") or b"").decode())
+        events = asyncio.Queue(1)
+        work = asyncio.create_task(respond(scope, events.get, send))
+        listener = asyncio.create_task(listen(receive, events, work))
+        try:
+            await work
+        except asyncio.CancelledError:
+            if not (listener.done() and not listener.cancelled() and listener.result()):
+                raise  # cancellation not due to client disconnect
+        finally:
+            listener.cancel()
+
+    async def send_file(scope, send, stream):
+        """Send file stream through server extension, if supported."""
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            with stream.path.open("rb") as file:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": stream.offset,
+                        "count": stream.length,
+                        "more_body": False,
+                    }
+                )
+            return True
+        if "http.response.pathsend" in extensions:
+            path = stream.path.resolve()
+            if stream.offset == 0 and stream.length == path.stat().st_size:
+                await send({"type": "http.response.pathsend", "path": str(path)})
+                return True
+        return False
+
+    async def respond(scope, receive, send):
+        request = fondat.http.Request(
+            method=scope["method"],
+            path=scope["path"],
+            version=scope["http_version"],
+            raw_headers=scope["headers"],
+            raw_query=scope.get("query_string"),
+            body=ReceiveStream(scope, receive),
         )
-        request.body = ReceiveStream(scope, receive)
         response = await handler(request)
-        headers = ((k.lower().encode(), v.encode()) for k, v in response.headers.items())
-        headers = [*headers]
-        cookies = (
-            (
-                (k.lower().encode(), v.encode())
-                for k, v in (
-                    header.split(": ")
-                    for header in response.cookies.output(sep="\n").split("\n")
-                )
+        headers = [(k.lower().encode(), v.encode()) for k, v in response.headers.items()]
+        if response._cookies:
+            headers.extend(
+                (b"set-cookie", morsel.OutputString().encode())
+                for morsel in response.cookies.values()
             )
-            if response.cookies
-            else ()
-        )
-        cookies = [*cookies]
         await send(
             {
                 "type": "http.response.start",
                 "status": response.status,
-                "headers": [*headers, *cookies],
-            }
-        )
-        if response.body is not None:
-            async for chunk in response.body:
-                await send(
-                    {
-                        "type": "http.response.body",
-                        "body": chunk,
-                        "more_body": True,
-                    }
-                )
-        await send(
-            {
-                "type": "http.response.body",
-                "more_body": False,
+                "headers": headers,
             }
         )
+        if isinstance(response.body, FileStream) and await send_file(
+            scope, send, response.body
+        ):
+            return
+        pending = b""
+        try:
+            if response.body is not None:
+                async for chunk in response.body:
+                    if not chunk:
+                        continue
+                    if response.body.flush:
+                        await send(
+                            {"type": "http.response.body", "body": chunk, "more_body": True}
+                        )
+                        continue
+                    if not pending:
+                        pending = chunk
+                    elif len(pending) + len(chunk) <= buffer_size:
+                        if not isinstance(pending, bytearray):
+                            pending = bytearray(pending)
+                        pending.extend(chunk)
+                    else:
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": bytes(pending),
+                                "more_body": True,
+                            }
+                        )
+                        pending = chunk
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": bytes(pending),
+                    "more_body": False,
+                }
+            )
+        finally:  # e.g. client disconnected; release resources of body
+            if (aclose := getattr(response.body, "aclose", None)) is not None:
+                await aclose()
 
     async def app(scope, receive, send):
         """Coroutine that implements ASGI interface."""
@@ -0,0 +1,169 @@
+"""
+Module to perform multiple resource operations in a single HTTP request.
+
+A batch resource accepts a JSON array of sub-requests, each expressing a method, path, query
+parameters, headers and body, and dispatches them through the routing of an HTTP application.
+It returns a JSON array of sub-responses, each expressing the status, headers and body of the
+corresponding sub-request.
+
+Example:
+
+root = container_resource({"users": users, "orders": orders})
+application = Application(root)
+root.batch = batch_resource(application)
+"""
+
+import asyncio
+import base64
+import fondat.context as context
+import json
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from fondat.codec import JSON, get_codec
+from fondat.error import BadRequestError
+from fondat.http import Application, InBody, Query, Request
+from fondat.resource import resource, operation
+from fondat.security import SecurityRequirement
+from fondat.types import BytesStream, Stream, affix_type_hints
+from typing import Annotated, Any, Optional
+
+
+@dataclass
+class BatchRequest:
+    """
+    A sub-request to be performed in a batch.
+
+    Attributes:
+    • method: the HTTP method name
+    • path: HTTP request target excluding query string
+    • query: query string parameters
+    • headers: request headers
+    • body: request body; a string is sent as text, any other value is sent as JSON
+    """
+
+    method: str
+    path: str
+    query: Optional[dict[str, str]] = None
+    headers: Optional[dict[str, str]] = None
+    body: Any = None
+
+
+@dataclass
+class BatchResponse:
+    """
+    The response to a sub-request performed in a batch.
+
+    Attributes:
+    • status: HTTP status code
+    • headers: response headers
+    • body: response body; JSON is decoded, text is a string, other content is base64-encoded
+    """
+
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)
+    body: Any = None
+
+
+_requests_codec = get_codec(JSON, list[BatchRequest])
+
+_responses_codec = get_codec(JSON, list[BatchResponse])
+
+
+def _request(batch_request: BatchRequest) -> Request:
+    request = Request(method=batch_request.method.upper(), path=batch_request.path)
+    for key, value in (batch_request.headers or {}).items():
+        request.headers[key] = value
+    request.query = Query(batch_request.query or {})
+    if batch_request.body is not None:
+        if isinstance(batch_request.body, str):
+            request.body = BytesStream(batch_request.body.encode(), "text/plain; charset=UTF-8")
+        else:
+            request.body = BytesStream(
+                json.dumps(batch_request.body).encode(), "application/json"
+            )
+        request.headers["Content-Type"] = request.body.content_type
+    return request
+
+
+async def _batch_response(response) -> BatchResponse:
+    result = BatchResponse(status=response.status, headers=dict(response.headers))
+    if response.body is not None:
+        content = bytearray()
+        async for chunk in response.body:
+            content.extend(chunk)
+        if content:
+            content_type = response.headers.get("Content-Type", "")
+            if content_type.startswith("application/json"):
+                result.body = json.loads(content)
+            elif content_type.startswith("text/"):
+                result.body = content.decode()
+            else:
+                result.body = base64.b64encode(content).decode()
+    return result
+
+
+def batch_resource(
+    application: Application,
+    *,
+    parallelism: int = 8,
+    size: int = 100,
+    security: Iterable[SecurityRequirement] = None,
+    publish: bool = True,
+):
+    """
+    Return a new resource that performs batches of sub-requests through an application.
+
+    Parameters:
+    • application: HTTP application to dispatch sub-requests through
+    • parallelism: maximum number of sub-requests to perform concurrently
+    • size: maximum number of sub-requests in a batch
+    • security: security requirements to apply to the batch operation
+    • publish: publish the operation in documentation
+
+    Sub-requests are independent of each other, and are performed concurrently; a batch
+    should not contain sub-requests that depend on the outcome of other sub-requests in the
+    same batch.
+
+    Each sub-request passes through application filters, including those of security
+    schemes that authenticate credentials in its own headers, and is admitted to its
+    resource operation through application admission control, as if it were requested
+    separately. Each sub-request is performed in the context established for the batch
+    request, with a "fondat.batch" context containing its index pushed onto the stack; the
+    security requirements of each sub-request operation are authorized separately. As the
+    batch request remains admitted while its sub-requests are performed, an application
+    with a concurrency limit should allow for sub-requests to be queued.
+    """
+
+    @resource
+    class BatchResource:
+        @operation(publish=publish, security=security)
+        async def post(self, body: Annotated[Stream, InBody]) -> Stream:
+            """Perform a batch of sub-requests."""
+            content = bytearray()
+            if body is not None:
+                async for chunk in body:
+                    content.extend(chunk)
+            try:
+                requests = _requests_codec.decode(json.loads(content))
+            except (TypeError, ValueError) as e:
+                raise BadRequestError(f"{e} in request body")
+            if len(requests) > size:
+                raise BadRequestError(f"maximum batch size: {size}")
+            semaphore = asyncio.Semaphore(parallelism)
+
+            async def perform(index, batch_request):
+                async with semaphore:
+                    with context.push({"context": "fondat.batch", "index": index}):
+                        response = await application.dispatch(_request(batch_request))
+                        return await _batch_response(response)
+
+            responses = await asyncio.gather(*(perform(i, r) for i, r in enumerate(requests)))
+            return BytesStream(
+                json.dumps(_responses_codec.encode(responses)).encode(), "application/json"
+            )
+
+    affix_type_hints(BatchResource, localns=locals())
+    BatchResource.__qualname__ = "BatchResource"
+
+    return BatchResource()
@@ -0,0 +1,333 @@
+"""
+Module to cache the results of resource operations.
+
+The cached decorator memoizes the results of a query operation. It is applied to the
+operation coroutine beneath the operation decorator, so that security requirements are
+authorized for each call, even when the result is cached:
+
+@resource
+class Item:
+    @operation
+    @cached(ttl=60)
+    async def get(self) -> Value:
+        ...
+
+A cached result is keyed by the operation, the identity of the resource instance, and the
+bound arguments of the call. The identity of a resource instance is its class, and the values
+of its attributes that are strings, numbers, booleans, UUIDs, dates, datetimes or resources.
+Resources that are created on access (e.g. items of a container resource) therefore share
+cached results. If a resource instance has any other attribute (e.g. a dict of backing data)
+or has no attributes, a unique token is stored in the instance (or, if it has no attribute
+dictionary, held in a weak registry) and included in its identity, so that its results are
+not shared with any other instance.
+
+When a mutation operation succeeds, cached results are invalidated for its resource, for the
+resources referenced in its attributes (e.g. its container), and for other resources that
+reference them (e.g. items in the same container).
+
+Results are stored encoded by the binary codec of the operation return type, in an
+in-process least-recently-used storage, or in a resource compatible with memory_resource.
+"""
+
+import asyncio
+import collections
+import dataclasses
+import fondat.context as context
+import fondat.monitoring as monitoring
+import functools
+import inspect
+import itertools
+import time
+import typing
+import weakref
+import wrapt
+
+from collections.abc import Callable, Iterable
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from fondat.codec import Binary, get_codec
+from fondat.error import NotFoundError
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+
+@dataclasses.dataclass
+class Entry:
+    """
+    A cached operation result.
+
+    Attributes:
+    • value: result encoded by the binary codec of the operation return type
+    • time: time the result was produced, in seconds since the epoch
+    • clock: invalidation clock value when the result began to be produced
+    """
+
+    value: bytes
+    time: float
+    clock: int
+
+
+class LRUStorage:
+    """
+    In-process storage of cached results, which evicts least-recently used entries.
+
+    Parameters:
+    • size: maximum number of entries to store  [unlimited]
+    • bytes: maximum number of bytes of encoded results to store  [unlimited]
+    """
+
+    def __init__(self, size: int = None, bytes: int = None):
+        self.size = size
+        self.bytes = bytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Entry]:
+        """Return the entry stored for a key, or None if no entry is stored."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def put(self, key: str, entry: Entry) -> None:
+        """Store an entry for a key."""
+        await self.delete(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.value)
+        while (self.size is not None and len(self._entries) > self.size) or (
+            self.bytes is not None and self._bytes > self.bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.value)
+
+    async def delete(self, key: str) -> None:
+        """Delete the entry stored for a key, if any."""
+        if (entry := self._entries.pop(key, None)) is not None:
+            self._bytes -= len(entry.value)
+
+
+class ResourceStorage:
+    """
+    Storage of cached results in a resource, such as one returned by
+    memory_resource(key_type=str, value_type=Entry).
+
+    Parameters:
+    • resource: resource whose items are addressed by key, with get, put and delete operations
+    """
+
+    def __init__(self, resource: Any):
+        self.resource = resource
+
+    async def get(self, key: str) -> Optional[Entry]:
+        try:
+            return await self.resource[key].get()
+        except NotFoundError:
+            return None
+
+    async def put(self, key: str, entry: Entry) -> None:
+        await self.resource[key].put(entry)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.resource[key].delete()
+        except NotFoundError:
+            pass
+
+
+# default storage for cached results
+storage = LRUStorage(size=10000)
+
+_clock = itertools.count(1)
+
+_mutations = collections.OrderedDict()  # scope → clock value of last mutation
+
+_mutations_size = 100000
+
+_floor = 0  # clock value of last mutation of scopes no longer tracked
+
+_simple_types = (str, int, float, bool, bytes, UUID, date, datetime, Decimal, Enum)
+
+
+_token = "_fondat_cache_token"
+
+_tokens = weakref.WeakKeyDictionary()  # instance without attributes → token
+
+_tasks = set()  # strong references to background refresh tasks
+
+_classes = set()  # names of resource classes whose scopes cached results depend on
+
+
+def _name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _is_resource(value: Any) -> bool:
+    return getattr(value, "_fondat_resource", None) is not None
+
+
+def _identity(instance: Any) -> Optional[tuple]:
+    attributes = getattr(instance, "__dict__", None)
+    if attributes is None:  # e.g. __slots__; token is held in weak registry
+        try:
+            if (token := _tokens.get(instance)) is None:
+                token = _tokens[instance] = uuid4().hex
+        except TypeError:  # not weakly referenceable; cannot be identified
+            return None
+        return (_name(type(instance)), ((_token, token),))
+    values = []
+    unique = True  # identity requires token until an attribute is found
+    for name, value in sorted(attributes.items()):
+        if name == _token:
+            continue
+        if isinstance(value, _simple_types):
+            values.append((name, value))
+        elif _is_resource(value) and (identity := _identity(value)) is not None:
+            values.append((name, identity))
+        else:
+            break  # attribute cannot be expressed in identity
+    else:
+        unique = not values
+    if unique:
+        if (token := attributes.get(_token)) is None:
+            token = attributes[_token] = uuid4().hex
+        values = [(_token, token)]
+    return (_name(type(instance)), tuple(values))
+
+
+def _references(instance: Any) -> list[Any]:
+    """Return the resources referenced in the attributes of a resource."""
+    return [v for v in getattr(instance, "__dict__", {}).values() if _is_resource(v)]
+
+
+def _scopes(resources: Iterable[Any]) -> list[tuple]:
+    """Return the invalidation scopes of resources, omitting those that cannot be identified."""
+    identities = (_identity(resource) for resource in resources)
+    return [identity for identity in identities if identity is not None]
+
+
+def invalidate(instance: Any) -> None:
+    """
+    Invalidate cached results for a resource that has been mutated, the resources it
+    references, and the resources that reference them.
+
+    Nothing is invalidated unless cached results depend on the class of the resource or of
+    a resource it references.
+    """
+    global _floor
+    if not _classes:
+        return
+    resources = (instance, *_references(instance))
+    if _classes.isdisjoint(_name(type(resource)) for resource in resources):
+        return
+    clock = next(_clock)
+    for scope in _scopes(resources):
+        _mutations[scope] = clock
+        _mutations.move_to_end(scope)
+    while len(_mutations) > _mutations_size:
+        _, evicted = _mutations.popitem(last=False)
+        _floor = max(_floor, evicted)
+
+
+def _mutated(scopes: list[tuple]) -> int:
+    return max(_mutations.get(scope, _floor) for scope in scopes)
+
+
+async def _record(tags: dict[str, str], result: str):
+    if monitoring.monitors:
+        await monitoring.add({**tags, "result": result}, "absolute", 1)
+
+
+def cached(
+    wrapped: Callable = None,
+    *,
+    ttl: float,
+    stale: float = 0,
+    storage: Any = None,
+    principal: str = None,
+):
+    """
+    Decorate a resource operation coroutine to cache its results.
+
+    Parameters:
+    • ttl: number of seconds that a cached result is fresh
+    • stale: number of seconds after expiry that a stale result can be returned
+    • storage: storage for cached results  [module storage]
+    • principal: context type of the security principal to include in cache key
+
+    If a stale result is returned, the result is refreshed in the background. If a principal
+    context type is specified, the last element of that type on the context stack is included
+    in the cache key, caching results separately for each principal.
+
+    Cache hits, stale hits and misses are recorded in monitors as "absolute" measurements
+    named "operation_cache", with a result tag of "hit", "stale" or "miss".
+    """
+
+    if wrapped is None:
+        return functools.partial(
+            cached, ttl=ttl, stale=stale, storage=storage, principal=principal
+        )
+
+    signature = inspect.signature(wrapped)
+    codec = None
+    refreshing = set()
+
+    def _codec():
+        nonlocal codec
+        if codec is None:
+            return_type = typing.get_type_hints(wrapped, include_extras=True).get("return")
+            codec = get_codec(Binary, return_type)
+        return codec
+
+    async def _produce(key, method, args, kwargs):
+        clock = next(_clock)
+        result = await method(*args, **kwargs)
+        entry = Entry(value=bytes(_codec().encode(result)), time=time.time(), clock=clock)
+        await (storage if storage is not None else globals()["storage"]).put(key, entry)
+        return result
+
+    async def _refresh(key, method, args, kwargs):
+        try:
+            await _produce(key, method, args, kwargs)
+        except Exception:
+            pass  # stale result remains until it expires
+        finally:
+            refreshing.discard(key)
+
+    @wrapt.decorator
+    async def wrapper(wrapped, instance, args, kwargs):
+        ident = _identity(instance)
+        if ident is None:  # results cannot be keyed
+            return await wrapped(*args, **kwargs)
+        scopes = [ident, *_scopes(_references(instance))]
+        _classes.update(scope[0] for scope in scopes)
+        bound = signature.bind(instance, *args, **kwargs)
+        bound.apply_defaults()
+        params = tuple(bound.arguments.items())[1:]  # exclude self
+        key_parts = [wrapped.__qualname__, ident, params]
+        if principal:
+            key_parts.append(context.last(context=principal))
+        key = repr(tuple(key_parts))
+        tags = {"name": "operation_cache", "resource": ident[0], "operation": wrapped.__name__}
+        store = storage if storage is not None else globals()["storage"]
+        entry = await store.get(key)
+        if entry is not None and entry.clock > _mutated(scopes):
+            age = time.time() - entry.time
+            if age <= ttl:
+                await _record(tags, "hit")
+                return _codec().decode(entry.value)
+            if age <= ttl + stale:
+                await _record(tags, "stale")
+                if key not in refreshing:
+                    refreshing.add(key)
+                    task = asyncio.create_task(_refresh(key, wrapped, args, kwargs))
+                    _tasks.add(task)
+                    task.add_done_callback(_tasks.discard)
+                return _codec().decode(entry.value)
+        await _record(tags, "miss")
+        return await _produce(key, wrapped, args, kwargs)
+
+    return wrapper(wrapped)
@@ -19,6 +19,79 @@ import uuid
 _stack = contextvars.ContextVar("_fondat_stack")
 
 
+class _RootValue(dict):
+    """
+    Value of the root element of a context stack. Its unique identifier "id" and timestamp
+    "time" are generated upon first access of the value's items.
+    """
+
+    __slots__ = ("_generated",)
+
+    def __init__(self):
+        super().__init__(context="fondat.root")
+        self._generated = False
+
+    def _generate(self):
+        if not self._generated:
+            self._generated = True
+            dict.update(
+                self,
+                id=uuid.uuid4(),
+                time=datetime.datetime.now(tz=datetime.timezone.utc),
+            )
+
+    def __getitem__(self, key):
+        if key != "context":
+            self._generate()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key != "context":
+            self._generate()
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        self._generate()
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._generate()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._generate()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self._generate()
+        return dict.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        self._generate()
+        return dict.__repr__(self)
+
+    def keys(self):
+        self._generate()
+        return dict.keys(self)
+
+    def values(self):
+        self._generate()
+        return dict.values(self)
+
+    def items(self):
+        self._generate()
+        return dict.items(self)
+
+    def copy(self):
+        self._generate()
+        return dict(self)
+
+    def __reduce__(self):
+        return dict, (self.copy(),)
+
+
 class _Element:
     """
     A context stack element.
@@ -31,17 +104,44 @@ class _Element:
     with its value, then the previously pushed element's value below it, and so on. In this
     manner, the element at the top of a stack represents the entire stack.
 
+    Each element indexes the stack by context value: the uppermost and lowermost elements of
+    each context, and the next element below it with the same context. The lowermost index is
+    shared with the element below unless a new context is pushed. The uppermost index holds
+    the elements below the element; it is shared with the element below if both have the same
+    context, and is otherwise copied, with the element below added. Its size is bounded by the
+    number of distinct contexts, not the depth of the stack.
+
     Parameters:
     • value: the value this stack element contains
     • prev: the element below this elemment on the stack, or None if this is the first element
     """
 
-    __slots__ = ("_value", "_prev", "_len")
+    __slots__ = ("_value", "_prev", "_len", "_context", "_below", "_first", "_prev_same")
 
     def __init__(self, value, prev=None):
         self._value = value
         self._prev = prev
-        self._len = prev._len + 1 if prev else 1
+        self._context = ctx = value.get("context")
+        if prev is None:
+            self._len = 1
+            self._prev_same = None
+            self._below = {}
+            self._first = {ctx: self}
+        else:
+            self._len = prev._len + 1
+            if prev._context == ctx:  # prev shadows nothing this element does not
+                self._prev_same = prev
+                self._below = prev._below
+            else:
+                self._prev_same = prev._below.get(ctx)
+                self._below = {**prev._below, prev._context: prev}
+            self._first = (
+                prev._first if self._prev_same is not None else {**prev._first, ctx: self}
+            )
+
+    def _last(self, ctx):
+        """Return the uppermost element with the specified context, or None if none."""
+        return self if self._context == ctx else self._below.get(ctx)
 
     def __iter__(self):
         class _iter:
@@ -114,17 +214,26 @@ def push(*args, **kwargs) -> StackContextManager:
         raise ValueError('pushed context must have a "context" item')
     stack = _stack.get(None)
     if not stack:
-        stack = _Element(
-            dict(
-                context="fondat.root",
-                id=uuid.uuid4(),
-                time=datetime.datetime.now(tz=datetime.timezone.utc),
-            )
-        )
+        stack = _Element(_RootValue())
     token = _stack.set(_Element(value, stack))
     return StackContextManager(token)
 
 
+def _find(stack, test):
+    if "context" in test:
+        element = stack._last(test["context"])
+        items = test.items() if len(test) > 1 else None
+        while element is not None:
+            if items is None or items <= element._value.items():
+                yield element._value
+            element = element._prev_same
+    else:
+        items = test.items()
+        for value in stack:
+            if items <= value.items():
+                yield value
+
+
 def find(*args, **kwargs):
     """
     Return a generator that yields elements on the context stack that match the specified keys
@@ -135,10 +244,16 @@ def find(*args, **kwargs):
     • find(mapping): match is expressed as a mapping object's key-value pairs
     • find(**kwargs): match is expressed with name-value pairs in keyword arguments
 
-    Supplying no parameters will yield all elements on the stack.
+    Supplying no parameters will yield all elements on the stack. If a "context" value is
+    supplied, only elements with that context are examined.
     """
-    test = dict(*args, **kwargs).items() or None
-    return (value for value in _stack.get(()) if not test or test <= value.items())
+    test = dict(*args, **kwargs)
+    stack = _stack.get(None)
+    if stack is None:
+        return iter(())
+    if not test:
+        return iter(stack)
+    return _find(stack, test)
 
 
 def first(*args, **kwargs):
@@ -150,8 +265,13 @@ def first(*args, **kwargs):
     • first(mapping): match is expressed as a mapping object's key-value pairs
     • first(**kwargs): match is expressed with name-value pairs in keyword arguments
     """
+    test = dict(*args, **kwargs)
+    if len(test) == 1 and "context" in test:
+        stack = _stack.get(None)
+        element = stack._first.get(test["context"]) if stack is not None else None
+        return element._value if element is not None else None
     result = None
-    for result in find(*args, **kwargs):
+    for result in find(test):
         pass
     return result
 
@@ -165,4 +285,4 @@ def last(*args, **kwargs):
     • last(mapping): match is expressed as a mapping object's key-value pairs
     • last(**kwargs): match is expressed with name-value pairs in keyword arguments
     """
-    return next(iter(find(*args, **kwargs)), None)
+    return next(find(*args, **kwargs), None)
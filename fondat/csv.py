@@ -102,7 +102,9 @@ class DataclassWriter:
         self._writer = csv.writer(fileobj, dialect)
         self._dataclass = dataclass
         self._encoders = {
-            name: encoders.get(name, get_codec(String, dataclass.__annotations__[name]).encode)
+            name: (encoders or {}).get(
+                name, get_codec(String, dataclass.__annotations__[name]).encode
+            )
             for name in dataclass.__annotations__
         }
 
@@ -0,0 +1,66 @@
+"""
+Module to manage deadlines for work performed in an execution context.
+
+A deadline is the time by which work must be complete, expressed as a value of the
+time.monotonic clock. Deadlines are stored on the execution context stack, so they propagate
+to all work performed on behalf of a request, including resource operations and database
+statements.
+"""
+
+import asyncio
+import fondat.context as context
+import time
+
+from collections.abc import Coroutine
+from fondat.error import GatewayTimeoutError
+from typing import Any, Optional
+
+
+def push(timeout: float) -> context.StackContextManager:
+    """
+    Push a deadline onto the execution context stack, and return a context manager that will
+    pop the deadline from the stack upon exit.
+
+    Parameters:
+    • timeout: number of seconds from now that work must be complete
+
+    If an earlier deadline is already in effect, it remains in effect.
+    """
+    deadline = time.monotonic() + timeout
+    if (current := get()) is not None and current < deadline:
+        deadline = current
+    return context.push({"context": "fondat.deadline", "deadline": deadline})
+
+
+def get() -> Optional[float]:
+    """Return the deadline in effect, or None if no deadline is in effect."""
+    ctx = context.last(context="fondat.deadline")
+    return ctx["deadline"] if ctx else None
+
+
+def remaining() -> Optional[float]:
+    """Return the number of seconds until the deadline, or None if no deadline is in effect."""
+    deadline = get()
+    return deadline - time.monotonic() if deadline is not None else None
+
+
+async def enforce(coroutine: Coroutine) -> Any:
+    """
+    Await a coroutine, cancelling it if the deadline in effect is reached.
+
+    If the deadline is reached, GatewayTimeoutError is raised. If no deadline is in effect, or
+    the deadline is already being enforced by an outer caller, the coroutine is simply
+    awaited.
+    """
+    ctx = context.last(context="fondat.deadline")
+    if ctx is None or ctx.get("enforced"):
+        return await coroutine
+    timeout = ctx["deadline"] - time.monotonic()
+    if timeout <= 0:
+        coroutine.close()
+        raise GatewayTimeoutError("deadline exceeded")
+    with context.push({**ctx, "enforced": True}):
+        try:
+            return await asyncio.wait_for(coroutine, timeout)
+        except asyncio.TimeoutError:
+            raise GatewayTimeoutError("deadline exceeded")
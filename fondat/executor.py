@@ -0,0 +1,143 @@
+"""
+Module to run blocking or CPU-bound work in thread and process pools.
+
+Work that blocks or consumes significant CPU time stalls all other work performed by the
+event loop. This module runs such work in an executor, awaiting its result without blocking
+the event loop.
+
+An executor is expressed as an Executor object, or as the name of a pool managed by this
+module: "thread" for a pool of threads, or "process" for a pool of processes. Named pools are
+created when first used; the thread_workers and process_workers module variables specify
+the maximum number of workers in each pool, or None to use the Python default.
+
+The context stack is propagated to the work performed. In a thread, work is performed in a
+copy of the calling context, including all context variables. In a process, arguments and
+results are pickled, and context stack values that can be pickled are pushed onto the stack
+of the process.
+
+For each unit of work, the time it waited in the executor queue and the time it took to run
+are recorded in monitors as "executor_wait_seconds" and "executor_run_seconds" gauge
+measurements, tagged with the executor name.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import fondat.context as context
+import fondat.monitoring as monitoring
+import functools
+import inspect
+import logging
+import pickle
+import time
+
+from collections.abc import Callable
+from typing import Any, Literal, Union
+
+
+_logger = logging.getLogger(__name__)
+
+
+# maximum number of worker threads in the "thread" pool; None uses the Python default
+thread_workers = None
+
+# maximum number of worker processes in the "process" pool; None uses the Python default
+process_workers = None
+
+_pools = {}
+
+
+def get(executor: Union[Literal["thread", "process"], concurrent.futures.Executor]):
+    """Return an executor, creating the named pool if it does not exist."""
+    if isinstance(executor, concurrent.futures.Executor):
+        return executor
+    if (pool := _pools.get(executor)) is None:
+        if executor == "thread":
+            pool = concurrent.futures.ThreadPoolExecutor(
+                thread_workers, thread_name_prefix="fondat"
+            )
+        elif executor == "process":
+            pool = concurrent.futures.ProcessPoolExecutor(process_workers)
+        else:
+            raise ValueError(f"unknown executor: {executor}")
+        _pools[executor] = pool
+    return pool
+
+
+@atexit.register
+def shutdown(wait: bool = True) -> None:
+    """Shut down named pools created by this module."""
+    while _pools:
+        _, pool = _pools.popitem()
+        pool.shutdown(wait=wait)
+
+
+def _name(executor: Any) -> str:
+    return executor if isinstance(executor, str) else executor.__class__.__name__
+
+
+def _call(function, args, kwargs):
+    start = time.time()
+    result = function(*args, **kwargs)
+    if inspect.iscoroutine(result):
+        result = asyncio.run(result)
+    return start, time.time(), result
+
+
+def _picklable(value: Any) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def _process_call(stack, function, args, kwargs):
+    element = None
+    for value in reversed(stack):
+        element = context._Element(value, element)
+    if element is not None:
+        context._stack.set(element)
+    return _call(function, args, kwargs)
+
+
+async def run(
+    executor: Union[Literal["thread", "process"], concurrent.futures.Executor],
+    function: Callable,
+    *args,
+    **kwargs,
+) -> Any:
+    """
+    Run a function in an executor, and return its result.
+
+    Parameters:
+    • executor: executor, or name of pool to run function in
+    • function: function or coroutine function to run
+    • args: positional arguments to pass to function
+    • kwargs: keyword arguments to pass to function
+
+    If the function returns a coroutine, it is run in a new event loop in the worker. To
+    run in a process, the function and its arguments must be picklable.
+    """
+    pool = get(executor)
+    loop = asyncio.get_running_loop()
+    submitted = time.time()
+    if isinstance(pool, concurrent.futures.ProcessPoolExecutor):
+        stack = [v for v in context.find() if _picklable(v)]
+        call = functools.partial(_process_call, stack, function, args, kwargs)
+    else:
+        call = functools.partial(contextvars.copy_context().run, _call, function, args, kwargs)
+    start, end, result = await loop.run_in_executor(pool, call)
+    if monitoring.monitors:
+        name = _name(executor)
+        try:
+            for measurement, value in (
+                ("wait", max(start - submitted, 0)),
+                ("run", end - start),
+            ):
+                tags = {"name": f"executor_{measurement}_seconds", "executor": name}
+                await monitoring.add(tags, "gauge", value)
+        except:
+            _logger.warning("Exception recording measurement", exc_info=True)
+    return result
@@ -11,7 +11,7 @@ from fondat.error import InternalServerError, NotFoundError
 from fondat.http import InBody
 from fondat.pagination import make_page_dataclass
 from fondat.resource import resource, operation
-from fondat.types import Stream, affix_type_hints
+from fondat.types import SeekableStream, Stream, affix_type_hints
 from fondat.security import SecurityRequirement
 from pathlib import Path
 from typing import Annotated, Any, Union
@@ -39,26 +39,53 @@ def _content_type(url: str) -> str:
     return "application/octet-stream"
 
 
-class _ReadFileStream(Stream):
-    def __init__(self, path: Path, block_size: int = 131072):
+class FileStream(SeekableStream):
+    """
+    Stream that reads a range of bytes from a file.
+
+    Parameters and attributes:
+    • path: path of file to read
+    • offset: position in file to begin reading
+    • length: number of bytes to read, or None to read to the end of the file
+    • block_size: maximum number of bytes to read in each block
+
+    A file stream exposes its path, offset and length, allowing a server to send its content
+    without reading it through the stream (e.g. via sendfile). Its entity tag is derived from
+    the modification time and size of the file.
+    """
+
+    def __init__(
+        self, path: Path, offset: int = 0, length: int = None, block_size: int = 131072
+    ):
+        stat = path.stat()
+        if length is None:
+            length = max(stat.st_size - offset, 0)
         super().__init__(
-            content_type=_content_type(path.name), content_length=path.stat().st_size
+            content_type=_content_type(path.name),
+            content_length=length,
+            etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
         )
         self.path = path
+        self.offset = offset
+        self.length = length
         self.block_size = block_size
         self.position = 0
 
     async def __anext__(self) -> bytes:
-        if not self.path:
+        size = min(self.block_size, self.length - self.position)
+        if size <= 0:
             raise StopAsyncIteration
         with self.path.open("rb") as file:
-            file.seek(self.position)
-            block = file.read1(self.block_size)
+            file.seek(self.offset + self.position)
+            block = file.read1(size)
         if len(block) == 0:
             raise StopAsyncIteration
         self.position += len(block)
         return block
 
+    def slice(self, offset: int, length: int) -> Stream:
+        return FileStream(self.path, self.offset + offset, length, self.block_size)
+
 
 def _tmp_path(path: Path):
     return path.with_name(f"{path.name}.__tmp__")
@@ -79,7 +106,7 @@ def _stream_resource_class(
             """Read resource."""
             if not self.path.is_file():
                 raise NotFoundError
-            return _ReadFileStream(self.path)
+            return FileStream(self.path)
 
         if writeable:
 
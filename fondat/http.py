@@ -1,7 +1,18 @@
 """Module to expose resources through HTTP."""
 
 import asyncio
+import base64
+import binascii
+import collections.abc
+import contextlib
+import dataclasses
+import fondat.deadline
 import fondat.error
+import fondat.executor
+import fondat.loader
+import fondat.monitoring
+import fondat.negotiation
+import fondat.projection
 import fondat.resource
 import fondat.security
 import http
@@ -10,18 +21,78 @@ import inspect
 import json
 import logging
 import multidict
+import re
+import secrets
 import typing
+import urllib.parse
 
 from collections.abc import Callable, Iterable, MutableSequence
-from fondat.codec import Binary, String, get_codec
-from fondat.types import Stream, BytesStream, is_optional, is_subclass
+from fondat.admission import AdmissionController
+from fondat.codec import Binary, JSON, String, get_codec
+from fondat.multipart import MultipartReader
+from fondat.types import Stream, BytesStream, SeekableStream, SpooledStream
+from fondat.types import async_iterator_type, is_optional, is_subclass
 from fondat.validation import validate
-from typing import Annotated, Any, Literal
+from typing import Annotated, Any, Literal, Optional
 
 
 _logger = logging.getLogger(__name__)
 
 
+# number of bytes above which bodies are decoded and encoded in the offload executor
+offload_size = 1048576
+
+# number of items or values above which a body is encoded in the offload executor
+offload_items = 10000
+
+# executor, or name of pool, to decode and encode large bodies in; see fondat.executor
+offload_executor = "thread"
+
+
+def _large(value: Any) -> bool:
+    """
+    Return True if value should be encoded in the offload executor. The encoded size of the
+    value is estimated by traversing strings, bytes, collections and dataclasses; traversal
+    stops once the value is found to be large, or offload_items nodes have been visited.
+    """
+    if offload_size is None and offload_items is None:
+        return False
+    budget = offload_items
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (str, bytes, bytearray)):
+            size += len(value)
+        elif isinstance(value, collections.abc.Mapping):
+            if budget is not None and len(value) * 2 >= budget:
+                return True
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+            stack.extend(getattr(value, field.name) for field in dataclasses.fields(value))
+        elif isinstance(value, collections.abc.Collection):
+            if budget is not None and len(value) >= budget:
+                return True
+            stack.extend(value)
+        else:
+            size += 8  # scalar
+        if offload_size is not None and size >= offload_size:
+            return True
+        if budget is not None:
+            budget -= 1
+            if budget <= 0:
+                return True
+    return False
+
+
+async def _offload(operation: str, function: Callable, value: Any) -> Any:
+    """Call function with value in the offload executor, timing its completion."""
+    tags = {"name": "http_offload_seconds", "operation": operation}
+    async with fondat.monitoring.timer(tags):
+        return await fondat.executor.run(offload_executor, function, value)
+
+
 Headers = multidict.CIMultiDict
 Cookies = http.cookies.SimpleCookie
 Query = multidict.MultiDict
@@ -35,8 +106,12 @@ class Message:
     • headers: multi-value dictionary to store headers; excludes cookies
     • cookies: dictionary containing message cookies
     • body: stream message body, or None if no body
+
+    Headers and cookies dictionaries are created upon first access.
     """
 
+    __slots__ = ("_headers", "_cookies", "body")
+
     def __init__(
         self,
         *,
@@ -45,10 +120,30 @@ class Message:
         body: Stream = None,
     ):
         super().__init__()
-        self.headers = headers or Headers()
-        self.cookies = cookies or Cookies()
+        self._headers = headers
+        self._cookies = cookies
         self.body = body
 
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            self._headers = Headers()
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: Headers):
+        self._headers = value
+
+    @property
+    def cookies(self) -> Cookies:
+        if self._cookies is None:
+            self._cookies = Cookies()
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value: Cookies):
+        self._cookies = value
+
 
 class Request(Message):
     """
@@ -62,8 +157,18 @@ class Request(Message):
     • path: HTTP request target excluding query string
     • version: version of the incoming HTTP request
     • query: multi-value dictionary to store query string parameters
+
+    Parameters:
+    • raw_headers: iterable of raw header name-value pairs, as expressed in ASGI scope
+    • raw_query: raw query string, as expressed in ASGI scope
+
+    If raw headers are supplied and headers or cookies are not, then headers and cookies are
+    parsed from raw headers upon first access. If a raw query string is supplied and query is
+    not, then query is parsed from the raw query string upon first access.
     """
 
+    __slots__ = ("method", "path", "version", "_query", "_raw_headers", "_raw_query", "_form")
+
     def __init__(
         self,
         *,
@@ -74,12 +179,55 @@ class Request(Message):
         path: str = "/",
         version: str = "1.1",
         query: Query = None,
+        raw_headers: Iterable[tuple[bytes, bytes]] = None,
+        raw_query: bytes = None,
     ):
         super().__init__(headers=headers, cookies=cookies, body=body)
         self.method = method
         self.path = path
         self.version = version
-        self.query = query or Query()
+        self._query = query
+        self._raw_headers = raw_headers
+        self._raw_query = raw_query
+        self._form = None
+
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            headers = Headers()
+            for key, value in self._raw_headers or ():
+                if key.lower() != b"cookie":
+                    headers.add(key.decode(), value.decode())
+            self._headers = headers
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: Headers):
+        self._headers = value
+
+    @property
+    def cookies(self) -> Cookies:
+        if self._cookies is None:
+            cookies = Cookies()
+            for key, value in self._raw_headers or ():
+                if key.lower() == b"cookie":
+                    cookies.load(value.decode())
+            self._cookies = cookies
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value: Cookies):
+        self._cookies = value
+
+    @property
+    def query(self) -> Query:
+        if self._query is None:
+            self._query = Query(urllib.parse.parse_qsl((self._raw_query or b"").decode()))
+        return self._query
+
+    @query.setter
+    def query(self, value: Query):
+        self._query = value
 
 
 class Response(Message):
@@ -93,6 +241,8 @@ class Response(Message):
     • status: HTTP status code
     """
 
+    __slots__ = ("status",)
+
     def __init__(
         self,
         *,
@@ -186,6 +336,12 @@ class HTTPSecurityScheme(fondat.security.SecurityScheme):
         return result
 
 
+async def _authenticate(scheme, *credentials):
+    if scheme.cache is None:
+        return await scheme.authenticate(*credentials)
+    return await scheme.cache.authenticate(scheme.authenticate, *credentials)
+
+
 class HTTPBasicSecurityScheme(HTTPSecurityScheme):
     """
     Base class for HTTP basic authentication security scheme. Subclass must implement the
@@ -195,11 +351,20 @@ class HTTPBasicSecurityScheme(HTTPSecurityScheme):
     • name: name of the security scheme
     • realm: realm to include in the challenge  [name]
     • description: a short description for the security scheme
+    • cache: cache for results of authenticating credentials
     """
 
-    def __init__(self, name: str, realm: str = None, **kwargs):
+    def __init__(
+        self,
+        name: str,
+        realm: str = None,
+        *,
+        cache: fondat.security.AuthenticationCache = None,
+        **kwargs,
+    ):
         super().__init__(name, "basic", **kwargs)
         self.realm = realm or name
+        self.cache = cache
 
     async def filter(self, request):
         """
@@ -208,20 +373,18 @@ class HTTPBasicSecurityScheme(HTTPSecurityScheme):
         authentication is successful, a context is added to the context stack.
         """
         auth = None
-        header = request.headers.get("Authorization")
-        if header and request.authorization[0].lower() == "basic":
+        scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "basic":
             try:
-                user_id, password = (
-                    base64.b64decode(request.authorization[1]).decode().split(":", 1)
-                )
-            except (binascii.Error, UnicodeDecodeError):
+                user_id, password = base64.b64decode(credentials).decode().split(":", 1)
+            except (binascii.Error, UnicodeDecodeError, ValueError):
                 pass
             else:
-                auth = await self.authenticate(user_id, password)
+                auth = await _authenticate(self, user_id, password)
         with fondat.context.push(auth) if auth else contextlib.nullcontext():
             yield
 
-    async def authenticate(user_id, password):
+    async def authenticate(self, user_id, password):
         """
         Perform authentication of credentials supplied in the HTTP request. If authentication
         is successful, a context is returned to be pushed on the context stack. If
@@ -241,12 +404,22 @@ class APIKeySecurityScheme(fondat.security.SecurityScheme):
     • key: name of API key to be used
     • location: location of API key
     • description: a short description for the security scheme
+    • cache: cache for results of authenticating API key values
     """
 
-    def __init__(self, name: str, key: str, location: Literal["header", "cookie"], **kwargs):
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        location: Literal["header", "cookie"],
+        *,
+        cache: fondat.security.AuthenticationCache = None,
+        **kwargs,
+    ):
         super().__init__(name, "apiKey", **kwargs)
         self.key = key
         self.location = location
+        self.cache = cache
 
     # TODO: move to OpenAPI
     @property
@@ -257,7 +430,7 @@ class APIKeySecurityScheme(fondat.security.SecurityScheme):
         result["in"] = self.location
         return result
 
-    async def authenticate(value):
+    async def authenticate(self, value):
         """
         Perform authentication of API key value supplied in the HTTP request. If
         authentication is successful, a context is returned to be pushed on the context stack.
@@ -288,7 +461,7 @@ class HeaderSecurityScheme(APIKeySecurityScheme):
         context stack.
         """
         header = request.headers.get(self.key)
-        auth = await self.authenticate(header) if header is not None else None
+        auth = await _authenticate(self, header) if header is not None else None
         with fondat.context.push(auth) if auth else contextlib.nullcontext():
             yield
 
@@ -317,7 +490,7 @@ class CookieSecurityScheme(APIKeySecurityScheme):
         context stack.
         """
         cookie = request.cookies.get(self.key)
-        auth = await self.authenticate(cookie) if cookie is not None else None
+        auth = await _authenticate(self, cookie.value) if cookie is not None else None
         with fondat.context.push(auth) if auth else contextlib.nullcontext():
             yield
 
@@ -336,7 +509,7 @@ async def _subordinate(resource, segment):
         hints = typing.get_type_hints(attr)
         if not fondat.resource.is_resource(hints.get("return")):
             raise fondat.error.NotFoundError
-        if is_coroutine_function(attr):
+        if asyncio.iscoroutinefunction(attr):
             return await attr()
         else:
             return attr()
@@ -400,12 +573,65 @@ class InCookie(_InString):
         super().__init__("cookies", name, "request cookie")
 
 
+class _LimitStream(Stream):
+    """Stream that raises RequestEntityTooLargeError if content exceeds a size limit."""
+
+    def __init__(self, stream: Stream, limit: int):
+        if stream.content_length is not None and stream.content_length > limit:
+            raise fondat.error.RequestEntityTooLargeError(f"maximum body size: {limit}")
+        super().__init__(stream.content_type, stream.content_length)
+        self._stream = stream
+        self._limit = limit
+        self._length = 0
+
+    async def __anext__(self) -> bytes:
+        chunk = await self._stream.__anext__()
+        self._length += len(chunk)
+        if self._length > self._limit:
+            raise fondat.error.RequestEntityTooLargeError(f"maximum body size: {self._limit}")
+        return chunk
+
+
+def _limit_body(request: Request, limit: Optional[int]) -> None:
+    if limit is not None and request.body is not None:
+        request.body = _LimitStream(request.body, limit)
+
+
 class _InBody(ParamIn):
-    """Annotation to indicate a parameter is provided in request body."""
+    """
+    Annotation to indicate a parameter is provided in request body.
+
+    Parameters:
+    • limit: maximum number of bytes in request body  [unlimited]
+    • spool: number of bytes above which a stream body is buffered in a temporary file
+
+    The annotation can be expressed as InBody, or called to express parameters, e.g.
+    InBody(limit=1048576). If the body exceeds the limit, RequestEntityTooLargeError is
+    raised; if the request expresses a content length, this is raised before the body is read.
+
+    If spool is specified, a stream parameter receives a stream with the entire request body
+    buffered in memory up to the spool size, and in a temporary file above it. Otherwise, a
+    stream parameter receives the request body stream as it is received.
+    """
+
+    def __init__(self, *, limit: int = None, spool: int = None):
+        super().__init__()
+        self.limit = limit
+        self.spool = spool
 
     async def get(self, hint, request):
+        _limit_body(request, self.limit)
         if is_subclass(hint, Stream):
-            return request.body
+            if self.spool is None or request.body is None:
+                return request.body
+            stream = SpooledStream(request.body.content_type, self.spool)
+            try:
+                async for b in request.body:
+                    stream.write(b)
+            except:
+                stream.close()
+                raise
+            return stream
         try:
             value = bytearray()
             if request.body is not None:
@@ -413,12 +639,18 @@ class _InBody(ParamIn):
                     value.extend(b)
             if len(value) == 0:  # empty body is no body
                 return None
-            return get_codec(Binary, hint).decode(value)
+            if hint is bytes:  # body is the value, whatever its content type
+                return bytes(value)
+            content_type = request.headers.get("Content-Type")
+            codec = fondat.negotiation.select_content_type(hint, content_type)
+            if offload_size is not None and len(value) >= offload_size:
+                return await _offload("decode", codec.decode, value)
+            return codec.decode(value)
         except (TypeError, ValueError) as e:
             raise fondat.error.BadRequestError(f"{e} in {self}")
 
-    def __call__(self):
-        return self
+    def __call__(self, *, limit: int = None, spool: int = None):
+        return _InBody(limit=limit, spool=spool)
 
     def __str__(self):
         return "request body"
@@ -427,6 +659,219 @@ class _InBody(ParamIn):
 InBody = _InBody()
 
 
+_max_ranges = 16
+
+_range_spec = re.compile(r"\s*(\d*)\s*-\s*(\d*)\s*")
+
+
+def _parse_ranges(header: str, length: int) -> Optional[list[tuple[int, int]]]:
+    """
+    Parse the value of a Range header into a list of (offset, length) tuples. Return None if
+    the header is malformed or not expressed in bytes. Raise RequestedRangeNotSatisfiableError
+    if no range is satisfiable.
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    specs = specs.split(",")
+    if len(specs) > _max_ranges:
+        return None
+    ranges = []
+    for spec in specs:
+        match = _range_spec.fullmatch(spec)
+        if not match or match.group(1) == match.group(2) == "":
+            return None
+        first, last = match.group(1), match.group(2)
+        if first == "":  # suffix range
+            suffix = int(last)
+            if suffix > 0 and length > 0:
+                ranges.append((max(length - suffix, 0), min(suffix, length)))
+            continue
+        first = int(first)
+        last = int(last) if last else length - 1
+        if match.group(2) and last < first:
+            return None
+        if first < length:
+            ranges.append((first, min(last, length - 1) - first + 1))
+    if not ranges:
+        error = fondat.error.RequestedRangeNotSatisfiableError
+        error = error(f"no satisfiable range in {header}")
+        error.headers = {"Content-Range": f"bytes */{length}"}
+        raise error
+    return ranges
+
+
+class _ByteRangesStream(Stream):
+    """Stream of multiple byte ranges of a seekable stream, as multipart/byteranges."""
+
+    def __init__(self, stream: SeekableStream, ranges: list[tuple[int, int]]):
+        boundary = secrets.token_hex(16)
+        super().__init__(f"multipart/byteranges; boundary={boundary}")
+        self._parts = []
+        for offset, length in ranges:
+            head = (
+                f"\r\n--{boundary}\r\n"
+                f"Content-Type: {stream.content_type}\r\n"
+                f"Content-Range: bytes {offset}-{offset + length - 1}"
+                f"/{stream.content_length}\r\n\r\n"
+            ).encode()
+            self._parts.append(head)
+            self._parts.append((offset, length))
+        self._parts.append(f"\r\n--{boundary}--\r\n".encode())
+        self.content_length = sum(len(p) if isinstance(p, bytes) else p[1] for p in self._parts)
+        self._stream = stream
+        self._iter = None
+
+    async def __anext__(self) -> bytes:
+        while True:
+            if self._iter is not None:
+                try:
+                    return await self._iter.__anext__()
+                except StopAsyncIteration:
+                    self._iter = None
+            if not self._parts:
+                raise StopAsyncIteration
+            part = self._parts.pop(0)
+            if isinstance(part, bytes):
+                return part
+            self._iter = self._stream.slice(*part)
+
+
+class _Form:
+    """Parts of a multipart/form-data request body, read as they are requested."""
+
+    def __init__(self, request: Request, spool: int):
+        content_type = request.headers.get("Content-Type") or request.body.content_type
+        self.reader = MultipartReader.from_content_type(request.body, content_type)
+        self.spool = spool
+        self.parts = {}
+        self.current = None
+
+    async def get(self, name: str):
+        if (part := self.parts.get(name)) is not None:
+            return part
+        if self.current is not None:
+            await self.current.spool(self.spool)  # may be requested or already provided
+        async for part in self.reader:
+            self.current = part
+            self.parts.setdefault(part.name, part)
+            if part.name == name:
+                return part
+            await part.spool(self.spool)
+        self.current = None
+        return None
+
+
+class InPart(ParamIn):
+    """
+    Annotation to indicate a parameter is provided in a part of a multipart/form-data
+    request body.
+
+    Parameters:
+    • name: name of the form field
+    • spool: number of bytes above which a buffered part is stored in a temporary file
+
+    If the parameter type is a stream, the parameter receives a stream of the part content,
+    with name, filename and headers attributes. Otherwise, the content is decoded using the
+    string codec for the parameter type.
+
+    Parts are read from the request body as they are requested; parts that precede a
+    requested part are buffered, so that parameters can be expressed in any order. The last
+    requested part is streamed without buffering, allowing uploaded files to be piped to
+    another stream (e.g. a file resource) without loading them into memory.
+    """
+
+    def __init__(self, name: str, *, spool: int = 1048576):
+        super().__init__()
+        self.name = name
+        self.spool = spool
+
+    async def get(self, hint, request):
+        if request.body is None:
+            return None
+        if request._form is None:
+            request._form = _Form(request, self.spool)
+        part = await request._form.get(self.name)
+        if part is None:
+            return None
+        if is_subclass(hint, Stream):
+            return part
+        content = bytearray()
+        async for chunk in part:
+            content.extend(chunk)
+        if is_subclass(hint, (bytes, bytearray)):
+            return content
+        try:
+            return get_codec(String, hint).decode(content.decode())
+        except (TypeError, ValueError) as e:
+            raise fondat.error.BadRequestError(f"{e} in {self}")
+
+    def __str__(self):
+        return f"multipart part: {self.name}"
+
+
+class _EventStream(Stream):
+    """
+    Stream of events yielded by an asynchronous iterator, encoded as server-sent events or
+    newline-delimited JSON.
+    """
+
+    flush = True
+
+    def __init__(self, iterator: Any, event_type: Any, ndjson: bool, heartbeat: float):
+        super().__init__("application/x-ndjson" if ndjson else "text/event-stream")
+        self._iterator = iterator.__aiter__()
+        self._event_type = event_type
+        self._codec = get_codec(JSON, event_type)
+        self._ndjson = ndjson
+        self._heartbeat = heartbeat
+        self._next = None
+
+    async def _anext(self):
+        try:
+            return True, await self._iterator.__anext__()
+        except StopAsyncIteration:
+            return False, None
+
+    async def __anext__(self) -> bytes:
+        if self._iterator is None:
+            raise StopAsyncIteration
+        if self._next is None:
+            self._next = asyncio.create_task(self._anext())
+        try:
+            done, _ = await asyncio.wait((self._next,), timeout=self._heartbeat)
+        except asyncio.CancelledError:
+            await self.aclose()
+            raise
+        if not done:
+            return b"\n" if self._ndjson else b":\n\n"
+        task, self._next = self._next, None
+        try:
+            more, event = task.result()
+            if not more:
+                raise StopAsyncIteration
+            validate(event, self._event_type)
+            data = json.dumps(self._codec.encode(event), separators=(",", ":"))
+        except StopAsyncIteration:
+            self._iterator = None
+            raise
+        except Exception as e:  # response already started; end stream
+            _logger.error(msg="error in event stream", exc_info=e)
+            await self.aclose()
+            raise StopAsyncIteration
+        return f"{data}\n".encode() if self._ndjson else f"data: {data}\n\n".encode()
+
+    async def aclose(self) -> None:
+        """Cancel any pending read of the next event, and close the iterator of events."""
+        if self._next is not None:
+            self._next.cancel()
+            await asyncio.wait((self._next,))
+            self._next = None
+        iterator, self._iterator = self._iterator, None
+        if (aclose := getattr(iterator, "aclose", None)) is not None:
+            await aclose()
+
+
 async def handle_error(err: fondat.error.Error):
     """Default error handler for HTTP application."""
 
@@ -438,6 +883,8 @@ async def handle_error(err: fondat.error.Error):
     response.status = err.status
     response.headers["content-type"] = "application/json"
     response.headers["content-length"] = str(len(body))
+    for key, value in getattr(err, "headers", {}).items():
+        response.headers[key] = value
     response.body = BytesStream(body)
     return response
 
@@ -445,6 +892,11 @@ async def handle_error(err: fondat.error.Error):
 #  TODO: In docstring, add description of routing through resource(s) to an operation.
 
 
+def _request_context():
+    # operations called to handle a request are not trusted as internal calls
+    return fondat.context.push(context="fondat.request")
+
+
 class Application:
     """
     An HTTP application, which handles ncoming HTTP requests by:
@@ -456,11 +908,48 @@ class Application:
     • filters: filters to apply during HTTP request processing
     • error_handler: coroutine function to produce response for raised fondat.error exception
     • path: URI path to root resource
+    • admission: controller to limit concurrent operations
+    • timeout: default number of seconds to complete handling a request  [unlimited]
+    • timeout_header: name of request header that can express timeout in seconds
+    • max_body_size: maximum number of bytes in a request body  [unlimited]
+    • heartbeat: seconds between heartbeats sent in idle event streams
+    • fields_param: name of query parameter to select response fields, or None to disable
 
     An HTTP application is a request handler; it's a coroutine callable that handles an HTTP
     request and returns an HTTP response.
 
+    If a request body exceeds the maximum body size, the request is rejected with a 413
+    status; if the request expresses a content length, it is rejected before its body is
+    read. Operations can express lower limits for their body parameters through InBody.
+
+    If an operation returns an asynchronous iterator (e.g. an async generator), each item it
+    yields is encoded as JSON and sent as an event, as soon as it is yielded. Events are sent
+    as newline-delimited JSON if the request accepts application/x-ndjson, otherwise as
+    server-sent events (text/event-stream). If no event is yielded within the heartbeat
+    interval, an empty line (NDJSON) or comment (server-sent events) is sent to keep the
+    connection alive. The next event is not requested until the previous event is sent.
+
+    A request can select the fields to be returned in the response through the fields query
+    parameter, unless the operation expresses a parameter of the same name. Only selected
+    fields are encoded, in a JSON response. For a description of field selection, see the
+    fondat.projection module.
+
     For a description of filters, see: Chain.
+
+    A request timeout establishes a deadline that is stored on the context stack, and is
+    enforced for resource operations and database statements performed to handle the
+    request. A timeout expressed in a request header cannot exceed the default timeout.
+
+    Request bodies of at least offload_size bytes are decoded, and responses estimated to
+    contain at least offload_items values (or offload_size characters or bytes) are validated
+    and encoded, in the offload executor. The time taken is recorded as an
+    "http_offload_seconds" gauge measurement. Setting offload_size and offload_items to None
+    disables offloading.
+
+    If an operation returns a seekable stream of known length, the application advertises
+    byte range support, and satisfies GET requests containing a Range header with a partial
+    content response; multiple ranges are returned as multipart/byteranges. An If-Range
+    header is honoured if it contains the entity tag of the stream.
     """
 
     def __init__(
@@ -470,6 +959,12 @@ class Application:
         filters: Iterable[Any] = None,
         error_handler: Callable = handle_error,
         path: str = "/",
+        admission: AdmissionController = None,
+        timeout: float = None,
+        timeout_header: str = None,
+        max_body_size: int = None,
+        heartbeat: float = 15.0,
+        fields_param: str = "fields",
     ):
         if not fondat.resource.is_resource(root):
             raise TypeError("root is not a resource")
@@ -477,15 +972,50 @@ class Application:
         self.path = path.rstrip("/") + "/"
         self.filters = list(filters or [])
         self.error_handler = error_handler
+        self.admission = admission
+        self.timeout = timeout
+        self.timeout_header = timeout_header
+        self.max_body_size = max_body_size
+        self.heartbeat = heartbeat
+        self.fields_param = fields_param
 
     async def __call__(self, *args, **kwargs):
         return await self.handle(*args, **kwargs)
 
+    def _timeout(self, request: Request):
+        timeout = self.timeout
+        if self.timeout_header and (value := request.headers.get(self.timeout_header)):
+            try:
+                value = float(value)
+            except ValueError:
+                value = None
+            if value is not None and value >= 0 and (timeout is None or value < timeout):
+                timeout = value
+        return timeout
+
     async def handle(self, request: Request):
+        timeout = self._timeout(request)
+        with fondat.deadline.push(timeout) if timeout is not None else contextlib.nullcontext():
+            with fondat.loader.scope(), fondat.security.scope(), _request_context():
+                chain = Chain(filters=self.filters, handler=self._handle)
+                return await self._respond(chain.handle, request)
+
+    async def dispatch(self, request: Request) -> Response:
+        """
+        Dispatch a request that is performed on behalf of another request that is already
+        being handled by the application. The request passes through application filters and
+        admission control, in new loader and security scopes; it is performed in the context
+        established for the request on whose behalf it is performed. Errors are handled by
+        the application error handler.
+        """
+        with fondat.loader.scope(), fondat.security.scope(), _request_context():
+            chain = Chain(filters=self.filters, handler=self._handle)
+            return await self._respond(chain.handle, request)
+
+    async def _respond(self, handler: Callable, request: Request):
         try:
             try:
-                chain = Chain(filters=self.filters, handler=self._handle)
-                return await chain.handle(request)
+                return await handler(request)
             except fondat.error.Error:
                 raise
             except Exception as ex:
@@ -496,19 +1026,56 @@ class Application:
             return await self.error_handler(err)
 
     async def _handle(self, request: Request):
+        _limit_body(request, self.max_body_size)
+        operation = await self._operation(request)
+        if not self.admission:
+            return await self._invoke(request, operation)
+        async with self.admission.admit(request, operation):
+            return await self._invoke(request, operation)
+
+    async def _operation(self, request: Request):
         if not request.path.startswith(self.path):
             raise fondat.error.NotFoundError
         request.path = request.path[len(self.path) :]
-        response = Response()
         method = request.method.lower()
         segments = request.path.split("/") if request.path else ()
         resource = self.root
-        operation = None
         for segment in segments:
             resource = await _subordinate(resource, segment)
         operation = getattr(resource, method, None)
         if not fondat.resource.is_operation(operation):
             raise fondat.error.MethodNotAllowedError
+        return operation
+
+    def _range(self, request: Request, response: Response, stream: SeekableStream):
+        response.headers["Accept-Ranges"] = "bytes"
+        if stream.etag:
+            response.headers["ETag"] = stream.etag
+        header = request.headers.get("Range")
+        if not header or request.method != "GET":
+            return stream
+        if_range = request.headers.get("If-Range")
+        if if_range is not None and (not stream.etag or if_range.strip() != stream.etag):
+            return stream  # validator mismatch or date; send entire content
+        ranges = _parse_ranges(header, stream.content_length)
+        if ranges is None:
+            return stream
+        response.status = http.HTTPStatus.PARTIAL_CONTENT.value
+        if len(ranges) > 1:
+            return _ByteRangesStream(stream, ranges)
+        offset, length = ranges[0]
+        response.headers[
+            "Content-Range"
+        ] = f"bytes {offset}-{offset + length - 1}/{stream.content_length}"
+        return stream.slice(offset, length)
+
+    def _fields(self, request: Request, signature: inspect.Signature) -> Optional[str]:
+        if not self.fields_param or self.fields_param in signature.parameters:
+            return None  # disabled, or operation expresses its own parameter
+        return request.query.get(self.fields_param)
+
+    async def _invoke(self, request: Request, operation: Any):
+        response = Response()
         signature = inspect.signature(operation)
         params = {}
         hints = typing.get_type_hints(operation, include_extras=True)
@@ -539,11 +1106,55 @@ class Application:
                 except (TypeError, ValueError) as tve:
                     raise fondat.error.BadRequestError(f"{tve} in {in_param}")
                 params[name] = param
-        result = await operation(**params)
-        validate(result, return_hint)
-        if not is_subclass(return_hint, Stream):
-            return_codec = get_codec(Binary, return_hint)
-            result = BytesStream(return_codec.encode(result), return_codec.content_type)
+        return_codec = None
+        projector = None
+        if not is_subclass(return_hint, Stream) and async_iterator_type(return_hint) is None:
+            accept = request.headers.get("Accept")
+            if (fields := self._fields(request, signature)) is not None:
+                try:
+                    projector = fondat.projection.projector(return_hint, fields)
+                except ValueError as ve:
+                    raise fondat.error.BadRequestError(f"{ve} in query parameter: fields")
+                if not fondat.negotiation.accepts(accept, "application/json"):
+                    raise fondat.error.NotAcceptableError(
+                        "acceptable media type: application/json"
+                    )
+                return_codec = fondat.negotiation.media_codec(Any, "application/json")
+            else:
+                return_codec = fondat.negotiation.select(return_hint, accept)
+            if len(fondat.negotiation.media_codecs(return_hint)) > 1:
+                response.headers["Vary"] = "Accept"
+        if projector:
+            with fondat.projection.push(fields):
+                result = await operation(**params)
+        else:
+            result = await operation(**params)
+        if return_codec:
+
+            def encode(result):
+                if projector:
+                    try:
+                        result = projector(result)
+                    except (TypeError, ValueError) as e:
+                        raise fondat.error.InternalServerError from e
+                else:
+                    validate(result, return_hint)
+                return return_codec.encode(result)
+
+            body = (
+                await _offload("encode", encode, result) if _large(result) else encode(result)
+            )
+            result = BytesStream(body, return_codec.content_type)
+        else:
+            if (event_type := async_iterator_type(return_hint)) is not None:
+                accept = request.headers.get("Accept", "")
+                ndjson = "ndjson" in accept and "text/event-stream" not in accept
+                response.headers["Cache-Control"] = "no-cache"
+                result = _EventStream(result, event_type, ndjson, self.heartbeat)
+                return_hint = Stream
+            validate(result, return_hint)
+            if isinstance(result, SeekableStream) and result.content_length is not None:
+                result = self._range(request, response, result)
         response.body = result
         response.headers["Content-Type"] = response.body.content_type
         if response.body.content_length is not None:
@@ -0,0 +1,124 @@
+"""
+Module to batch concurrent reads of items into single calls of a batch function.
+
+A loader collects the keys of items requested while an event loop iteration runs, and reads
+them in a single call of its batch function; a resource that reads one item at a time can
+therefore read many concurrently requested items in one round trip:
+
+loader = Loader(table.read_many)
+
+@resource
+class Item:
+    def __init__(self, key: UUID):
+        self.key = key
+
+    @operation
+    async def get(self) -> Row:
+        return await loader.load(self.key)
+
+Keys requested more than once are read once. Within a loader scope on the context stack,
+loaded values are cached; an HTTP application establishes a loader scope for each request
+it handles, so that an item read multiple times while handling a request is read once.
+"""
+
+import asyncio
+import fondat.context as context
+
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from fondat.error import NotFoundError
+from typing import Any
+
+
+def scope() -> context.StackContextManager:
+    """
+    Push a new loader scope onto the context stack, and return a context manager that will
+    pop it from the stack upon exit. Values loaded within the scope are cached until exit.
+    """
+    return context.push({"context": "fondat.loader", "cache": {}})
+
+
+class Loader:
+    """
+    Loads items with keys requested concurrently in calls to a batch function.
+
+    Parameters:
+    • batch: coroutine function to read a list of keys, returning a mapping of keys to values
+    • max_batch: maximum number of keys to pass in each call to batch function  [unlimited]
+
+    The batch function is called with unique keys. A key that is absent from the mapping it
+    returns is not found. The batch function is called in the context of the first load
+    of the batch. Values are not copied; callers that load the same key receive the same
+    value.
+    """
+
+    def __init__(
+        self,
+        batch: Callable[[list[Hashable]], Awaitable[Mapping[Hashable, Any]]],
+        *,
+        max_batch: int = None,
+    ):
+        self.batch = batch
+        self.max_batch = max_batch
+        self._pending = {}  # key → future
+        self._scheduled = False
+
+    def _cache(self) -> dict[Hashable, asyncio.Future]:
+        ctx = context.last(context="fondat.loader")
+        return ctx["cache"].setdefault(self, {}) if ctx else None
+
+    async def load(self, key: Hashable) -> Any:
+        """Load the value of an item. If the item is not found, NotFoundError is raised."""
+        cache = self._cache()
+        future = cache.get(key) if cache is not None else None
+        if future is None:
+            future = self._pending.get(key)
+            if future is None:
+                loop = asyncio.get_running_loop()
+                future = self._pending[key] = loop.create_future()
+                if not self._scheduled:
+                    loop.call_soon(self._dispatch)
+                    self._scheduled = True
+            if cache is not None:
+                cache[key] = future
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list[Any]:
+        """Load the values of items. If any item is not found, NotFoundError is raised."""
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    def clear(self, key: Hashable = None) -> None:
+        """Remove an item, or all items if no key is specified, from the loader scope cache."""
+        cache = self._cache()
+        if cache is not None:
+            if key is None:
+                cache.clear()
+            else:
+                cache.pop(key, None)
+
+    def _dispatch(self):
+        pending, self._pending, self._scheduled = self._pending, {}, False
+        keys = list(pending)
+        size = self.max_batch or len(keys)
+        for index in range(0, len(keys), size):
+            batch = {key: pending[key] for key in keys[index : index + size]}
+            asyncio.create_task(self._load(batch))
+
+    async def _load(self, batch: dict[Hashable, asyncio.Future]):
+        try:
+            values = await self.batch(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if future.done():
+                continue
+            try:
+                future.set_result(values[key])
+            except KeyError:
+                future.set_exception(NotFoundError(f"key not found: {key}"))
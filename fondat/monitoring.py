@@ -5,11 +5,13 @@ This module defines a "monitors" variable, which is an instance of the Monitors
 application monitor(s) can be added to/deleted from this object.
 """
 
+import asyncio
 import collections
 import fondat.context as context
 import fondat.validation
 import logging
 import math
+import random
 import re
 import time
 
@@ -40,14 +42,67 @@ class Measurement:
 
     tags: dict[str, str]
     timestamp: datetime
-    type: Literal["counter", "gauge", "absolute"]
+    type: Literal["counter", "gauge", "absolute", "histogram"]
     value: Union[int, float]
 
     def __post_init__(self):
         fondat.validation.validate(self, self.__class__)
 
 
-class Counter:
+class _MonotonicMeasurement(Measurement):
+    """
+    A measurement that is not validated, and whose timestamp is expressed as a value of the
+    time.monotonic clock; it is converted to a date and time when first accessed.
+    """
+
+    def __init__(self, tags: dict[str, str], monotonic: float, type: str, value: Any):
+        self.tags = tags
+        self.type = type
+        self.value = value
+        self._monotonic = monotonic
+        self._timestamp = None
+
+    @property
+    def timestamp(self) -> datetime:
+        if self._timestamp is None:
+            elapsed = time.monotonic() - self._monotonic
+            self._timestamp = datetime.fromtimestamp(time.time() - elapsed, tz=timezone.utc)
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self._timestamp = value
+
+
+def _epoch(measurement: Measurement) -> float:
+    """Return the timestamp of a measurement in seconds since the epoch."""
+    if isinstance(measurement, _MonotonicMeasurement) and measurement._timestamp is None:
+        return time.time() - (time.monotonic() - measurement._monotonic)
+    return measurement.timestamp.timestamp()
+
+
+class _DataPoint:
+    """
+    Base class for data points. A timestamp expressed as an integer number of seconds since
+    the epoch is converted to a date and time when first accessed.
+    """
+
+    def __init__(self, timestamp: Union[datetime, int]):
+        super().__init__()
+        self._timestamp = timestamp
+
+    @property
+    def timestamp(self) -> datetime:
+        if not isinstance(self._timestamp, datetime):
+            self._timestamp = datetime.fromtimestamp(self._timestamp, tz=timezone.utc)
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self._timestamp = value
+
+
+class Counter(_DataPoint):
     """
     A counter data point. A counter measurement is an integer value that should monotonicaly
     increase (unless being reset). The counter data point stores the highest counter value
@@ -62,16 +117,15 @@ class Counter:
 
     name = "counter"
 
-    def __init__(self, timestamp: datetime):
-        super().__init__()
-        self.timestamp = timestamp
+    def __init__(self, timestamp: Union[datetime, int]):
+        super().__init__(timestamp)
         self.value = 0
 
     def record(self, value: Union[int, float]):
         self.value = max(self.value, value)
 
 
-class Gauge:
+class Gauge(_DataPoint):
     """
     A gauge data point. A gauge measurement is an integer or floating point value. The gauge
     data point stores the minimum, maximum, sum and count of measured values.
@@ -88,9 +142,8 @@ class Gauge:
 
     name = "gauge"
 
-    def __init__(self, timestamp: int):
-        super().__init__()
-        self.timestamp = timestamp
+    def __init__(self, timestamp: Union[datetime, int]):
+        super().__init__(timestamp)
         self.min = None
         self.max = None
         self.count = 0
@@ -105,7 +158,7 @@ class Gauge:
         self.sum += value
 
 
-class Absolute:
+class Absolute(_DataPoint):
     """
     An absolute data point. An absolute measurement is an integer value. The absolute data
     point stores the sum of measured values.
@@ -119,16 +172,126 @@ class Absolute:
 
     name = "absolute"
 
-    def __init__(self, timestamp: datetime):
-        super().__init__()
-        self.timestamp = timestamp
+    def __init__(self, timestamp: Union[datetime, int]):
+        super().__init__(timestamp)
         self.value = 0
 
     def record(self, value: Union[int, float]):
         self.value += value
 
 
-_types = {t.name: t for t in {Counter, Gauge, Absolute}}
+class Histogram(_DataPoint):
+    """
+    A histogram data point. A histogram measurement is a non-negative integer or floating
+    point value, such as a duration. The histogram data point stores the distribution of
+    measured values, from which quantiles (e.g. median, 99th percentile) can be estimated.
+
+    Parameters:
+    • timestamp: date and time of the data point
+    • relative_error: maximum relative error of estimated quantiles
+    • max_buckets: maximum number of buckets to store
+
+    Attributes:
+    • min: minimum measured value
+    • max: maximum measured value
+    • sum: sum of all measured values
+    • count: count of measured values
+
+    Values are counted in buckets whose bounds increase logarithmically, such that any value
+    in a bucket is within the relative error of the bucket's estimated value. Memory is bounded
+    by the maximum number of buckets; if exceeded, the lowest buckets are collapsed, reducing
+    the accuracy of the lowest quantiles. Histograms with the same relative error can be
+    merged, across intervals or time series.
+    """
+
+    name = "histogram"
+
+    def __init__(
+        self,
+        timestamp: Union[datetime, int],
+        relative_error: float = 0.01,
+        max_buckets: int = 2048,
+    ):
+        super().__init__(timestamp)
+        if not 0 < relative_error < 1:
+            raise ValueError("relative error must be between 0 and 1")
+        self.relative_error = relative_error
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets = {}  # index → count
+        self._zero = 0  # count of values too small to index
+        self.min = None
+        self.max = None
+        self.count = 0
+        self.sum = 0
+
+    def record(self, value: Union[int, float]):
+        if value < 0:
+            raise ValueError("histogram value must be non-negative")
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.count += 1
+        self.sum += value
+        if value < 1e-9:
+            self._zero += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        indexes = sorted(self._buckets)
+        while len(indexes) > self.max_buckets:
+            lowest = indexes.pop(0)
+            self._buckets[indexes[0]] += self._buckets.pop(lowest)
+
+    def merge(self, other: "Histogram"):
+        """Merge the values of another histogram into this histogram."""
+        if other.relative_error != self.relative_error:
+            raise ValueError("cannot merge histograms with different relative errors")
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self._zero += other._zero
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.count += other.count
+        self.sum += other.sum
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Return the estimated value at a quantile, or None if no values were measured.
+
+        Parameters:
+        • q: quantile to estimate, from 0 to 1; for example, 0.99 is the 99th percentile
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if not self.count:
+            return None
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self._zero
+        if rank < seen:
+            return 0 if self.min < 1e-9 else self.min
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                value = 2 * self._gamma**index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+_types = {t.name: t for t in {Counter, Gauge, Absolute, Histogram}}
 
 
 class Series:
@@ -138,110 +301,204 @@ class Series:
     • patterns: dictionary of tag names to regular expression patterns to match
     • points: number of data points to maintain in the time series
     • interval: interval between data points, in seconds
+    • relative_error: maximum relative error of quantiles estimated by histogram data points
 
     Attributes:
-    • data: deque of timestamp-ordered data points
+    • data: list of timestamp-ordered data points
+    • latest: data point of the latest interval recorded, or None if nothing is recorded
+    • literals: dictionary of tag names to the values matched by literal patterns
+    • version: number of measurements recorded in the time series
 
     The patterns parameter is a dictionary that maps tag names to regular expression
     strings to match against recorded measurement tags. For example, {"name": "foo"} would
     track data where a tag includes {"name": "foo"}, while {"name": "foo\\..+"} would track
     measurements with tags that include {"name": "foo.bar"} and {"name": "foo.qux"}.
+
+    Data points are stored in a ring buffer, indexed by the beginning of their interval;
+    recording a measurement takes constant time. Measurements older than the time series
+    retains are ignored.
     """
 
     def __init__(
         self,
-        type: Literal["counter", "gauge", "absolute"],
+        type: Literal["counter", "gauge", "absolute", "histogram"],
         patterns: dict[str, str],
         points: int,
         interval: int,
+        relative_error: float = 0.01,
     ):
         self.type = type
         self.patterns = {k: re.compile(v) for k, v in patterns.items()}
         self.points = points
         self.interval = interval
-        self.data = collections.deque()
+        self.relative_error = relative_error
+        self._matchers = [
+            (k, v if re.escape(v) == v else None, self.patterns[k]) for k, v in patterns.items()
+        ]
+        self._starts = [None] * points  # beginning of interval of each data point
+        self._data = [None] * points
+        self._latest = None  # beginning of latest interval recorded
+        self.version = 0
+
+    @property
+    def data(self) -> list[Any]:
+        if self._latest is None:
+            return []
+        oldest = self._latest - (self.points - 1) * self.interval
+        return [
+            self._data[i]
+            for i in sorted(
+                (i for i, s in enumerate(self._starts) if s is not None and s >= oldest),
+                key=self._starts.__getitem__,
+            )
+        ]
+
+    @property
+    def latest(self) -> Any:
+        if self._latest is None:
+            return None
+        return self._data[(self._latest // self.interval) % self.points]
+
+    @property
+    def literals(self) -> dict[str, str]:
+        return {k: literal for k, literal, _ in self._matchers if literal is not None}
 
     def _tags_match(self, tags):
-        for pk, pv in self.patterns.items():
-            if not sum([1 for tk, tv in tags.items() if tk == pk and pv.fullmatch(tv)]):
+        for key, literal, pattern in self._matchers:
+            value = tags.get(key)
+            if value is None:
+                return False
+            if literal is not None:
+                if value != literal:
+                    return False
+            elif not pattern.fullmatch(value):
                 return False
         return True
 
-    def _round_down(self, timestamp):
-        ts = int(timestamp.timestamp())  # truncate milliseconds
-        ts -= ts % self.interval  # round to beginning of interval
-        return datetime.fromtimestamp(ts, tz=timezone.utc)
-
-    def _get_data_point(self, timestamp):
-        timestamp = self._round_down(timestamp)
-        index = 0
-        for index in range(0, len(self.data)):
-            if self.data[index].timestamp == timestamp:
-                return self.data[index]
-            if self.data[index].timestamp > timestamp:
-                break
-        if index < len(self.data) and self.data[index].timestamp < timestamp:
-            index += 1
-        result = _types[self.type](timestamp)
-        self.data.insert(index, result)
-        while len(self.data) > self.points:
-            self.data.popleft()
-        return result
+    def _get_data_point(self, epoch):
+        ts = int(epoch)  # truncate milliseconds
+        start = ts - ts % self.interval  # round to beginning of interval
+        if self._latest is not None:
+            if start <= self._latest - self.points * self.interval:
+                return None  # older than retained
+            if start > self._latest:
+                self._latest = start
+        else:
+            self._latest = start
+        index = (start // self.interval) % self.points
+        if self._starts[index] != start:
+            if self._starts[index] is not None and self._starts[index] > start:
+                return None  # slot holds a newer data point
+            self._starts[index] = start
+            if self.type == "histogram":
+                self._data[index] = Histogram(start, self.relative_error)
+            else:
+                self._data[index] = _types[self.type](start)
+        return self._data[index]
+
+    def quantile(
+        self, q: float, start: datetime = None, end: datetime = None
+    ) -> Optional[float]:
+        """
+        Return the estimated value at a quantile of measurements recorded in histogram data
+        points, or None if no values were measured.
+
+        Parameters:
+        • q: quantile to estimate, from 0 to 1; for example, 0.99 is the 99th percentile
+        • start: include data points beginning at or after date and time  [oldest]
+        • end: include data points beginning before date and time  [newest]
+        """
+        if self.type != "histogram":
+            raise ValueError("quantiles can only be estimated for histogram data points")
+        merged = Histogram(0, self.relative_error)
+        for data_point in self.data:
+            if (start is None or data_point.timestamp >= start) and (
+                end is None or data_point.timestamp < end
+            ):
+                merged.merge(data_point)
+        return merged.quantile(q)
 
     def record(self, measurement):
         """Record a measurement."""
-        if not self._tags_match(measurement.tags):
-            return  # ignore submission
+        if self._tags_match(measurement.tags):
+            self._record(measurement)
+
+    def _record(self, measurement):
+        """Record a measurement whose tags are known to match."""
         if measurement.type != self.type:
             raise ValueError(f"expecting data point type of: {self.type}")
-        if measurement.timestamp > _now():
+        epoch = _epoch(measurement)
+        if epoch > time.time():
             raise ValueError("cannot record measurement in the future")
-        self._get_data_point(measurement.timestamp).record(measurement.value)
+        if (data_point := self._get_data_point(epoch)) is not None:
+            data_point.record(measurement.value)
+            self.version += 1
 
 
 class SimpleMonitor:
     """
-    A simple in-memory round-robin monitor, capable of maintaining multiple time series. This
-    class is appropriate for collecting thousands of data points (e.g. unit testing). Beyond
-    that, it’s advisable to use an external, real time series database.
+    A simple in-memory round-robin monitor, capable of maintaining multiple time series. Each
+    time series retains a fixed number of data points; recording a measurement in a time
+    series takes constant time. For long-term retention or querying of data points, it’s
+    advisable to use an external, real time series database.
 
     In this monitor, a time series is a set of data points and time intervals of fixed
     duration. A data point records data measured at that exact point in time and the
     subsequent interval.
 
     This monitor handles the following types of recorded measurements in data points:
-    "counter", "gauge" and "absolute". For more information on these types, see their class
-    documentation.
+    "counter", "gauge", "absolute" and "histogram". For more information on these types, see
+    their class documentation.
 
     If no measurement is recorded for a given data point, the data point will not be stored in
     the time series. Consumers of the time series should perform interpolation if required
     (e.g. for graphic representation).
 
     The simple monitor contains a series attribute, which is a dictionary mapping time series
-    names to associated Series objects.
+    names to associated Series objects. Time series should be added and removed through the
+    track and untrack methods.
+
+    Parameters:
+    • routes: maximum number of distinct tag sets to memoize matching time series for
+
+    The time series that match a set of measurement tags are memoized in a least-recently
+    used routing index; a measurement with a memoized tag set is recorded without matching
+    tag patterns. The route_hits and route_misses attributes count routing index lookups.
     """
 
-    def __init__(self):
+    def __init__(self, routes: int = 1024):
         super().__init__()
         self.series = {}
+        self.routes = routes
+        self.route_hits = 0
+        self.route_misses = 0
+        self._routes = collections.OrderedDict()  # frozen tag set → list of series
+
+    @property
+    def route_hit_rate(self) -> Optional[float]:
+        """Fraction of routing index lookups that were hits, or None if none were performed."""
+        lookups = self.route_hits + self.route_misses
+        return self.route_hits / lookups if lookups else None
 
     def track(
         self,
         name: str,
-        type: Literal["counter", "gauge", "absolute"],
+        type: Literal["counter", "gauge", "absolute", "histogram"],
         patterns: dict[str, str],
         points: int,
         interval: int,
+        relative_error: float = 0.01,
     ):
         """
         Track data points for a specfied set of tags in a new time series.
 
         Parameters:
         • name: name of the new time series
-        • type: type of data point to track  {"counter", "gauge", "absolute"}
+        • type: type of data point to track  {"counter", "gauge", "absolute", "histogram"}
         • patterns: measurements with tags matching regular expressions are tracked
         • points: number of data points to maintain in the time series
         • interval: interval between data points, in seconds
+        • relative_error: maximum relative error of quantiles estimated by histogram points
 
         For patterns parameter, see the Series class initializer documentation.
         """
@@ -249,12 +506,44 @@ class SimpleMonitor:
             raise ValueError(f"time series already exists: {name}")
         if type not in _types:
             raise ValueError(f"unsupported data point type: {type}")
-        self.series[name] = Series(type, patterns, points, interval)
+        self.series[name] = Series(type, patterns, points, interval, relative_error)
+        self._routes.clear()
+
+    def untrack(self, name: str):
+        """Stop tracking data points in a time series, and remove it from the monitor."""
+        del self.series[name]
+        self._routes.clear()
+
+    def _route(self, tags: dict[str, str]) -> list[Series]:
+        key = frozenset(tags.items())
+        route = self._routes.get(key)
+        if route is not None:
+            self.route_hits += 1
+            self._routes.move_to_end(key)
+            return route
+        self.route_misses += 1
+        route = [series for series in self.series.values() if series._tags_match(tags)]
+        self._routes[key] = route
+        if len(self._routes) > self.routes:
+            self._routes.popitem(last=False)
+        return route
 
     async def record(self, measurement: Measurement):
         """Record a measurement."""
-        for series in self.series.values():
-            series.record(measurement)
+        for series in self._route(measurement.tags):
+            series._record(measurement)
+
+    async def record_many(self, measurements: Iterable[Measurement]):
+        """
+        Record multiple measurements. A measurement that cannot be recorded is logged and
+        skipped, rather than preventing the rest from being recorded.
+        """
+        for measurement in measurements:
+            try:
+                for series in self._route(measurement.tags):
+                    series._record(measurement)
+            except Exception:
+                _logger.warning("Exception recording measurement", exc_info=True)
 
 
 class DequeMonitor:
@@ -281,6 +570,13 @@ class DequeMonitor:
                 self.deque.popleft()
         self.deque.append(measurement)
 
+    async def record_many(self, measurements: Iterable[Measurement]):
+        """Record multiple measurements."""
+        self.deque.extend(measurements)
+        if self.size is not None:
+            while len(self.deque) > self.size:
+                self.deque.popleft()
+
     async def pop(self, monitor, cap: int = None):
         """
         Remove oldest measurements from the deque and record them into another monitor.
@@ -289,16 +585,13 @@ class DequeMonitor:
         • monitor: monitor to record measurements into
         • cap: maximum number of measurements to pop from deque
 
-        If no cap is specified, all queued items will be popped.
+        If no cap is specified, all queued items will be popped. Popped measurements are
+        recorded in a single batch.
         """
-        count = 0
-        while (count < cap) if cap else True:
-            try:
-                measurement = self.deque.popleft()
-            except IndexError:
-                break
-            await monitor.record(measurement)
-            count += 1
+        count = len(self.deque) if not cap else min(cap, len(self.deque))
+        measurements = [self.deque.popleft() for _ in range(count)]
+        if measurements:
+            await record_many(measurements, [monitor])
 
 
 class Monitors(dict):
@@ -320,6 +613,137 @@ class Monitors(dict):
         if exception:
             raise e
 
+    async def record_many(self, measurements: Iterable[Measurement]):
+        """Record multiple measurements."""
+        measurements = list(measurements)
+        exception = None
+        for monitor in self.values():
+            try:
+                await record_many(measurements, [monitor])
+            except Exception as e:
+                if not exception:
+                    exception = e
+        if exception:
+            raise exception
+
+
+class Pipeline:
+    """
+    A monitor that buffers recorded measurements, and records them in batches into other
+    monitors in a background task. Recording a measurement in a pipeline only appends it to
+    the buffer; it never waits for slow monitors, such as those writing to a database.
+
+    Parameters and attributes:
+    • monitors: monitors to record measurements in
+    • size: maximum number of measurements to buffer
+    • batch: maximum number of measurements to record in each batch
+    • interval: number of seconds between recording batches
+    • overflow: policy when the buffer is full  {"drop-oldest", "sample"}
+
+    Attributes:
+    • dropped: number of measurements dropped due to buffer overflow
+
+    If the buffer is full, the "drop-oldest" policy drops the oldest buffered measurement;
+    the "sample" policy replaces a randomly selected buffered measurement, with diminishing
+    probability as more measurements overflow, retaining a uniform sample of measurements.
+    Dropped measurements are counted in a "monitoring_measurements_dropped" absolute
+    measurement, recorded with the next batch.
+
+    The background task is started when the first measurement is recorded. The flush method
+    records all buffered measurements; the stop method stops the background task after
+    flushing the buffer. Measurements of work performed by the framework are buffered in
+    pipelines in global monitors through the add method, as unvalidated compact tuples.
+    """
+
+    def __init__(
+        self,
+        monitors: Iterable[Any],
+        *,
+        size: int = 65536,
+        batch: int = 1024,
+        interval: float = 1.0,
+        overflow: Literal["drop-oldest", "sample"] = "drop-oldest",
+    ):
+        if overflow not in {"drop-oldest", "sample"}:
+            raise ValueError(f"unsupported overflow policy: {overflow}")
+        self.monitors = list(monitors)
+        self.size = size
+        self.batch = batch
+        self.interval = interval
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped = 0  # dropped since last batch
+        self._buffer = collections.deque(maxlen=size if overflow == "drop-oldest" else None)
+        self._task = None
+
+    def add(self, tags: dict[str, str], type: str, value: Union[int, float]):
+        """
+        Buffer a measurement, expressed as a compact tuple, timestamped now. The measurement
+        is not validated.
+        """
+        self._enqueue((tags, time.monotonic(), type, value))
+
+    async def record(self, measurement: Measurement):
+        """Record a measurement."""
+        self._enqueue(measurement)
+
+    async def record_many(self, measurements: Iterable[Measurement]):
+        """Record multiple measurements."""
+        for measurement in measurements:
+            self._enqueue(measurement)
+
+    def _enqueue(self, item):
+        if len(self._buffer) >= self.size:
+            self.dropped += 1
+            self._dropped += 1
+            if self.overflow == "sample":
+                if random.random() < self.size / (self.size + self._dropped):
+                    self._buffer[random.randrange(self.size)] = item
+                return
+        self._buffer.append(item)
+        if self._task is None:
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:  # no running event loop
+                pass
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        """Record all buffered measurements in monitors."""
+        while self._buffer or self._dropped:
+            count = min(self.batch, len(self._buffer))
+            measurements = [self._buffer.popleft() for _ in range(count)]
+            measurements = [
+                m if isinstance(m, Measurement) else _MonotonicMeasurement(*m)
+                for m in measurements
+            ]
+            if self._dropped:
+                tags = {"name": "monitoring_measurements_dropped"}
+                measurements.append(
+                    _MonotonicMeasurement(tags, time.monotonic(), "absolute", self._dropped)
+                )
+                self._dropped = 0
+            for monitor in self.monitors:
+                try:
+                    await record_many(measurements, [monitor])
+                except:
+                    _logger.warning("Exception recording measurements", exc_info=True)
+
+    async def stop(self):
+        """Stop the background task, after recording all buffered measurements."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
 
 class timer:
     """
@@ -330,9 +754,16 @@ class timer:
     • tags: tags to record upon completion of the timer
     • monitors: monitors to record measurement in  [global monitors]
     • status: name of tag to record status in measurement; None excludes status
+    • validate: validate the recorded measurement
+    • type: type of measurement to record  {"gauge", "histogram"}
+
+    If no exception is encounted during execution, recorded status is "success", otherwise
+    "failure". Recording a histogram measurement allows percentiles of durations to be
+    estimated.
 
-    If no exception is encounted during execution, recotagsrded status is "success", otherwise
-    "failure".
+    The count of a gauge data point is the number of timed executions; a timer can therefore
+    be used in place of a combined timer and counter. Unless validate is true, the
+    measurement is recorded through the add function; see its documentation.
     """
 
     def __init__(
@@ -341,10 +772,14 @@ class timer:
         *,
         monitors: Optional[Iterable[Any]] = None,
         status: str = "status",
+        validate: bool = False,
+        type: Literal["gauge", "histogram"] = "gauge",
     ):
         self.tags = tags
         self.monitors = monitors
         self.status = status
+        self.validate = validate
+        self.type = type
 
     async def __aenter__(self):
         self.begin = time.perf_counter()
@@ -356,7 +791,10 @@ class timer:
         if self.status:
             tags[self.status] = "failure" if exc_type else "success"
         try:
-            await record(Measurement(tags, _now(), "gauge", duration), self.monitors)
+            if self.validate:
+                await record(Measurement(tags, _now(), self.type, duration), self.monitors)
+            else:
+                await add(tags, self.type, duration, self.monitors)
         except:
             _logger.warning("Exception recording measurement", exc_info=True)
 
@@ -372,7 +810,7 @@ class counter:
     • status: name of tag to record status in measurement; None excludes status
 
     If no exception is encounted during execution, recorded status is "success", otherwise
-    "failure".
+    "failure". The measurement is recorded through the add function.
     """
 
     def __init__(
@@ -394,7 +832,7 @@ class counter:
         if self.status:
             tags[self.status] = "failure" if exc_type else "success"
         try:
-            await record(Measurement(tags, _now(), "counter", 1), self.monitors)
+            await add(tags, "counter", 1, self.monitors)
         except:
             _logger.warning("Exception recording measurement", exc_info=True)
 
@@ -412,3 +850,56 @@ async def record(measurement: Measurement, monitors: Optional[Iterable[Any]] = N
     """
     for monitor in monitors or globals()["monitors"]:
         await monitor.record(measurement)
+
+
+async def add(
+    tags: dict[str, str],
+    type: str,
+    value: Union[int, float],
+    monitors: Optional[Iterable[Any]] = None,
+):
+    """
+    Record a measurement, timestamped now, without validating it.
+
+    Parameters:
+    • tags: tags associated with the measurement; should contain a "name" key
+    • type: type of measurement to record
+    • value: value of measurement
+    • monitors: monitors to record measurement in  [global monitors]
+
+    A measurement is buffered in each pipeline monitor as a compact tuple, without awaiting
+    the monitors it records in. In other monitors, it is recorded as a measurement whose
+    timestamp is taken from the monotonic clock and converted to a date and time only if
+    accessed. This is how measurements of work performed by the framework are recorded, so
+    global monitors that are slow to record should be wrapped in a Pipeline.
+    """
+    measurement = None
+    for monitor in monitors or globals()["monitors"]:
+        if isinstance(monitor, Pipeline):
+            monitor.add(tags, type, value)
+        else:
+            if measurement is None:
+                measurement = _MonotonicMeasurement(tags, time.monotonic(), type, value)
+            await monitor.record(measurement)
+
+
+async def record_many(
+    measurements: Iterable[Measurement], monitors: Optional[Iterable[Any]] = None
+):
+    """
+    Record multiple measurements.
+
+    Parameters:
+    • measurements: measurements to record
+    • monitors: monitors to record measurements in  [global monitors]
+
+    Measurements are recorded through the record_many method of monitors that provide it,
+    otherwise through the record method, one measurement at a time.
+    """
+    measurements = list(measurements)
+    for monitor in monitors or globals()["monitors"]:
+        if (many := getattr(monitor, "record_many", None)) is not None:
+            await many(measurements)
+        else:
+            for measurement in measurements:
+                await monitor.record(measurement)
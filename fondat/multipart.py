@@ -0,0 +1,196 @@
+"""
+Module to parse multipart/form-data content.
+
+Content is parsed as it is read from a stream; each part is exposed as a stream, allowing
+large parts (e.g. uploaded files) to be processed without loading them entirely into memory.
+Parts must be read in the order they appear in the content; advancing to the next part
+discards any unread content of the current part, unless the current part is spooled.
+"""
+
+import multidict
+
+from collections.abc import AsyncIterator
+from fondat.error import BadRequestError
+from fondat.types import SpooledStream, Stream
+from typing import Optional
+
+
+_max_header_size = 16384
+
+
+def parse_params(value: str) -> tuple[str, dict[str, str]]:
+    """
+    Parse a header value with parameters, such as Content-Type or Content-Disposition, into
+    a tuple of value and parameters dictionary. Parameter names are lower case.
+    """
+    value, *params = value.split(";")
+    result = {}
+    for param in params:
+        key, sep, val = param.partition("=")
+        if not sep:
+            continue
+        val = val.strip()
+        if len(val) >= 2 and val[0] == val[-1] == '"':
+            val = val[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+        result[key.strip().lower()] = val
+    return value.strip().lower(), result
+
+
+class Part(Stream):
+    """
+    Stream of the content of a part in multipart content.
+
+    Attributes:
+    • headers: multi-value dictionary of part headers
+    • name: name of the form field, from the Content-Disposition header
+    • filename: name of the uploaded file, or None if not a file
+    • content_type: the media type of the part content
+    """
+
+    def __init__(self, reader: "MultipartReader", headers: multidict.CIMultiDict):
+        _, params = parse_params(headers.get("Content-Disposition", ""))
+        super().__init__(headers.get("Content-Type", "text/plain"))
+        self.headers = headers
+        self.name = params.get("name")
+        self.filename = params.get("filename")
+        self._reader = reader
+        self._spooled = None
+
+    async def spool(self, max_size: int = 1048576) -> None:
+        """
+        Buffer the unread content of the part, so that it can be read after subsequent parts
+        are read.
+
+        Parameters:
+        • max_size: maximum number of bytes to buffer in memory before using a temporary file
+        """
+        if self._spooled is None and self._reader._part is self:
+            spooled = SpooledStream(self.content_type, max_size)
+            async for chunk in self._reader._read_body():
+                spooled.write(chunk)
+            self._spooled = spooled
+            self.content_length = spooled.content_length
+
+    async def __anext__(self) -> bytes:
+        if self._spooled is not None:
+            return await self._spooled.__anext__()
+        if self._reader._part is not self:
+            raise StopAsyncIteration
+        chunk = await self._reader._read_chunk()
+        if chunk is None:
+            raise StopAsyncIteration
+        return chunk
+
+
+class MultipartReader:
+    """
+    Asynchronous iterator of parts in multipart content read from a stream.
+
+    Parameters:
+    • stream: stream of multipart content
+    • boundary: boundary delimiting parts, from the Content-Type of the content
+
+    Malformed content raises BadRequestError.
+    """
+
+    def __init__(self, stream: Stream, boundary: str):
+        if not boundary:
+            raise BadRequestError("missing multipart boundary")
+        self._stream = stream
+        self._delimiter = b"\r\n--" + boundary.encode()
+        self._buffer = bytearray(b"\r\n")  # first delimiter need not be preceded by CRLF
+        self._eof = False
+        self._part = None
+        self._body_done = True
+        self._preamble_read = False
+        self._done = False
+
+    @classmethod
+    def from_content_type(cls, stream: Stream, content_type: str) -> "MultipartReader":
+        """Return a reader for the stream, using the boundary expressed in content type."""
+        media_type, params = parse_params(content_type or "")
+        if not media_type.startswith("multipart/"):
+            raise BadRequestError(f"expecting multipart content; received {media_type}")
+        return cls(stream, params.get("boundary"))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Part:
+        async for _ in self._read_body():  # discard unread content of current part
+            pass
+        self._part = None
+        if self._done:
+            raise StopAsyncIteration
+        if not self._preamble_read:
+            await self._skip_preamble()
+        headers = await self._read_headers()
+        if headers is None:
+            self._done = True
+            raise StopAsyncIteration
+        self._part = Part(self, headers)
+        self._body_done = False
+        return self._part
+
+    async def _fill(self) -> bool:
+        if self._eof:
+            return False
+        try:
+            self._buffer.extend(await self._stream.__anext__())
+        except StopAsyncIteration:
+            self._eof = True
+            return False
+        return True
+
+    async def _skip_preamble(self):
+        while (index := self._buffer.find(self._delimiter)) < 0:
+            del self._buffer[: max(len(self._buffer) - len(self._delimiter), 0)]
+            if not await self._fill():
+                raise BadRequestError("multipart boundary not found")
+        del self._buffer[: index + len(self._delimiter)]
+        self._preamble_read = True
+
+    async def _read_headers(self) -> Optional[multidict.CIMultiDict]:
+        """Read headers following a delimiter; return None if closing delimiter."""
+        while len(self._buffer) < 2:
+            if not await self._fill():
+                raise BadRequestError("unexpected end of multipart content")
+        if self._buffer.startswith(b"--"):
+            return None
+        while (index := self._buffer.find(b"\r\n\r\n")) < 0:
+            if len(self._buffer) > _max_header_size:
+                raise BadRequestError("multipart headers too large")
+            if not await self._fill():
+                raise BadRequestError("unexpected end of multipart content")
+        lines = self._buffer[:index].decode("utf-8", "replace").split("\r\n")
+        del self._buffer[: index + 4]
+        headers = multidict.CIMultiDict()
+        for line in lines[1:]:  # first line is transport padding following delimiter
+            key, sep, value = line.partition(":")
+            if not sep:
+                raise BadRequestError("malformed multipart header")
+            headers.add(key.strip(), value.strip())
+        return headers
+
+    async def _read_chunk(self) -> Optional[bytes]:
+        """Read the next chunk of the current part body; return None at end of body."""
+        if self._body_done:
+            return None
+        while True:
+            index = self._buffer.find(self._delimiter)
+            if index >= 0:
+                chunk = bytes(self._buffer[:index])
+                del self._buffer[: index + len(self._delimiter)]
+                self._body_done = True
+                return chunk if chunk else None
+            safe = len(self._buffer) - len(self._delimiter) + 1
+            if safe > 0:
+                chunk = bytes(self._buffer[:safe])
+                del self._buffer[:safe]
+                return chunk
+            if not await self._fill():
+                raise BadRequestError("unexpected end of multipart content")
+
+    async def _read_body(self) -> AsyncIterator[bytes]:
+        while (chunk := await self._read_chunk()) is not None:
+            yield chunk
@@ -0,0 +1,268 @@
+"""
+Module to negotiate the media type used to represent values in HTTP messages.
+
+A value of a Python type can be represented in one or more media types. Each supported media
+type is provided by a media codec, which encodes and decodes values to and from binary
+objects. Media codecs are supplied by providers, in the order they are registered; the first
+media codec supplied for a type is its default representation.
+
+The following media types are provided:
+• the media type of the type's binary codec (default)
+• application/json: JSON representation of the value
+• text/csv: rows of comma-separated values, for iterables of dataclasses
+
+Compact binary representations (e.g. CBOR, MessagePack) can be supported by appending a
+provider to the providers list.
+"""
+
+import csv
+import dataclasses
+import fondat.error
+import functools
+import io
+import json
+import typing
+
+from collections.abc import Callable, Iterable
+from fondat.codec import Binary, JSON, String, get_codec
+from fondat.csv import DataclassWriter
+from typing import Annotated, Any, Optional, Union
+
+
+providers = []
+
+_raw_types = (str, bytes, bytearray)  # request body is the value, whatever its content type
+
+
+def _provider(wrapped: Callable) -> Callable:
+    providers.append(wrapped)
+    return wrapped
+
+
+def _lru_cache(maxsize: int) -> Callable:
+    """
+    Return a decorator that caches the results of a function in a least-recently-used cache.
+    Unlike functools.lru_cache, calls with unhashable arguments (e.g. types annotated with
+    unhashable metadata) are performed without caching, rather than raising TypeError.
+    """
+
+    def decorator(wrapped: Callable) -> Callable:
+        cached = functools.lru_cache(maxsize=maxsize)(wrapped)
+
+        @functools.wraps(wrapped)
+        def wrapper(*args):
+            try:
+                hash(args)
+            except TypeError:
+                return wrapped(*args)
+            return cached(*args)
+
+        return wrapper
+
+    return decorator
+
+
+class MediaCodec:
+    """
+    Encodes and decodes values to and from binary objects in a media type.
+
+    Parameters and attributes:
+    • content_type: the media type of the binary object representation
+    • encode: function to encode a value into a binary object
+    • decode: function to decode a value from a binary object
+    """
+
+    __slots__ = ("content_type", "encode", "decode")
+
+    def __init__(self, content_type: str, encode: Callable, decode: Callable):
+        self.content_type = content_type
+        self.encode = encode
+        self.decode = decode
+
+    @property
+    def media_type(self) -> str:
+        """The media type, excluding parameters."""
+        return _media_type(self.content_type)
+
+
+def _media_type(content_type: str) -> str:
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def _strip(python_type: Any) -> Any:
+    if typing.get_origin(python_type) is Annotated:
+        return typing.get_args(python_type)[0]
+    return python_type
+
+
+@_provider
+def _binary(python_type):
+    try:
+        codec = get_codec(Binary, python_type)
+    except TypeError:
+        return None
+    return MediaCodec(codec.content_type, codec.encode, codec.decode)
+
+
+@_provider
+def _json(python_type):
+    try:
+        codec = get_codec(JSON, python_type)
+    except TypeError:
+        return None
+
+    def encode(value: Any) -> bytes:
+        return json.dumps(codec.encode(value), separators=(",", ":")).encode()
+
+    def decode(value: Union[bytes, bytearray]) -> Any:
+        try:
+            return codec.decode(json.loads(value))
+        except json.JSONDecodeError as jde:
+            raise ValueError(str(jde)) from jde
+
+    return MediaCodec("application/json", encode, decode)
+
+
+@_provider
+def _csv(python_type):
+    python_type = _strip(python_type)
+    origin = typing.get_origin(python_type)
+    args = typing.get_args(python_type)
+    if not isinstance(origin, type) or not issubclass(origin, Iterable) or len(args) != 1:
+        return None
+    item_type = _strip(args[0])
+    if not dataclasses.is_dataclass(item_type):
+        return None
+    hints = typing.get_type_hints(item_type)
+    codecs = {name: get_codec(String, hints[name]) for name in item_type.__annotations__}
+
+    def encode(value: Any) -> bytes:
+        sio = io.StringIO()
+        writer = DataclassWriter(sio, item_type)
+        writer.write_header()
+        writer.write_rows(value)
+        return sio.getvalue().encode()
+
+    def decode(value: Union[bytes, bytearray]) -> Any:
+        reader = csv.reader(io.StringIO(value.decode()))
+        names = next(reader, None) or ()
+        if unknown := set(names) - codecs.keys():
+            raise ValueError(f"unexpected columns: {', '.join(sorted(unknown))}")
+        items = (
+            item_type(**{n: codecs[n].decode(v) for n, v in zip(names, row)}) for row in reader
+        )
+        return origin(items) if origin not in {Iterable, typing.Iterable} else list(items)
+
+    return MediaCodec("text/csv; charset=UTF-8", encode, decode)
+
+
+@_lru_cache(maxsize=1024)
+def media_codecs(python_type: Any) -> tuple[MediaCodec]:
+    """
+    Return the media codecs that can represent values of the specified Python type. The
+    first media codec is the default representation.
+    """
+    result = {}
+    for provider in providers:
+        if (codec := provider(python_type)) is not None:
+            result.setdefault(codec.media_type, codec)
+    if not result:
+        raise TypeError(f"no media codec for {python_type}")
+    return tuple(result.values())
+
+
+def media_codec(python_type: Any, media_type: str) -> Optional[MediaCodec]:
+    """
+    Return the media codec that represents values of the specified Python type in a media
+    type, or None if the type cannot be represented in the media type.
+    """
+    media_type = _media_type(media_type)
+    return next((c for c in media_codecs(python_type) if c.media_type == media_type), None)
+
+
+def accepts(accept: Optional[str], media_type: str) -> bool:
+    """Return True if the value of an Accept header accepts the specified media type."""
+    if not accept:
+        return True
+    media_type = _media_type(media_type)
+    return any(_match(media_range, media_type) for media_range in _accept(accept))
+
+
+def _accept(value: str) -> list[str]:
+    """Parse Accept header value into media ranges, in descending order of preference."""
+    ranges = []
+    for index, item in enumerate(value.split(",")):
+        media_range, *params = item.split(";")
+        media_range = media_range.strip().lower()
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, val = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            specificity = 0 if media_range == "*/*" else 1 if media_range.endswith("/*") else 2
+            ranges.append((-q, -specificity, index, media_range))
+    return [r[3] for r in sorted(ranges)]
+
+
+def _match(media_range: str, media_type: str) -> bool:
+    if media_range == "*/*":
+        return True
+    if media_range.endswith("/*"):
+        return media_type.startswith(media_range[:-1])
+    return media_range == media_type
+
+
+@_lru_cache(maxsize=1024)
+def select(python_type: Any, accept: Optional[str]) -> MediaCodec:
+    """
+    Select the media codec to encode a value in a response.
+
+    Parameters:
+    • python_type: type of value to be encoded
+    • accept: value of the request Accept header, or None
+
+    If no media codec is acceptable, NotAcceptableError is raised.
+    """
+    codecs = media_codecs(python_type)
+    if not accept:
+        return codecs[0]
+    for media_range in _accept(accept):
+        for codec in codecs:
+            if _match(media_range, codec.media_type):
+                return codec
+    raise fondat.error.NotAcceptableError(
+        f"acceptable media types: {', '.join(c.media_type for c in codecs)}"
+    )
+
+
+@_lru_cache(maxsize=1024)
+def select_content_type(python_type: Any, content_type: Optional[str]) -> MediaCodec:
+    """
+    Select the media codec to decode a value in a request.
+
+    Parameters:
+    • python_type: type of value to be decoded
+    • content_type: value of the request Content-Type header, or None
+
+    Values of str, bytes and bytearray types are decoded by their binary codec, whatever the
+    content type. Otherwise, if the content type is not supported, UnsupportedMediaTypeError
+    is raised.
+    """
+    codecs = media_codecs(python_type)
+    if not content_type or _strip(python_type) in _raw_types:
+        return codecs[0]
+    media_type = _media_type(content_type)
+    for codec in codecs:
+        if codec.media_type == media_type:
+            return codec
+    if media_type == "application/octet-stream":  # generic binary; assume default
+        return codecs[0]
+    raise fondat.error.UnsupportedMediaTypeError(
+        f"supported media types: {', '.join(c.media_type for c in codecs)}"
+    )
@@ -7,6 +7,7 @@ from __future__ import annotations
 import dataclasses
 import fondat.codec
 import fondat.http
+import fondat.negotiation
 import fondat.resource
 import fondat.types
 import http
@@ -19,7 +20,7 @@ from datetime import date, datetime
 from decimal import Decimal
 from fondat.security import SecurityRequirement
 from fondat.types import NoneType
-from fondat.types import dataclass, is_instance, is_optional, is_subclass
+from fondat.types import async_iterator_type, dataclass, is_instance, is_optional, is_subclass
 from typing import Annotated, Any, Literal, Optional, TypedDict, Union
 from uuid import UUID
 
@@ -406,6 +407,10 @@ def _str_schema(*, python_type, annotated, **_):
         return Schema(type="string", **_kwargs(annotated), **kwargs)
 
 
+def _in_body(annotated):
+    return any(is_instance(a, type(fondat.http.InBody)) for a in annotated)
+
+
 @_provider
 def _bytes_schema(*, python_type, annotated, **_):
     if is_subclass(python_type, (bytes, bytearray)):
@@ -417,7 +422,7 @@ def _bytes_schema(*, python_type, annotated, **_):
                 kwargs["maxLength"] = annotation.value
         return Schema(
             type="string",
-            format="binary" if fondat.http.InBody in annotated else "byte",
+            format="binary" if _in_body(annotated) else "byte",
             **_kwargs(annotated),
             **kwargs,
         )
@@ -664,6 +669,15 @@ class Processor:
                 return returns
         return None
 
+    def content(self, hint):
+        """Return media type representations of a type, as negotiated in HTTP messages."""
+        schema = self.schema(hint)
+        try:
+            codecs = fondat.negotiation.media_codecs(hint)
+        except TypeError:
+            codecs = [fondat.codec.get_codec(fondat.codec.Binary, hint)]
+        return {codec.content_type: MediaType(schema=schema) for codec in codecs}
+
     def operation(self, tag, method):
         fondat_op = getattr(method, "_fondat_operation", None)
         if not fondat_op or not fondat_op.publish:
@@ -685,6 +699,15 @@ class Processor:
                     op.responses[str(http.HTTPStatus.NO_CONTENT.value)] = Response(
                         description="No content.",
                     )
+                elif (item_type := async_iterator_type(python_type)) is not None:
+                    schema = self.schema(item_type)
+                    op.responses[str(http.HTTPStatus.OK.value)] = Response(
+                        description=self.description(annotated) or "Event stream.",
+                        content={
+                            "text/event-stream": MediaType(schema=schema),
+                            "application/x-ndjson": MediaType(schema=schema),
+                        },
+                    )
                 else:
                     origin = typing.get_origin(python_type)
                     args = typing.get_args(python_type)
@@ -702,23 +725,36 @@ class Processor:
                         )
                     op.responses[str(http.HTTPStatus.OK.value)] = Response(
                         description=self.description(annotated) or "Response.",
-                        content={
-                            fondat.codec.get_codec(
-                                fondat.codec.Binary, hint
-                            ).content_type: MediaType(schema=self.schema(hint))
-                        },
+                        content=self.content(hint),
                     )
-            elif fondat.http.InBody in annotated:
+            elif _in_body(annotated):
                 param = parameters[name]
                 op.requestBody = RequestBody(
                     description=self.description(annotated),
-                    content={
-                        fondat.codec.get_codec(
-                            fondat.codec.Binary, hint
-                        ).content_type: MediaType(schema=self.schema(hint))
-                    },
+                    content=self.content(hint),
                     required=param.default is param.empty,
                 )
+            elif part := next(
+                (a for a in annotated if is_instance(a, fondat.http.InPart)), None
+            ):
+                param = parameters[name]
+                if not op.requestBody:
+                    op.requestBody = RequestBody(
+                        content={
+                            "multipart/form-data": MediaType(
+                                schema=Schema(type="object", properties={}, required=[])
+                            )
+                        },
+                    )
+                schema = op.requestBody.content["multipart/form-data"].schema
+                schema.properties[part.name] = (
+                    Schema(type="string", format="binary")
+                    if is_subclass(python_type, fondat.types.Stream)
+                    else self.schema(hint)
+                )
+                if param.default is param.empty and not is_optional(python_type):
+                    schema.required.append(part.name)
+                    op.requestBody.required = True
             else:
                 param = parameters[name]
                 if param.default is not param.empty:
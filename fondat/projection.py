@@ -0,0 +1,169 @@
+"""
+Module to select a subset of fields to be returned in a response.
+
+Fields are expressed as a comma-separated list of field names; fields of nested values are
+expressed as dot-delimited paths. For example, "id,name,address.city" selects the id and
+name fields of a value, and the city field of its address field. Field selection applies to
+the items of iterables, and to the values of optional types.
+
+When an HTTP application handles a request that selects fields, only the selected fields are
+encoded in the response. The selected fields are also available on the context stack while
+the operation is performed; resources can use requested_fields to limit the data they
+retrieve, such as the columns to select from a database table:
+
+@operation
+async def get(self) -> list[Item]:
+    columns = fondat.projection.requested_fields()
+    ...
+    return [row async for row in await table.select(columns=columns)]
+
+An operation that honours requested fields may return mappings of the requested fields in
+place of dataclass instances.
+"""
+
+import dataclasses
+import fondat.context as context
+import keyword
+import typing
+
+from collections.abc import Callable, Iterable, Mapping
+from fondat.codec import JSON, get_codec
+from fondat.negotiation import _lru_cache
+from fondat.types import NoneType, is_subclass
+from fondat.validation import validate
+from typing import Annotated, Any, Optional, Union
+
+
+def parse_fields(value: str) -> dict[str, Any]:
+    """
+    Parse a field selection expression into a tree of selected fields. Each key in the tree
+    is a field name; its value is a tree of selected nested fields, or None if the entire
+    field is selected.
+    """
+    tree = {}
+    for path in value.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        names = path.split(".")
+        if not all(names):
+            raise ValueError(f"invalid field: {path}")
+        node = tree
+        for name in names[:-1]:
+            if name in node and node[name] is None:
+                break  # entire field already selected
+            node = node.setdefault(name, {})
+        else:
+            node[names[-1]] = None
+    return tree
+
+
+def _attr(name: str) -> str:
+    return f"{name}_" if keyword.iskeyword(name) else name
+
+
+def _leaf(python_type: Any) -> Callable:
+    codec = get_codec(JSON, python_type)
+
+    def project(value):
+        validate(value, python_type)
+        return codec.encode(value)
+
+    return project
+
+
+def _projector(python_type: Any, tree: Optional[dict[str, Any]]) -> Callable:
+    if tree is None:
+        return _leaf(python_type)
+    if typing.get_origin(python_type) is Annotated:
+        python_type = typing.get_args(python_type)[0]
+    origin = typing.get_origin(python_type)
+    args = typing.get_args(python_type)
+    if origin is Union:
+        types = [arg for arg in args if arg is not NoneType]
+        if len(types) != 1:
+            raise ValueError(f"cannot select fields of {python_type}")
+        project = _projector(types[0], tree)
+        return lambda value: None if value is None else project(value)
+    if dataclasses.is_dataclass(python_type) or is_subclass(python_type, dict):
+        hints = typing.get_type_hints(python_type, include_extras=True)
+        projectors = {}
+        for name, subtree in tree.items():
+            if (attr := _attr(name)) not in hints:
+                raise ValueError(f"unknown field: {name}")
+            projectors[name] = (attr, _projector(hints[attr], subtree))
+
+        def project(value):
+            if isinstance(value, Mapping):
+                get = value.get
+            elif dataclasses.is_dataclass(value):
+                get = lambda attr: getattr(value, attr)
+            else:
+                raise TypeError(f"expecting {python_type}")
+            result = {}
+            for name, (attr, p) in projectors.items():
+                if (v := get(attr)) is not None:
+                    result[name] = p(v)
+            return result
+
+        return project
+    if is_subclass(origin, Iterable) and not is_subclass(origin, (str, Mapping)):
+        if origin is tuple and (len(args) != 2 or args[1] is not Ellipsis):
+            raise ValueError(f"cannot select fields of {python_type}")
+        if not args:
+            raise ValueError(f"cannot select fields of {python_type}")
+        project = _projector(args[0], tree)
+        return lambda value: [project(item) for item in value]
+    raise ValueError(f"cannot select fields of {python_type}")
+
+
+@_lru_cache(maxsize=1024)
+def projector(python_type: Any, fields: str) -> Callable:
+    """
+    Return a function that encodes the selected fields of a value into the JSON object model.
+
+    Parameters:
+    • python_type: type of value to be encoded
+    • fields: field selection expression
+
+    Selected values are validated as they are encoded. ValueError is raised if the fields
+    cannot be selected from the type.
+    """
+    return _projector(python_type, parse_fields(fields))
+
+
+def push(fields: str) -> context.StackContextManager:
+    """
+    Push selected fields onto the context stack, and return a context manager that will pop
+    them from the stack upon exit.
+    """
+    return context.push({"context": "fondat.projection", "fields": parse_fields(fields)})
+
+
+def requested_fields(path: str = None) -> Optional[set[str]]:
+    """
+    Return the names of fields selected for the response of the operation being performed,
+    or None if all fields are requested.
+
+    Parameters:
+    • path: dot-delimited path of nested field, or None for the top-level value
+
+    Fields are only returned to the operation performed to handle the request; operations it
+    calls in turn receive None.
+    """
+    operations = 0
+    for ctx in context.find():
+        if ctx["context"] == "fondat.operation":
+            operations += 1
+        elif ctx["context"] == "fondat.projection":
+            break
+    else:
+        return None
+    if operations > 1:
+        return None
+    node = ctx["fields"]
+    for name in path.split(".") if path else ():
+        node = node.get(name)
+        if node is None:
+            return None
+    return {_attr(name) for name in node}
@@ -0,0 +1,220 @@
+"""
+Module to expose time series of a simple monitor for scraping by Prometheus.
+
+Time series are rendered in the Prometheus text exposition format, or in the OpenMetrics
+text format if requested in the Accept header of the scrape request. Time series are rendered
+as follows:
+
+• counter: counter whose value is the value of the latest data point
+• absolute: counter whose value is the total of measured values since first rendered
+• gauge: gauge whose value is the mean of the latest data point, and "_min" and "_max"
+  gauges whose values are the minimum and maximum of the latest data point
+• histogram: summary with quantiles estimated from all retained data points, and sum and
+  count of measured values since first rendered
+
+The name of each metric is the name of the time series. Literal (non-regular expression)
+tag patterns of the time series, other than "name", are rendered as labels.
+
+Rendering is incremental: the rendered text of each time series is retained between scrapes,
+and is only rendered again if measurements were recorded in the time series since; if no
+time series changed, the previously rendered output is returned as is.
+"""
+
+import math
+import re
+
+from fondat.http import InHeader
+from fondat.monitoring import Histogram, Series, SimpleMonitor
+from fondat.resource import resource, operation
+from fondat.security import SecurityRequirement
+from fondat.types import BytesStream
+from typing import Annotated, Iterable, Optional
+
+
+PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+# quantiles to render for histogram time series
+quantiles = (0.5, 0.9, 0.99)
+
+
+def _name(name: str, pattern: str = r"[^a-zA-Z0-9_:]") -> str:
+    name = re.sub(pattern, "_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Entry:
+    """Rendered text and accumulated totals of a time series."""
+
+    __slots__ = ("name", "series", "labels", "version", "counted", "totals", "text")
+
+    def __init__(self, name: str, series: Series):
+        self.name = _name(name)
+        self.series = series
+        self.labels = {
+            _name(key, r"[^a-zA-Z0-9_]"): value
+            for key, value in series.literals.items()
+            if key != "name"
+        }
+        self.version = None
+        self.counted = {}  # data point → values counted in totals
+        self.totals = [0, 0]
+        self.text = {}  # openmetrics → rendered bytes
+
+    def update(self):
+        self.version = self.series.version
+        self.text.clear()
+        if self.series.type == "absolute":
+            values = lambda dp: (dp.value, 0)
+        elif self.series.type == "histogram":
+            values = lambda dp: (dp.count, dp.sum)
+        else:
+            return
+        counted = {}
+        for data_point in self.series.data:
+            current = counted[data_point] = values(data_point)
+            previous = self.counted.get(data_point, (0, 0))
+            self.totals[0] += current[0] - previous[0]
+            self.totals[1] += current[1] - previous[1]
+        self.counted = counted
+
+    def render(self, openmetrics: bool) -> bytes:
+        text = self.text.get(openmetrics)
+        if text is None:
+            text = self.text[openmetrics] = "".join(self._lines(openmetrics)).encode()
+        return text
+
+    def _lines(self, openmetrics: bool) -> Iterable[str]:
+        name = self.name
+        labels = _labels(self.labels)
+        type = self.series.type
+        if type in ("counter", "absolute"):
+            if type == "counter":
+                if (data_point := self.series.latest) is None:
+                    return
+                value = data_point.value
+            else:
+                value = self.totals[0]
+            family = name[:-6] if name.endswith("_total") else name
+            yield f"# TYPE {family if openmetrics else f'{family}_total'} counter\n"
+            yield f"{family}_total{labels} {_number(value)}\n"
+        elif type == "gauge":
+            if (data_point := self.series.latest) is None:
+                return
+            mean = data_point.sum / data_point.count if data_point.count else None
+            for suffix, value in (
+                ("", mean),
+                ("_min", data_point.min),
+                ("_max", data_point.max),
+            ):
+                yield f"# TYPE {name}{suffix} gauge\n"
+                yield f"{name}{suffix}{labels} {_number(value)}\n"
+        elif type == "histogram":
+            merged = Histogram(0, self.series.relative_error)
+            for data_point in self.series.data:
+                merged.merge(data_point)
+            yield f"# TYPE {name} summary\n"
+            for q in quantiles:
+                q_labels = _labels({**self.labels, "quantile": _number(float(q))})
+                yield f"{name}{q_labels} {_number(merged.quantile(q))}\n"
+            yield f"{name}_sum{labels} {_number(self.totals[1])}\n"
+            yield f"{name}_count{labels} {_number(self.totals[0])}\n"
+
+
+class Renderer:
+    """
+    Renders the time series of a simple monitor in a Prometheus exposition format.
+
+    Parameters:
+    • monitor: monitor whose time series are to be rendered
+
+    Totals of absolute and histogram time series accumulate between calls to render; to
+    render monotonic counters, the same renderer should be used for each scrape.
+    """
+
+    def __init__(self, monitor: SimpleMonitor):
+        self.monitor = monitor
+        self._entries = {}  # series name → _Entry
+        self._output = {}  # openmetrics → rendered bytes
+
+    def render(self, openmetrics: bool = False) -> bytes:
+        """
+        Render time series, and return the rendered text.
+
+        Parameters:
+        • openmetrics: render in OpenMetrics text format, rather than Prometheus text format
+        """
+        changed = False
+        entries = self._entries
+        for name, series in self.monitor.series.items():
+            entry = entries.get(name)
+            if entry is None or entry.series is not series:
+                entry = entries[name] = _Entry(name, series)
+            if entry.version != series.version:
+                entry.update()
+                changed = True
+        if len(entries) != len(self.monitor.series):
+            for name in entries.keys() - self.monitor.series.keys():
+                del entries[name]
+            changed = True
+        if changed:
+            self._output.clear()
+        output = self._output.get(openmetrics)
+        if output is None:
+            chunks = [entry.render(openmetrics) for entry in entries.values()]
+            if openmetrics:
+                chunks.append(b"# EOF\n")
+            output = self._output[openmetrics] = b"".join(chunks)
+        return output
+
+
+def metrics_resource(
+    monitor: SimpleMonitor,
+    publish: bool = True,
+    security: Iterable[SecurityRequirement] = None,
+):
+    """
+    Return a new resource that exposes the time series of a simple monitor for scraping.
+
+    Parameters:
+    • monitor: monitor whose time series are to be exposed
+    • publish: publish the operation in documentation
+    • security: security requirements to apply to the operation
+    """
+
+    renderer = Renderer(monitor)
+
+    @resource
+    class MetricsResource:
+        @operation(publish=publish, security=security)
+        async def get(
+            self, accept: Annotated[Optional[str], InHeader("Accept")]
+        ) -> BytesStream:
+            """Return time series in Prometheus or OpenMetrics text exposition format."""
+            openmetrics = accept is not None and "application/openmetrics-text" in accept
+            return BytesStream(
+                renderer.render(openmetrics), OPENMETRICS if openmetrics else PROMETHEUS
+            )
+
+    MetricsResource.__qualname__ = "MetricsResource"
+
+    return MetricsResource()
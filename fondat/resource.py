@@ -10,13 +10,18 @@ that is decorated as a resource.
 """
 
 import asyncio
+import concurrent.futures
 import functools
 import inspect
+import fondat.cache
 import fondat.context as context
+import fondat.deadline as deadline
+import fondat.executor
 import fondat.lazy
 import fondat.monitoring as monitoring
 import fondat.validation
 import logging
+import random
 import threading
 import types
 import wrapt
@@ -24,12 +29,22 @@ import wrapt
 from collections.abc import Iterable, Mapping
 from fondat.error import ForbiddenError, UnauthorizedError
 from fondat.security import SecurityRequirement
-from typing import Any, Literal
+from typing import Any, Literal, Union
 
 
 _logger = logging.getLogger(__name__)
 
 
+# fraction of operation calls to record in monitors; 0 disables operation instrumentation
+sample_rate = 1.0
+
+# skip authorization of operations called while performing another operation
+trust_internal = False
+
+# type of operation duration measurement to record: "gauge" or "histogram"
+duration_type = "gauge"
+
+
 def _summary(function):
     """
     Derive summary information from a function's docstring or name. The summary is the first
@@ -46,12 +61,13 @@ def _summary(function):
     return " ".join(result)
 
 
-async def authorize(security):
+async def authorize(security, operation: str = None):
     """
     Peform authorization of an operation.
 
     Parameters:
     • security: iterable of security requirements
+    • operation: name of operation being authorized, to memoize authorization
 
     Security exceptions are: UnauthorizedError and ForbiddenError.
 
@@ -63,14 +79,28 @@ async def authorize(security):
     immediately re-raised.  If security requrements raise a mixture of ForbiddenError and
     UnauthorizedError exceptions, then the first ForbiddenError is re-raised. If only
     UnautorizedError exceptions are raised, then the first UnauthorizedError is re-raised.
+
+    If an operation name is supplied and a security scope is established on the context
+    stack, authorization granted by a memoizable requirement is recorded in the scope, and
+    is not performed again for the operation; see fondat.security.scope.
     """
     exception = None
+    authorized = None
+    if operation is not None and (scope := context.last(context="fondat.security")):
+        authorized = scope["authorized"]
     for requirement in security or ():
+        key = (
+            (requirement, operation) if authorized is not None and requirement.memoize else None
+        )
+        if key is not None and key in authorized:
+            return
         try:
             await requirement.authorize()
+            if key is not None:
+                authorized.add(key)
             return  # security requirement authorized the operation
         except ForbiddenError as fe:
-            if not isinstance(exception, ForbiddenException):
+            if not isinstance(exception, ForbiddenError):
                 exception = fe
         except UnauthorizedError as ue:
             if not exception:
@@ -107,6 +137,37 @@ def is_operation(obj_or_type: Any) -> bool:
     return getattr(obj_or_type, "_fondat_operation", None) is not None
 
 
+def _invoke_static(instance, name, args, kwargs):
+    """Invoke the undecorated function of an operation; performed in a worker process."""
+    function = inspect.unwrap(inspect.getattr_static(instance, name))
+    return function(instance, *args, **kwargs)
+
+
+def _offload(function, executor):
+    """Return a coroutine function that calls a method function in an executor."""
+
+    @functools.wraps(function)
+    async def offload(self, *args, **kwargs):
+        if isinstance(fondat.executor.get(executor), concurrent.futures.ProcessPoolExecutor):
+            return await fondat.executor.run(
+                executor, _invoke_static, self, function.__name__, args, kwargs
+            )
+        return await fondat.executor.run(executor, function, self, *args, **kwargs)
+
+    return offload
+
+
+def _internal() -> bool:
+    """Return if called by another operation, within the same request."""
+    for value in context.find():
+        ctx = value.get("context")
+        if ctx == "fondat.operation":
+            return True
+        if ctx == "fondat.request":
+            return False
+    return False
+
+
 def operation(
     wrapped=None,
     *,
@@ -115,6 +176,7 @@ def operation(
     publish: bool = True,
     deprecated: bool = False,
     validate: bool = True,
+    executor: Union[Literal["thread", "process"], concurrent.futures.Executor] = None,
 ):
     """
     Decorate a resource coroutine that performs an operation.
@@ -125,24 +187,51 @@ def operation(
     • publish: publish the operation in documentation
     • deprecated: declare the operation as deprecated
     • validate: validate method arguments
+    • executor: executor, or name of pool, to perform the operation in  [event loop]
 
     Resource operations should correlate to HTTP method names, named in lower case. For
     example: get, put, post, delete, patch. Operation type is inferred from method name.
+
+    Each call to an operation is recorded in monitors as an "operation_duration_seconds"
+    measurement; its data point count is the number of calls. The duration_type module
+    variable selects whether it is recorded as a gauge or histogram measurement. The
+    sample_rate module variable controls the fraction of calls that are recorded. If the
+    trust_internal module variable is true, security requirements are not authorized for
+    operations called while performing another operation; operations called to handle a
+    request dispatched by an HTTP application (e.g. a batch sub-request) are always
+    authorized.
+
+    When a mutation operation succeeds, cached results of its resource are invalidated; see
+    the fondat.cache module.
+
+    If an executor is specified, the decorated method can be a function or a coroutine; it is
+    performed in the executor, while the event loop continues to perform other work. To
+    perform the operation in a process, its resource instance, arguments and result must be
+    picklable. See the fondat.executor module.
     """
 
     if wrapped is None:
         return functools.partial(
             operation,
+            op_type=op_type,
             publish=publish,
             security=security,
             deprecated=deprecated,
             validate=validate,
+            executor=executor,
         )
 
-    if not asyncio.iscoroutinefunction(wrapped):
+    if executor is not None:
+        if not isinstance(executor, concurrent.futures.Executor) and executor not in {
+            "thread",
+            "process",
+        }:
+            raise ValueError(f"unknown executor: {executor}")
+    elif not asyncio.iscoroutinefunction(wrapped):
         raise TypeError("operation must be a coroutine")
 
-    op_type = op_type or "query" if wrapped.__name__ == "get" else "mutation"
+    op_type = op_type or ("query" if wrapped.__name__ == "get" else "mutation")
+    mutation = op_type == "mutation"
     name = wrapped.__name__
     description = wrapped.__doc__ or name
     summary = _summary(wrapped)
@@ -155,16 +244,32 @@ def operation(
 
     @wrapt.decorator
     async def wrapper(wrapped, instance, args, kwargs):
-        operation = getattr(wrapped, "_fondat_operation")
+        security = wrapped._fondat_operation.security
         res_name = f"{instance.__class__.__module__}.{instance.__class__.__qualname__}"
         op_name = wrapped.__name__
-        tags = {"resource": res_name, "operation": op_name}
-        _logger.debug("%s.%s(args=%s, kwargs=%s)", res_name, op_name, args, kwargs)
-        with context.push({"context": "fondat.operation", **tags}):
-            async with monitoring.timer({"name": "operation_duration_seconds", **tags}):
-                async with monitoring.counter({"name": "operation_calls_total", **tags}):
-                    await authorize(operation.security)
-                    return await wrapped(*args, **kwargs)
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug("%s.%s(args=%s, kwargs=%s)", res_name, op_name, args, kwargs)
+        if security and trust_internal and _internal():
+            security = None  # called by another operation
+
+        async def call():
+            if security:
+                await authorize(security, f"{res_name}.{op_name}")
+            result = await deadline.enforce(wrapped(*args, **kwargs))
+            if mutation:
+                fondat.cache.invalidate(instance)
+            return result
+
+        with context.push(context="fondat.operation", resource=res_name, operation=op_name):
+            if sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate):
+                tags = {"name": "operation_duration_seconds", "resource": res_name}
+                tags["operation"] = op_name
+                async with monitoring.timer(tags, type=duration_type):
+                    return await call()
+            return await call()
+
+    if executor is not None:
+        wrapped = _offload(wrapped, executor)
 
     wrapped._fondat_operation = types.SimpleNamespace(
         op_type=op_type,
@@ -244,7 +349,9 @@ def inner(
 
     functools.update_wrapper(proxy, wrapped)
     proxy.__name__ = method
-    proxy = operation(proxy, publish=publish, security=security, validate=False)
+    proxy = operation(
+        proxy, op_type=op_type, publish=publish, security=security, validate=False
+    )
     setattr(Inner, method, proxy)
     setattr(Inner, "__call__", proxy)
 
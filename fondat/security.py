@@ -1,8 +1,13 @@
 """Module for authentication and authorization of resource operations."""
 
+import collections
 import fondat.context
+import hashlib
+import time
 
+from collections.abc import Awaitable, Callable
 from fondat.error import UnauthorizedError
+from typing import Any, Optional
 
 
 class SecurityScheme:
@@ -42,8 +47,15 @@ class SecurityRequirement:
     Parameters:
     • scheme: security scheme to associate with the security requirement
     • scope: scheme-specific scope names required for authorization
+
+    Within a security scope, authorization granted by a requirement for an operation is
+    memoized, and is not performed again for the operation within the scope. A requirement
+    whose authorization depends on how the operation is called should set the memoize
+    attribute to False.
     """
 
+    memoize = True
+
     def __init__(self, scheme: SecurityScheme = None, scopes=[]):
         super().__init__()
         self.scheme = scheme
@@ -100,6 +112,8 @@ class CallerSecurityRequirement(SecurityRequirement):
     • operation: String containing name of operation.
     """
 
+    memoize = False
+
     def __init__(self, resource, operation):
         self.resource = resource
         self.operation = operation
@@ -108,3 +122,72 @@ class CallerSecurityRequirement(SecurityRequirement):
         ctx = fondat.context.last(context="fondat.operation")
         if ctx["resource"] != self.resource or ctx["operation"] != self.operation:
             raise UnauthorizedError
+
+
+def scope() -> fondat.context.StackContextManager:
+    """
+    Push a new security scope onto the context stack, and return a context manager that will
+    pop it from the stack upon exit. Authorization granted to operations is memoized within
+    the scope; an HTTP application establishes a security scope for each request it handles.
+    """
+    return fondat.context.push({"context": "fondat.security", "authorized": set()})
+
+
+class AuthenticationCache:
+    """
+    Caches the results of authenticating credentials.
+
+    Parameters:
+    • ttl: number of seconds to cache an authentication result
+    • size: maximum number of authentication results to cache
+    • failures: cache failed authentication results
+
+    Results are keyed by a SHA-256 digest of the credentials; the credentials themselves are
+    not retained. A cached result can be returned after the credentials are revoked, until
+    it expires; the time-to-live should be chosen accordingly.
+    """
+
+    def __init__(self, ttl: float = 60.0, size: int = 1000, failures: bool = False):
+        self.ttl = ttl
+        self.size = size
+        self.failures = failures
+        self._entries = collections.OrderedDict()  # digest → (expires, result)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _digest(credentials: tuple[Any]) -> bytes:
+        sha = hashlib.sha256()
+        for credential in credentials:
+            value = credential if isinstance(credential, bytes) else str(credential).encode()
+            sha.update(len(value).to_bytes(8, "big"))
+            sha.update(value)
+        return sha.digest()
+
+    async def authenticate(
+        self, authenticate: Callable[..., Awaitable[Optional[Any]]], *credentials: Any
+    ) -> Optional[Any]:
+        """
+        Return the cached result of authenticating credentials, or the result of calling the
+        authenticate coroutine function with the credentials if no result is cached.
+        """
+        digest = self._digest(credentials)
+        now = time.monotonic()
+        entry = self._entries.get(digest)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(digest)
+                return entry[1]
+            del self._entries[digest]
+        result = await authenticate(*credentials)
+        if result is not None or self.failures:
+            self._entries[digest] = (now + self.ttl, result)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Remove all cached authentication results."""
+        self._entries.clear()
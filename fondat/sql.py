@@ -316,6 +316,25 @@ class Table:
             except StopAsyncIteration:
                 return None
 
+    async def read_many(self, keys: Iterable[Any]) -> dict[Any, Any]:
+        """
+        Return a dictionary mapping keys to table rows. Keys of rows not found are omitted.
+
+        All rows are read in a single statement; the number of keys should not exceed the
+        number of parameters the database allows in a statement.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        pk_type = self.columns[self.pk]
+        where = Statement()
+        where.text(f"{self.pk} IN (")
+        where.parameters((Parameter(key, pk_type) for key in keys), ", ")
+        where.text(")")
+        async with self.database.transaction():
+            results = await self.select(where=where)
+            return {row[self.pk]: self.schema(**row) async for row in results}
+
     async def update(self, value: Any) -> None:
         """Update table row."""
         key = getattr(value, self.pk)
@@ -3,18 +3,26 @@
 from __future__ import annotations
 
 import aiosqlite
+import asyncio
 import contextlib
 import contextvars
 import fondat.codec
+import fondat.deadline
+import fondat.monitoring
 import fondat.sql
 import functools
+import json
 import logging
 import sqlite3
+import time
 import typing
 
 from asyncio.exceptions import CancelledError
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from datetime import datetime
 from fondat.codec import Codec, String
+from fondat.error import GatewayTimeoutError
 from fondat.types import affix_type_hints, is_subclass
 from fondat.sql import Statement
 from fondat.validation import validate_arguments
@@ -214,13 +222,26 @@ def _text_codec_provider(python_type):
     return TextCodec()
 
 
+# number of SQLite virtual machine instructions between deadline checks
+_PROGRESS_INSTRUCTIONS = 1000
+
+
+def _expired(deadline: float) -> int:
+    return 1 if time.monotonic() >= deadline else 0
+
+
+def _deadline_exceeded(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
 class _Results(AsyncIterator[Any]):
 
-    __slots__ = ("statement", "results", "codecs")
+    __slots__ = ("statement", "results", "codecs", "deadline")
 
-    def __init__(self, statement, results):
+    def __init__(self, statement, results, deadline):
         self.statement = statement
         self.results = results
+        self.deadline = deadline
         self.codecs = {
             k: get_codec(t)
             for k, t in typing.get_type_hints(statement.result, include_extras=True).items()
@@ -230,7 +251,12 @@ class _Results(AsyncIterator[Any]):
         return self
 
     async def __anext__(self):
-        row = await self.results.__anext__()
+        try:
+            row = await self.results.__anext__()
+        except sqlite3.OperationalError as oe:
+            if _deadline_exceeded(self.deadline):
+                raise GatewayTimeoutError("deadline exceeded") from oe
+            raise
         return self.statement.result(**{k: self.codecs[k].decode(row[k]) for k in self.codecs})
 
 
@@ -240,6 +266,9 @@ class Database(fondat.sql.Database):
 
     Parameter:
     • path: path to SQLite database file
+
+    If a deadline is in effect when a statement is executed, the statement is interrupted
+    when the deadline is reached, and GatewayTimeoutError is raised.
     """
 
     __slots__ = ("path", "_connection")
@@ -309,9 +338,262 @@ class Database(fondat.sql.Database):
             else:
                 text.append("?")
                 args.append(get_codec(fragment.python_type).encode(fragment.value))
-        results = await connection.execute("".join(text), args)
+        deadline = fondat.deadline.get()
+        if deadline is not None:
+            if _deadline_exceeded(deadline):
+                raise GatewayTimeoutError("deadline exceeded")
+            if getattr(connection, "_fondat_deadline", None) != deadline:
+                await connection.set_progress_handler(
+                    functools.partial(_expired, deadline), _PROGRESS_INSTRUCTIONS
+                )
+                connection._fondat_deadline = deadline
+        elif getattr(connection, "_fondat_deadline", None) is not None:
+            await connection.set_progress_handler(None, 0)  # clear handler of prior deadline
+            connection._fondat_deadline = None
+        try:
+            results = await connection.execute("".join(text), args)
+        except sqlite3.OperationalError as oe:
+            if _deadline_exceeded(deadline):
+                raise GatewayTimeoutError("deadline exceeded") from oe
+            raise
+        except CancelledError:
+            await connection.interrupt()  # stop running statement
+            raise
         if statement.result is not None:  # expecting a result
-            return _Results(statement, results.__aiter__())
+            return _Results(statement, results.__aiter__(), deadline)
 
     def get_codec(self, python_type: Any) -> SQLiteCodec:
         return get_codec(python_type)
+
+
+# default tiers of monitor aggregates: interval → retention period, in seconds
+_tiers = {60: 172800, 3600: 7776000, 86400: 157680000}  # 2 days, 90 days, 5 years
+
+
+@dataclass
+class _Aggregate:
+    bucket: int
+    type: str
+    min: float
+    max: float
+    sum: float
+    count: int
+
+
+def _merge(aggregates: dict[tuple, list], key: tuple, aggregate: list) -> None:
+    if (existing := aggregates.get(key)) is None:
+        aggregates[key] = list(aggregate)
+    else:
+        existing[0] = min(existing[0], aggregate[0])
+        existing[1] = max(existing[1], aggregate[1])
+        existing[2] += aggregate[2]
+        existing[3] += aggregate[3]
+
+
+def _number(value: float) -> Union[int, float]:
+    return int(value) if value.is_integer() else value
+
+
+class SQLiteMonitor:
+    """
+    A monitor that stores aggregates of recorded measurements in a SQLite database.
+
+    Parameters:
+    • database: SQLite database to store aggregates in
+    • prefix: prefix of names of tables to store aggregates in
+    • tiers: mapping of tier intervals to retention periods, in seconds  [see below]
+    • batch: maximum number of aggregates to buffer before writing them to the database
+    • interval: maximum number of seconds to buffer aggregates before writing them
+
+    Measurements are aggregated by tags and type into tiers of fixed intervals. By default,
+    1 minute intervals are retained for 2 days, 1 hour intervals for 90 days and 1 day
+    intervals for 5 years. A retention period of None retains intervals indefinitely. Tier
+    intervals must be multiples of the finest tier interval. Each aggregate stores the
+    minimum, maximum, sum and count of values measured in its interval.
+
+    Recorded measurements are aggregated in memory at the finest tier interval, and are
+    rolled up into all tiers in a single transaction when the buffer is full, when its
+    interval elapses, or when the flush method is called. Intervals older than the retention
+    period of their tier are deleted when aggregates are written. If writing fails,
+    aggregates remain buffered, to be written in the next transaction. The transaction is
+    performed by the record call that triggers it, which waits for the database; a Pipeline
+    can be used to record measurements in this monitor from a background task instead.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        prefix: str = "monitoring",
+        tiers: dict[int, Optional[int]] = None,
+        batch: int = 1000,
+        interval: float = 10.0,
+    ):
+        super().__init__()
+        self.database = database
+        self.prefix = prefix
+        self.tiers = dict(sorted((tiers or _tiers).items()))
+        self.batch = batch
+        self.interval = interval
+        self._finest = next(iter(self.tiers))
+        if any(interval % self._finest for interval in self.tiers):
+            raise ValueError("tier intervals must be multiples of the finest tier interval")
+        self._pending = {}  # (tags, type, start) → [min, max, sum, count]
+        self._flushed = time.monotonic()
+        self._created = False
+        self._lock = None
+
+    def _add(self, measurement: fondat.monitoring.Measurement):
+        epoch = int(fondat.monitoring._epoch(measurement))
+        key = (
+            json.dumps(measurement.tags, sort_keys=True),
+            measurement.type,
+            epoch - epoch % self._finest,
+        )
+        value = measurement.value
+        _merge(self._pending, key, (value, value, value, 1))
+
+    async def _check(self):
+        if (
+            len(self._pending) >= self.batch
+            or time.monotonic() - self._flushed >= self.interval
+        ):
+            await self.flush()
+
+    async def record(self, measurement: fondat.monitoring.Measurement):
+        """Record a measurement."""
+        self._add(measurement)
+        await self._check()
+
+    async def record_many(self, measurements: Iterable[fondat.monitoring.Measurement]):
+        """Record multiple measurements."""
+        for measurement in measurements:
+            self._add(measurement)
+        await self._check()
+
+    def _table(self, interval: int) -> str:
+        return f"{self.prefix}_{interval}"
+
+    async def _create(self):
+        if self._created:
+            return
+        for interval in self.tiers:
+            table = self._table(interval)
+            for text in (
+                f"CREATE TABLE IF NOT EXISTS {table} (tags TEXT, type TEXT, start INTEGER, "
+                "min REAL, max REAL, sum REAL, count INTEGER, "
+                "PRIMARY KEY (tags, type, start));",
+                f"CREATE INDEX IF NOT EXISTS {table}_start ON {table} (start);",
+            ):
+                stmt = Statement()
+                stmt.text(text)
+                await self.database.execute(stmt)
+        self._created = True
+
+    async def _upsert(self, table: str, rows: dict[tuple, list]):
+        items = list(rows.items())
+        for index in range(0, len(items), 100):  # 7 parameters per row
+            stmt = Statement()
+            stmt.text(f"INSERT INTO {table} (tags, type, start, min, max, sum, count) VALUES ")
+            for n, ((tags, type, start), (min_, max_, sum_, count)) in enumerate(
+                items[index : index + 100]
+            ):
+                stmt.text(", (" if n else "(")
+                stmt.param(tags, str)
+                stmt.text(", ")
+                stmt.param(type, str)
+                stmt.text(", ")
+                stmt.param(start, int)
+                for value in (min_, max_, sum_):
+                    stmt.text(", ")
+                    stmt.param(float(value), float)
+                stmt.text(", ")
+                stmt.param(count, int)
+                stmt.text(")")
+            stmt.text(
+                " ON CONFLICT (tags, type, start) DO UPDATE SET min = min(min, excluded.min), "
+                "max = max(max, excluded.max), sum = sum + excluded.sum, "
+                "count = count + excluded.count;"
+            )
+            await self.database.execute(stmt)
+
+    async def flush(self):
+        """Write buffered aggregates to the database, and delete expired intervals."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed = time.monotonic()
+            now = int(time.time())
+            try:
+                async with self.database.transaction():
+                    await self._create()
+                    for interval, retention in self.tiers.items():
+                        rows = {}
+                        for (tags, type, start), aggregate in pending.items():
+                            _merge(rows, (tags, type, start - start % interval), aggregate)
+                        await self._upsert(self._table(interval), rows)
+                        if retention is not None:
+                            stmt = Statement()
+                            stmt.text(f"DELETE FROM {self._table(interval)} WHERE start < ")
+                            stmt.param(now - retention, int)
+                            stmt.text(";")
+                            await self.database.execute(stmt)
+            except BaseException:
+                self._created = False
+                for key, aggregate in pending.items():  # retain to write in next flush
+                    _merge(self._pending, key, aggregate)
+                raise
+
+    async def query(
+        self,
+        tags: dict[str, str],
+        start: datetime,
+        end: datetime,
+        resolution: int = None,
+    ) -> list[Any]:
+        """
+        Return data points of measurements with the specified tags, ordered by timestamp.
+
+        Parameters:
+        • tags: tags of measurements to query
+        • start: include intervals beginning at or after date and time
+        • end: include intervals beginning before date and time
+        • resolution: interval between data points, in seconds  [finest tier interval]
+
+        Data points are read from the coarsest tier whose interval evenly divides the
+        resolution. Counter and absolute measurements are returned in Counter and Absolute
+        data points; gauge and histogram measurements are returned in Gauge data points.
+        Buffered aggregates are written to the database before querying.
+        """
+        resolution = resolution or self._finest
+        if resolution % self._finest:
+            raise ValueError("resolution must be a multiple of the finest tier interval")
+        interval = max(i for i in self.tiers if resolution % i == 0)
+        await self.flush()
+        stmt = Statement(result=_Aggregate)
+        stmt.text(f"SELECT start - start % {resolution} AS bucket, type, min(min) AS min, ")
+        stmt.text("max(max) AS max, sum(sum) AS sum, sum(count) AS count ")
+        stmt.text(f"FROM {self._table(interval)} WHERE tags = ")
+        stmt.param(json.dumps(tags, sort_keys=True), str)
+        stmt.text(" AND start >= ")
+        stmt.param(int(start.timestamp()), int)
+        stmt.text(" AND start < ")
+        stmt.param(int(end.timestamp()), int)
+        stmt.text(" GROUP BY bucket, type ORDER BY bucket;")
+        data_points = []
+        async with self.database.transaction():
+            async for row in await self.database.execute(stmt):
+                if row.type == "counter":
+                    data_point = fondat.monitoring.Counter(row.bucket)
+                    data_point.value = _number(row.max)
+                elif row.type == "absolute":
+                    data_point = fondat.monitoring.Absolute(row.bucket)
+                    data_point.value = _number(row.sum)
+                else:
+                    data_point = fondat.monitoring.Gauge(row.bucket)
+                    data_point.min = _number(row.min)
+                    data_point.max = _number(row.max)
+                    data_point.sum = _number(row.sum)
+                    data_point.count = row.count
+                data_points.append(data_point)
+        return data_points
@@ -1,8 +1,10 @@
 """Module to to manage various types."""
 
+import collections.abc
 import dataclasses
 import functools
 import sys
+import tempfile
 import typing
 
 from collections.abc import AsyncIterator, Iterable, Mapping
@@ -125,8 +127,13 @@ class Stream(AsyncIterator[Union[bytes, bytearray]]):
     Parameter and attribute:
     • content_type: the media type of the stream
     • content_length: the length of the content, if known
+
+    If the flush class attribute is true, each chunk of content should be sent to the
+    recipient as soon as it is read, rather than being buffered.
     """
 
+    flush = False
+
     def __init__(self, content_type: str = "application/octet-stream", content_length=None):
         self.content_type = content_type
         self.content_length = content_length
@@ -138,7 +145,40 @@ class Stream(AsyncIterator[Union[bytes, bytearray]]):
         raise NotImplementedError
 
 
-class BytesStream(Stream):
+class SeekableStream(Stream):
+    """
+    Abstract base class to represent a stream whose content can be read from any position.
+
+    Parameter and attribute:
+    • content_type: the media type of the stream
+    • content_length: the length of the content
+    • etag: entity tag that identifies the version of the content, or None
+
+    A seekable stream allows a byte range of its content to be read without reading the
+    content that precedes it.
+    """
+
+    def __init__(
+        self,
+        content_type: str = "application/octet-stream",
+        content_length: int = None,
+        etag: str = None,
+    ):
+        super().__init__(content_type, content_length)
+        self.etag = etag
+
+    def slice(self, offset: int, length: int) -> Stream:
+        """
+        Return a new stream to read a range of the content.
+
+        Parameters:
+        • offset: position in content of first byte to read
+        • length: number of bytes to read
+        """
+        raise NotImplementedError
+
+
+class BytesStream(SeekableStream):
     """Expose a bytes object as an asynchronous byte stream."""
 
     def __init__(
@@ -156,6 +196,58 @@ class BytesStream(Stream):
         self._content = None
         return result
 
+    def slice(self, offset: int, length: int) -> Stream:
+        return BytesStream(self._content[offset : offset + length], self.content_type)
+
+
+class SpooledStream(Stream):
+    """
+    Stream whose content is buffered in memory until it exceeds a maximum size, after which
+    it is buffered in a temporary file.
+
+    Parameters:
+    • content_type: the media type of the stream
+    • max_size: maximum number of bytes to buffer in memory
+    • block_size: maximum number of bytes to read in each block
+
+    Content is written to the stream, then read by iterating over it. The temporary file is
+    closed once all content is read, or when the stream is closed.
+    """
+
+    def __init__(
+        self,
+        content_type: str = "application/octet-stream",
+        max_size: int = 1048576,
+        block_size: int = 131072,
+    ):
+        super().__init__(content_type, 0)
+        self._file = tempfile.SpooledTemporaryFile(max_size)
+        self._block_size = block_size
+        self._reading = False
+
+    def write(self, content: Union[bytes, bytearray]) -> None:
+        """Write content to the end of the stream."""
+        if self._reading:
+            raise RuntimeError("cannot write to stream being read")
+        self._file.write(content)
+        self.content_length += len(content)
+
+    def close(self) -> None:
+        """Close the stream, discarding any unread content."""
+        self._file.close()
+
+    async def __anext__(self) -> bytes:
+        if not self._reading:
+            self._file.seek(0)
+            self._reading = True
+        if self._file.closed:
+            raise StopAsyncIteration
+        block = self._file.read(self._block_size)
+        if not block:
+            self._file.close()
+            raise StopAsyncIteration
+        return block
+
 
 class Description:
     """Type annotation to provide a textual description."""
@@ -215,3 +307,17 @@ def is_instance(obj, class_or_tuple):
         return isinstance(obj, class_or_tuple)
     except:
         return False
+
+
+_async_iterator_types = {
+    collections.abc.AsyncIterator,
+    collections.abc.AsyncIterable,
+    collections.abc.AsyncGenerator,
+}
+
+
+def async_iterator_type(hint):
+    """Return the item type of an asynchronous iterator type, or None if not such a type."""
+    if typing.get_origin(hint) in _async_iterator_types:
+        return typing.get_args(hint)[0]
+    return None
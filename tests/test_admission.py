@@ -0,0 +1,138 @@
+import pytest
+
+import asyncio
+import fondat.monitoring
+import http
+
+from fondat.admission import AdmissionController, header_priority
+from fondat.error import ServiceUnavailableError, TooManyRequestsError
+from fondat.http import Application, Request
+from fondat.resource import resource, operation
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@resource
+class Resource:
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.calls = []
+
+    @operation
+    async def get(self) -> str:
+        self.calls.append("get")
+        await self.gate.wait()
+        return "get"
+
+    @operation
+    async def post(self) -> str:
+        self.calls.append("post")
+        await self.gate.wait()
+        return "post"
+
+
+def _request(method="GET", **headers):
+    request = Request(method=method, path="/")
+    for key, value in headers.items():
+        request.headers[key] = value
+    return request
+
+
+async def test_shed_when_queue_full():
+    res = Resource()
+    app = Application(res, admission=AdmissionController(limit=1, retry_after=5))
+    first = asyncio.create_task(app.handle(_request()))
+    await asyncio.sleep(0)
+    response = await app.handle(_request())
+    assert response.status == http.HTTPStatus.SERVICE_UNAVAILABLE.value
+    assert response.headers["Retry-After"] == "5"
+    res.gate.set()
+    assert (await first).status == http.HTTPStatus.OK.value
+
+
+async def test_shed_status():
+    res = Resource()
+    controller = AdmissionController(limit=1, status=TooManyRequestsError.status)
+    app = Application(res, admission=controller)
+    first = asyncio.create_task(app.handle(_request()))
+    await asyncio.sleep(0)
+    response = await app.handle(_request())
+    assert response.status == http.HTTPStatus.TOO_MANY_REQUESTS.value
+    res.gate.set()
+    await first
+
+
+async def test_queue_timeout():
+    res = Resource()
+    app = Application(res, admission=AdmissionController(limit=1, queue=1, timeout=0.01))
+    first = asyncio.create_task(app.handle(_request()))
+    await asyncio.sleep(0)
+    response = await app.handle(_request())
+    assert response.status == http.HTTPStatus.SERVICE_UNAVAILABLE.value
+    assert app.admission.queued == 0
+    res.gate.set()
+    await first
+    assert app.admission.active == 0
+
+
+async def test_queue_priority():
+    res = Resource()
+    app = Application(res, admission=AdmissionController(limit=1, queue=2))
+    first = asyncio.create_task(app.handle(_request()))
+    await asyncio.sleep(0)
+    mutation = asyncio.create_task(app.handle(_request("POST")))
+    await asyncio.sleep(0)
+    query = asyncio.create_task(app.handle(_request()))
+    await asyncio.sleep(0)
+    assert app.admission.queued == 2
+    res.gate.set()
+    await asyncio.gather(first, mutation, query)
+    assert res.calls == ["get", "get", "post"]
+
+
+async def test_header_priority():
+    res = Resource()
+    priority = header_priority("x-priority", {"high": 0, "low": 2}, default=1)
+    app = Application(res, admission=AdmissionController(limit=1, queue=2, priority=priority))
+    first = asyncio.create_task(app.handle(_request()))
+    await asyncio.sleep(0)
+    low = asyncio.create_task(app.handle(_request(**{"x-priority": "low"})))
+    await asyncio.sleep(0)
+    high = asyncio.create_task(app.handle(_request("POST", **{"x-priority": "high"})))
+    await asyncio.sleep(0)
+    res.gate.set()
+    await asyncio.gather(first, low, high)
+    assert res.calls == ["get", "post", "get"]
+
+
+async def test_operation_limit():
+    res = Resource()
+    limits = {f"{Resource.__module__}.{Resource.__qualname__}.get": 1}
+    app = Application(res, admission=AdmissionController(limits=limits))
+    first = asyncio.create_task(app.handle(_request()))
+    await asyncio.sleep(0)
+    assert (await app.handle(_request())).status == ServiceUnavailableError.status
+    post = asyncio.create_task(app.handle(_request("POST")))
+    await asyncio.sleep(0)
+    assert res.calls == ["get", "post"]
+    res.gate.set()
+    await asyncio.gather(first, post)
+
+
+async def test_gauges():
+    res = Resource()
+    monitor = fondat.monitoring.DequeMonitor()
+    fondat.monitoring.monitors.append(monitor)
+    try:
+        app = Application(res, admission=AdmissionController(limit=1, queue=1))
+        first = asyncio.create_task(app.handle(_request()))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(app.handle(_request()))
+        await asyncio.sleep(0)
+        res.gate.set()
+        await asyncio.gather(first, second)
+    finally:
+        fondat.monitoring.monitors.remove(monitor)
+    names = {m.tags["name"] for m in monitor.deque}
+    assert {"admission_queue_depth", "admission_wait_seconds"} <= names
@@ -6,10 +6,11 @@ import multidict
 from dataclasses import dataclass
 from fondat.asgi import asgi_app
 from fondat.codec import get_codec
+from fondat.file import FileStream
 from fondat.resource import resource, operation
 from fondat.http import InBody, Request, Response
 from fondat.types import Stream, BytesStream  # , dataclass
-from typing import Annotated, Any, Optional
+from typing import Annotated, Any, AsyncIterator, Optional
 
 
 pytestmark = pytest.mark.asyncio
@@ -224,3 +225,185 @@ async def test_cookie():
     await asgi_app(app)(scope, Receive(), send)
     headers = dict(send.response["headers"])
     assert headers[b"set-cookie"] == b"x=y"
+
+
+async def test_request_cookie_and_query():
+    @resource
+    class Resource:
+        @operation
+        async def get(self, a: int) -> str:
+            return str(a)
+
+    async def filter(request):
+        assert request.cookies["x"].value == "y"
+        assert "cookie" not in request.headers
+        assert request.headers["Content-Type"] == "text/plain"
+        yield
+
+    app = fondat.http.Application(root=Resource(), filters=[filter])
+    scope = {
+        **_scope(method="GET", path="/"),
+        "headers": ((b"Content-Type", b"text/plain"), (b"cookie", b"x=y")),
+        "query_string": b"a=12",
+    }
+    send = Send()
+    await asgi_app(app)(scope, Receive(), send)
+    assert send.response["status"] == http.HTTPStatus.OK.value
+    assert send.body == b"12"
+
+
+class Chunks(Stream):
+    def __init__(self, chunks):
+        super().__init__()
+        self.chunks = iter(chunks)
+
+    async def __anext__(self):
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class SendLog(Send):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    async def __call__(self, msg: dict[str, Any]):
+        self.messages.append(msg)
+        await super().__call__(msg)
+
+
+async def test_single_chunk_one_send():
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> Stream:
+            return BytesStream(b"abc")
+
+    send = SendLog()
+    await asgi_app(fondat.http.Application(Resource()))(_scope(method="GET"), Receive(), send)
+    bodies = [m for m in send.messages if m["type"] == "http.response.body"]
+    assert bodies == [{"type": "http.response.body", "body": b"abc", "more_body": False}]
+
+
+async def test_coalesce_chunks():
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> Stream:
+            return Chunks([b"a"] * 10 + [b"bbbbbb"] + [b"c"] * 3)
+
+    send = SendLog()
+    app = asgi_app(fondat.http.Application(Resource()), buffer_size=5)
+    await app(_scope(method="GET"), Receive(), send)
+    bodies = [m for m in send.messages if m["type"] == "http.response.body"]
+    assert [m["body"] for m in bodies] == [b"aaaaa", b"aaaaa", b"bbbbbb", b"ccc"]
+    assert [m["more_body"] for m in bodies] == [True, True, True, False]
+    assert send.body == b"a" * 10 + b"bbbbbb" + b"ccc"
+
+
+async def test_multiple_cookies():
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> str:
+            return "foo"
+
+    async def filter(request):
+        response = yield
+        response.cookies["x"] = "y"
+        response.cookies["z"] = "w"
+        response.cookies["z"]["path"] = "/"
+        yield response
+
+    app = fondat.http.Application(root=Resource(), filters=[filter])
+    send = Send()
+    await asgi_app(app)(_scope(method="GET"), Receive(), send)
+    cookies = [v for k, v in send.response["headers"] if k == b"set-cookie"]
+    assert cookies == [b"x=y", b"z=w; Path=/"]
+
+
+def _file_app(path):
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> Stream:
+            return FileStream(path)
+
+    return asgi_app(fondat.http.Application(Resource()))
+
+
+async def test_file_pathsend(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"content")
+    send = SendLog()
+    scope = {**_scope(method="GET"), "extensions": {"http.response.pathsend": {}}}
+    await _file_app(path)(scope, Receive(), send)
+    assert dict(send.response["headers"])[b"content-length"] == b"7"
+    assert send.messages[-1] == {"type": "http.response.pathsend", "path": str(path)}
+
+
+async def test_file_zerocopysend(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"content")
+    send = SendLog()
+    scope = {**_scope(method="GET"), "extensions": {"http.response.zerocopysend": {}}}
+    await _file_app(path)(scope, Receive(), send)
+    message = send.messages[-1]
+    assert message["type"] == "http.response.zerocopysend"
+    assert message["file"].name == str(path)
+    assert (message["offset"], message["count"]) == (0, 7)
+
+
+async def test_file_no_extension(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"content")
+    send = Send()
+    await _file_app(path)(_scope(method="GET"), Receive(), send)
+    assert send.body == b"content"
+
+
+async def test_flush_stream():
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> AsyncIterator[int]:
+            async def events():
+                for n in range(3):
+                    yield n
+
+            return events()
+
+    send = SendLog()
+    await asgi_app(fondat.http.Application(Resource()))(_scope(method="GET"), Receive(), send)
+    bodies = [m["body"] for m in send.messages if m["type"] == "http.response.body"]
+    assert bodies == [b"data: 0\n\n", b"data: 1\n\n", b"data: 2\n\n", b""]
+
+
+async def test_stream_closed_on_send_error():
+    closed = []
+
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> AsyncIterator[int]:
+            async def events():
+                try:
+                    for n in range(3):
+                        yield n
+                finally:
+                    closed.append(True)
+
+            return events()
+
+    class FailingSend(Send):
+        async def __call__(self, msg: dict[str, Any]):
+            if msg["type"] == "http.response.body":
+                raise OSError("connection lost")
+            await super().__call__(msg)
+
+    app = asgi_app(fondat.http.Application(Resource()))
+    with pytest.raises(OSError):
+        await app(_scope(method="GET"), Receive(), FailingSend())
+    assert closed == [True]
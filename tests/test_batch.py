@@ -0,0 +1,153 @@
+import pytest
+
+import asyncio
+import fondat.context as context
+import fondat.resource
+import http
+import json
+
+from dataclasses import dataclass
+from fondat.admission import AdmissionController
+from fondat.batch import batch_resource
+from fondat.error import UnauthorizedError
+from fondat.http import Application, HeaderSecurityScheme, InBody, Request
+from fondat.resource import resource, operation, container_resource
+from fondat.security import ContextSecurityRequirement
+from fondat.types import BytesStream
+from typing import Annotated
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@dataclass
+class Model:
+    a: int
+    b: str
+
+
+@resource
+class Items:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    @operation
+    async def get(self, key: int) -> Model:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return Model(a=key, b=str(context.last(context="fondat.batch")["index"]))
+
+    @operation
+    async def post(self, value: Annotated[Model, InBody]) -> str:
+        return value.b
+
+
+@resource
+class Secret:
+    @operation(security=[ContextSecurityRequirement(context="auth")])
+    async def get(self) -> str:
+        return "secret"
+
+
+def _app(**kwargs):
+    items = Items()
+    root = container_resource({"items": items, "secret": Secret()})
+    application = Application(root)
+    root.batch = batch_resource(application, **kwargs)
+    return application, items
+
+
+async def _post(application, batch):
+    request = Request(
+        method="POST", path="/batch", body=BytesStream(json.dumps(batch).encode())
+    )
+    response = await application.handle(request)
+    assert response.status == http.HTTPStatus.OK.value
+    return json.loads(b"".join([b async for b in response.body]))
+
+
+async def test_batch():
+    application, _ = _app()
+    results = await _post(
+        application,
+        [
+            {"method": "get", "path": "/items", "query": {"key": "1"}},
+            {"method": "post", "path": "/items", "body": {"a": 2, "b": "two"}},
+            {"method": "get", "path": "/nothing"},
+        ],
+    )
+    assert results[0]["status"] == http.HTTPStatus.OK.value
+    assert results[0]["body"] == {"a": 1, "b": "0"}
+    assert results[1]["body"] == "two"
+    assert results[2]["status"] == http.HTTPStatus.NOT_FOUND.value
+
+
+async def test_batch_parallelism():
+    application, items = _app(parallelism=2)
+    batch = [{"method": "get", "path": "/items", "query": {"key": str(n)}} for n in range(6)]
+    results = await _post(application, batch)
+    assert [r["body"]["a"] for r in results] == list(range(6))
+    assert items.peak == 2
+
+
+async def test_batch_size():
+    application, _ = _app(size=1)
+    batch = [{"method": "get", "path": "/items", "query": {"key": "1"}}] * 2
+    request = Request(
+        method="POST", path="/batch", body=BytesStream(json.dumps(batch).encode())
+    )
+    response = await application.handle(request)
+    assert response.status == http.HTTPStatus.BAD_REQUEST.value
+
+
+async def test_batch_security():
+    application, _ = _app()
+    batch = [{"method": "get", "path": "/secret"}]
+    assert (await _post(application, batch))[0]["status"] == UnauthorizedError.status
+    with context.push(context="auth"):
+        results = await _post(application, batch)
+    assert results[0]["status"] == http.HTTPStatus.OK.value
+    assert results[0]["body"] == "secret"
+
+
+async def test_batch_admission():
+    items = Items()
+    root = container_resource({"items": items})
+    limits = {f"{Items.__module__}.{Items.__qualname__}.get": 1}
+    application = Application(root, admission=AdmissionController(limits=limits, queue=10))
+    root.batch = batch_resource(application, parallelism=4)
+    batch = [{"method": "get", "path": "/items", "query": {"key": str(n)}} for n in range(4)]
+    results = await _post(application, batch)
+    assert [r["status"] for r in results] == [http.HTTPStatus.OK.value] * 4
+    assert items.peak == 1
+
+
+async def test_batch_sub_request_authentication():
+    class Scheme(HeaderSecurityScheme):
+        async def authenticate(self, header):
+            return {"context": "auth"} if header == "valid" else None
+
+    root = container_resource({"secret": Secret()})
+    application = Application(root, filters=[Scheme("key", "X-Key").filter])
+    root.batch = batch_resource(application)
+    batch = [
+        {"method": "get", "path": "/secret", "headers": {"X-Key": "valid"}},
+        {"method": "get", "path": "/secret", "headers": {"X-Key": "invalid"}},
+        {"method": "get", "path": "/secret"},
+    ]
+    results = await _post(application, batch)
+    assert results[0]["status"] == http.HTTPStatus.OK.value
+    assert results[1]["status"] == UnauthorizedError.status
+    assert results[2]["status"] == UnauthorizedError.status
+
+
+async def test_batch_trust_internal(monkeypatch):
+    monkeypatch.setattr(fondat.resource, "trust_internal", True)
+    application, _ = _app()
+    response = await application.handle(Request(method="GET", path="/secret"))
+    assert response.status == UnauthorizedError.status
+    results = await _post(application, [{"method": "get", "path": "/secret"}])
+    assert results[0]["status"] == UnauthorizedError.status
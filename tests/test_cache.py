@@ -0,0 +1,251 @@
+import asyncio
+import fondat.cache
+import fondat.context as context
+import fondat.monitoring as monitoring
+import pytest
+
+from dataclasses import dataclass
+from fondat.cache import Entry, LRUStorage, ResourceStorage, cached
+from fondat.memory import memory_resource
+from fondat.resource import mutation, operation, resource
+from time import sleep
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@dataclass
+class DC:
+    key: str
+    calls: int
+
+
+def _container(**kwargs):
+    @resource
+    class Item:
+        def __init__(self, container, key: str):
+            self.container = container
+            self.key = key
+
+        @operation
+        @cached(**kwargs)
+        async def get(self, suffix: str = "") -> DC:
+            self.container.log.append(self.key)
+            return DC(self.key + suffix, self.container.calls)
+
+        @operation
+        async def put(self, value: str) -> None:
+            pass
+
+    @resource
+    class Container:
+        def __init__(self):
+            self.log = []  # not part of resource identity
+
+        @property
+        def calls(self):
+            return len(self.log)
+
+        def __getitem__(self, key: str) -> Item:
+            return Item(self, key)
+
+        @operation
+        @cached(**kwargs)
+        async def get(self) -> list[str]:
+            self.log.append(None)
+            return ["a", "b"]
+
+        @mutation
+        async def clear(self) -> None:
+            pass
+
+    return Container()
+
+
+async def test_hit():
+    c = _container(ttl=60)
+    assert await c["a"].get() == DC("a", 1)
+    assert await c["a"].get() == DC("a", 1)
+    assert await c["a"].get(suffix="x") == DC("ax", 2)
+    assert await c["b"].get() == DC("b", 3)
+    assert c.calls == 3
+
+
+async def test_result_not_aliased():
+    c = _container(ttl=60)
+    r1 = await c["a"].get()
+    r1.calls = 99
+    assert await c["a"].get() == DC("a", 1)
+
+
+async def test_expire():
+    c = _container(ttl=0.01)
+    await c["a"].get()
+    sleep(0.02)
+    assert await c["a"].get() == DC("a", 2)
+
+
+async def test_stale_while_revalidate():
+    c = _container(ttl=0.01, stale=60)
+    await c["a"].get()
+    sleep(0.02)
+    assert await c["a"].get() == DC("a", 1)  # stale; refreshed in background
+    await asyncio.sleep(0.01)
+    assert c.calls == 2
+    assert await c["a"].get() == DC("a", 2)
+
+
+async def test_invalidate_item():
+    c = _container(ttl=60)
+    await c.get()
+    await c["a"].get()
+    await c["b"].get()
+    await c["a"].put("x")
+    await c.get()
+    await c["a"].get()
+    await c["b"].get()
+    assert c.calls == 6
+
+
+async def test_invalidate_container():
+    c = _container(ttl=60)
+    await c["a"].get()
+    await c.clear()
+    assert await c["a"].get() == DC("a", 2)
+
+
+async def test_instances_separate():
+    c1 = _container(ttl=60)
+    c2 = type(c1)()
+    await c1.get()
+    await c2.get()
+    assert c1.calls == 1
+    assert c2.calls == 1
+
+
+async def test_principal():
+    c = _container(ttl=60, principal="test.principal")
+    with context.push(context="test.principal", id="alice"):
+        assert await c["a"].get() == DC("a", 1)
+        assert await c["a"].get() == DC("a", 1)
+    with context.push(context="test.principal", id="bob"):
+        assert await c["a"].get() == DC("a", 2)
+
+
+async def test_lru_size():
+    storage = LRUStorage(size=1)
+    c = _container(ttl=60, storage=storage)
+    await c["a"].get()
+    await c["b"].get()
+    await c["a"].get()
+    assert c.calls == 3
+    assert len(storage) == 1
+
+
+async def test_lru_bytes():
+    storage = LRUStorage(bytes=10)
+    await storage.put("a", Entry(b"12345", 0, 0))
+    await storage.put("b", Entry(b"12345", 0, 0))
+    await storage.put("c", Entry(b"1", 0, 0))
+    assert await storage.get("a") is None
+    assert await storage.get("b") is not None
+    assert len(storage) == 2
+
+
+async def test_resource_storage():
+    storage = ResourceStorage(memory_resource(key_type=str, value_type=Entry))
+    c = _container(ttl=60, storage=storage)
+    assert await c["a"].get() == DC("a", 1)
+    assert await c["a"].get() == DC("a", 1)
+    assert len(await storage.resource.get()) == 1
+
+
+async def test_monitoring():
+    c = _container(ttl=60)
+    measurements = []
+    monitor = monitoring.DequeMonitor(deque=measurements)
+    monitoring.monitors.append(monitor)
+    try:
+        await c["a"].get()
+        await c["a"].get()
+    finally:
+        monitoring.monitors.remove(monitor)
+    results = [m.tags["result"] for m in measurements if m.tags["name"] == "operation_cache"]
+    assert results == ["miss", "hit"]
+
+
+async def test_backing_data_not_shared():
+    @resource
+    class Users:
+        def __init__(self, users: dict, name: str):
+            self.users = users
+            self.name = name
+
+        @operation
+        @cached(ttl=60)
+        async def get(self) -> list[str]:
+            return list(self.users)
+
+    alice = Users({"alice": 1}, "users")
+    mallory = Users({"mallory": 1}, "users")
+    assert await alice.get() == ["alice"]
+    assert await mallory.get() == ["mallory"]
+    assert await alice.get() == ["alice"]
+
+
+async def test_stale_refresh_task_referenced():
+    c = _container(ttl=0.01, stale=60)
+    await c["a"].get()
+    sleep(0.02)
+    tasks = set(fondat.cache._tasks)
+    await c["a"].get()
+    (task,) = fondat.cache._tasks - tasks
+    await task
+    await asyncio.sleep(0)  # done callback
+    assert task not in fondat.cache._tasks
+
+
+async def test_slotted_mutation_not_cached():
+    @resource
+    class Slotted:
+        __slots__ = ("value",)
+
+        def __init__(self):
+            self.value = None
+
+        @mutation
+        async def set(self, value: str) -> None:
+            self.value = value
+
+    await _container(ttl=60).get()  # cached results exist for other classes
+    mutations = dict(fondat.cache._mutations)
+    s = Slotted()
+    await s.set("a")
+    assert s.value == "a"
+    assert fondat.cache._mutations == mutations  # not invalidated
+
+
+async def test_slotted_cached():
+    @resource
+    class Slotted:
+        __slots__ = ("calls", "__weakref__")
+
+        def __init__(self):
+            self.calls = 0
+
+        @operation
+        @cached(ttl=60)
+        async def get(self) -> int:
+            self.calls += 1
+            return self.calls
+
+        @mutation
+        async def clear(self) -> None:
+            pass
+
+    s1, s2 = Slotted(), Slotted()
+    assert await s1.get() == 1
+    assert await s1.get() == 1
+    assert await s2.get() == 1
+    await s1.clear()
+    assert await s1.get() == 2
@@ -3,6 +3,7 @@ import fondat.context as context
 import concurrent.futures
 import pytest
 import time
+import uuid
 
 
 def count(iterable):
@@ -69,3 +70,46 @@ def test_coroutine_isolation():
         assert count(context.find()) == 0
 
     asyncio.run(run())
+
+
+def test_indexed_lookup():
+    with context.push(context="a", n=1):
+        with context.push(context="b", n=2):
+            with context.push(context="a", n=3):
+                with context.push(context="a", n=4, x=True):
+                    assert context.last(context="a")["n"] == 4
+                    assert context.first(context="a")["n"] == 1
+                    assert context.last(context="b")["n"] == 2
+                    assert context.first(context="b")["n"] == 2
+                    assert [v["n"] for v in context.find(context="a")] == [4, 3, 1]
+                    assert context.last(context="a", n=3)["n"] == 3
+                    assert context.first(context="a", x=True)["n"] == 4
+                    assert context.last(n=2)["context"] == "b"
+                    assert context.last(context="c") is None
+                    assert context.first(context="c") is None
+            assert context.last(context="a")["n"] == 1
+    assert context.last(context="a") is None
+    assert context.first(context="a") is None
+
+
+def test_root_lazy():
+    with context.push(context="a"):
+        root = context.first(context="fondat.root")
+        assert not root._generated
+        assert isinstance(root["id"], uuid.UUID)
+        assert root["time"] is not None
+        assert dict(root)["id"] == root["id"]
+
+
+def test_indexed_lookup_deep():
+    contexts = [f"c{n % 13 // 2}" for n in range(100)]
+    stack = None
+    for n, ctx in enumerate(contexts):
+        stack = context._Element({"context": ctx, "n": n}, stack)
+        for c in set(contexts[: n + 1]):
+            expected = [v for v in stack if v["context"] == c]
+            assert [v for v in context._find(stack, {"context": c})] == expected
+            assert stack._first[c]._value == expected[-1]
+        assert len(stack._below) <= 7  # bounded by contexts, not depth
+        if ctx == contexts[n - 1]:
+            assert stack._below is stack._prev._below  # shared, not copied
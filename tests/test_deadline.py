@@ -0,0 +1,134 @@
+import pytest
+
+import asyncio
+import fondat.deadline
+import fondat.sql as sql
+import fondat.sqlite as sqlite
+import http
+import tempfile
+import time
+
+from fondat.asgi import asgi_app
+from fondat.error import GatewayTimeoutError
+from fondat.http import Application, Request
+from fondat.resource import resource, operation
+from typing import TypedDict
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@resource
+class Slow:
+    def __init__(self, delay: float = 1.0):
+        self.delay = delay
+        self.cancelled = False
+
+    @operation
+    async def get(self) -> str:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "done"
+
+
+def test_push_earlier_retained():
+    with fondat.deadline.push(10):
+        outer = fondat.deadline.get()
+        with fondat.deadline.push(20):
+            assert fondat.deadline.get() == outer
+        with fondat.deadline.push(1):
+            assert fondat.deadline.get() < outer
+    assert fondat.deadline.get() is None
+
+
+async def test_operation_cancelled():
+    slow = Slow()
+    with fondat.deadline.push(0.01):
+        with pytest.raises(GatewayTimeoutError):
+            await slow.get()
+    assert slow.cancelled
+
+
+async def test_operation_within_deadline():
+    with fondat.deadline.push(1):
+        assert await Slow(0.0).get() == "done"
+
+
+async def test_application_default_timeout():
+    app = Application(Slow(), timeout=0.01)
+    response = await app.handle(Request(method="GET", path="/"))
+    assert response.status == http.HTTPStatus.GATEWAY_TIMEOUT.value
+
+
+async def test_application_timeout_header():
+    app = Application(Slow(), timeout=10, timeout_header="Request-Timeout")
+    request = Request(method="GET", path="/")
+    request.headers["Request-Timeout"] = "0.01"
+    response = await app.handle(request)
+    assert response.status == http.HTTPStatus.GATEWAY_TIMEOUT.value
+
+
+async def test_asgi_disconnect_cancels():
+    slow = Slow()
+    events = [
+        {"type": "http.request", "body": b"", "more_body": False},
+        {"type": "http.disconnect"},
+    ]
+
+    async def receive():
+        event = events.pop(0)
+        if event["type"] == "http.disconnect":
+            await asyncio.sleep(0.01)
+        return event
+
+    async def send(message):
+        raise AssertionError("no response expected")
+
+    scope = dict(
+        type="http", http_version="1.1", method="GET", path="/", headers=(), query_string=b""
+    )
+    await asgi_app(Application(slow))(scope, receive, send)
+    assert slow.cancelled
+
+
+async def test_sqlite_interrupt():
+    Row = TypedDict("Row", {"n": int})
+    with tempfile.TemporaryDirectory() as dir:
+        database = sqlite.Database(f"{dir}/test.db")
+        stmt = sql.Statement()
+        stmt.text(
+            "WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c) "
+            "SELECT max(n) AS n FROM c;"
+        )
+        stmt.result = Row
+        begin = time.monotonic()
+        with fondat.deadline.push(0.05):
+            with pytest.raises(GatewayTimeoutError):
+                async with database.transaction():
+                    results = await database.execute(stmt)
+                    await results.__anext__()
+        assert time.monotonic() - begin < 5
+
+
+async def test_sqlite_deadline_cleared():
+    Row = TypedDict("Row", {"n": int})
+    with tempfile.TemporaryDirectory() as dir:
+        database = sqlite.Database(f"{dir}/test.db")
+        stmt = sql.Statement()
+        stmt.text(
+            "WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c LIMIT 100000) "
+            "SELECT max(n) AS n FROM c;"
+        )
+        stmt.result = Row
+        async with database.transaction():
+            with fondat.deadline.push(0.05):
+                quick = sql.Statement()
+                quick.text("SELECT 1 AS n;")
+                quick.result = Row
+                await database.execute(quick)
+            await asyncio.sleep(0.1)  # prior deadline has passed
+            results = await database.execute(stmt)
+            assert (await results.__anext__())["n"] == 100000
@@ -0,0 +1,106 @@
+import asyncio
+import concurrent.futures
+import fondat.context as context
+import fondat.executor
+import fondat.monitoring as monitoring
+import pytest
+import threading
+import time
+
+from fondat.resource import operation, resource
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@resource
+class Resource:
+    def __init__(self, value: int = 1):
+        self.value = value
+
+    @operation(executor="thread")
+    def get(self, wait: float = 0) -> dict:
+        time.sleep(wait)
+        ctx = context.last(context="test")
+        return {"thread": threading.get_ident(), "test": ctx and ctx["value"]}
+
+    @operation(executor="process")
+    def post(self, multiplier: int) -> int:
+        ctx = context.last(context="test")
+        return self.value * multiplier + (ctx["value"] if ctx else 0)
+
+    @operation(executor="thread")
+    async def patch(self) -> int:
+        await asyncio.sleep(0)
+        return threading.get_ident()
+
+
+async def test_thread():
+    with context.push(context="test", value=42):
+        result = await Resource().get()
+    assert result["thread"] != threading.get_ident()
+    assert result["test"] == 42
+
+
+async def test_thread_concurrent():
+    async def tick():
+        await asyncio.sleep(0.01)
+        return time.perf_counter()
+
+    begin = time.perf_counter()
+    _, ticked = await asyncio.gather(Resource().get(wait=0.1), tick())
+    assert ticked - begin < 0.09  # event loop not blocked
+
+
+async def test_thread_coroutine():
+    assert await Resource().patch() != threading.get_ident()
+
+
+async def test_process():
+    with context.push(context="test", value=1):
+        assert await Resource(value=3).post(multiplier=2) == 7
+
+
+async def test_executor_instance():
+    with concurrent.futures.ThreadPoolExecutor(1) as pool:
+
+        @resource
+        class R:
+            @operation(executor=pool)
+            def get(self) -> int:
+                return threading.get_ident()
+
+        assert await R().get() != threading.get_ident()
+
+
+async def test_validate_arguments():
+    with pytest.raises(TypeError):
+        await Resource().post(multiplier="2")
+
+
+async def test_unknown_executor():
+    with pytest.raises(ValueError):
+
+        @operation(executor="fiber")
+        def get(self) -> None:
+            pass
+
+
+async def test_sync_requires_executor():
+    with pytest.raises(TypeError):
+
+        @operation
+        def get(self) -> None:
+            pass
+
+
+async def test_monitoring():
+    measurements = []
+    monitor = monitoring.DequeMonitor(deque=measurements)
+    monitoring.monitors.append(monitor)
+    try:
+        await fondat.executor.run("thread", sum, [1, 2])
+    finally:
+        monitoring.monitors.remove(monitor)
+    names = {m.tags["name"] for m in measurements if m.tags.get("executor") == "thread"}
+    assert names == {"executor_wait_seconds", "executor_run_seconds"}
@@ -8,7 +8,7 @@ import zlib
 
 from dataclasses import make_dataclass
 from fondat.error import InternalServerError, NotFoundError
-from fondat.file import directory_resource, file_resource
+from fondat.file import FileStream, directory_resource, file_resource
 from fondat.pagination import paginate
 from fondat.resource import operation
 from fondat.types import Stream, BytesStream
@@ -232,3 +232,53 @@ async def test_content_length(tmp_path):
     resource = file_resource(path)
     stream = await resource.get()
     assert stream.content_length == file_size
+
+
+async def test_file_stream_range(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"0123456789")
+    stream = FileStream(path, offset=2, length=5, block_size=2)
+    assert stream.content_length == 5
+    assert stream.content_type == "text/plain"
+    assert [b async for b in stream] == [b"23", b"45", b"6"]
+    assert [b async for b in FileStream(path, offset=8)] == [b"89"]
+
+
+async def test_file_range_request(tmp_path):
+    from fondat.http import Application, Request
+
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"0123456789")
+    application = Application(file_resource(path))
+
+    async def get(**headers):
+        request = Request(method="GET", path="/")
+        for key, value in headers.items():
+            request.headers[key.replace("_", "-")] = value
+        response = await application.handle(request)
+        return response, b"".join([b async for b in response.body])
+
+    response, body = await get()
+    assert response.status == 200 and body == b"0123456789"
+    assert response.headers["Accept-Ranges"] == "bytes"
+    etag = response.headers["ETag"]
+    response, body = await get(Range="bytes=2-4")
+    assert response.status == 206 and body == b"234"
+    assert response.headers["Content-Range"] == "bytes 2-4/10"
+    assert response.headers["Content-Length"] == "3"
+    response, body = await get(Range="bytes=-3")
+    assert body == b"789"
+    response, body = await get(Range="bytes=20-")
+    assert response.status == 416
+    assert response.headers["Content-Range"] == "bytes */10"
+    response, body = await get(Range="bytes=0-1", If_Range='"stale"')
+    assert response.status == 200 and body == b"0123456789"
+    response, body = await get(Range="bytes=0-1", If_Range=etag)
+    assert response.status == 206 and body == b"01"
+    response, body = await get(Range="bytes=0-1,8-")
+    assert response.status == 206
+    boundary = response.headers["Content-Type"].split("boundary=")[1]
+    assert response.headers["Content-Length"] == str(len(body))
+    part = f"\r\n--{boundary}\r\nContent-Type: text/plain\r\nContent-Range: bytes "
+    expected = f"{part}0-1/10\r\n\r\n01{part}8-9/10\r\n\r\n89\r\n--{boundary}--\r\n"
+    assert body == expected.encode()
@@ -1,11 +1,12 @@
 import pytest
+import asyncio
 import http
 
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 from fondat.codec import Binary, get_codec
 from fondat.resource import resource, operation
 from fondat.http import Application, InBody, Request, Response
-from fondat.types import Stream, BytesStream
+from fondat.types import Stream, BytesStream, SpooledStream
 from dataclasses import dataclass
 
 
@@ -217,3 +218,258 @@ async def test_filter_return():
     request = Request(method="GET", path="/")
     response = await application.handle(request)
     assert response.status == http.HTTPStatus.FORBIDDEN.value
+
+
+def test_request_lazy_parse():
+    request = Request(
+        raw_headers=((b"Accept", b"text/plain"), (b"Cookie", b"a=b; c=d")),
+        raw_query=b"x=1&x=2&y=3",
+    )
+    assert request._headers is None and request._cookies is None and request._query is None
+    assert request.headers["accept"] == "text/plain"
+    assert "cookie" not in request.headers
+    assert {k: m.value for k, m in request.cookies.items()} == {"a": "b", "c": "d"}
+    assert request.query.getall("x") == ["1", "2"]
+    assert request.query["y"] == "3"
+
+
+def test_message_slots():
+    with pytest.raises(AttributeError):
+        Request().foo = "bar"
+    with pytest.raises(AttributeError):
+        Response().foo = "bar"
+
+
+class Chunks(Stream):
+    def __init__(self, chunks):
+        super().__init__()
+        self.chunks = iter(chunks)
+
+    async def __anext__(self):
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+async def test_max_body_size():
+    @resource
+    class Resource:
+        @operation
+        async def post(self, foo: Annotated[Stream, InBody]) -> BytesStream:
+            return BytesStream(b"".join([b async for b in foo]))
+
+    application = Application(Resource(), max_body_size=4)
+    request = Request(method="POST", path="/", body=BytesStream(b"abcdefg"))
+    response = await application.handle(request)
+    assert response.status == http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE.value
+    request = Request(method="POST", path="/", body=Chunks([b"abc", b"def"]))
+    response = await application.handle(request)
+    assert response.status == http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE.value
+    request = Request(method="POST", path="/", body=Chunks([b"ab", b"cd"]))
+    response = await application.handle(request)
+    assert await body(response) == b"abcd"
+
+
+async def test_in_body_limit():
+    @resource
+    class Resource:
+        @operation
+        async def post(self, foo: Annotated[str, InBody(limit=3)]) -> str:
+            return foo
+
+    application = Application(Resource())
+    request = Request(method="POST", path="/", body=Chunks([b"ab", b"cd"]))
+    response = await application.handle(request)
+    assert response.status == http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE.value
+
+
+async def test_in_body_spool():
+    received = []
+
+    @resource
+    class Resource:
+        @operation
+        async def post(self, foo: Annotated[Stream, InBody(spool=4)]) -> BytesStream:
+            received.append(foo)
+            return BytesStream(b"".join([b async for b in foo]))
+
+    application = Application(Resource())
+    request = Request(method="POST", path="/", body=Chunks([b"abc", b"def", b"g"]))
+    response = await application.handle(request)
+    assert await body(response) == b"abcdefg"
+    assert isinstance(received[0], SpooledStream)
+    assert received[0].content_length == 7
+    assert received[0]._file._rolled
+
+
+async def test_event_stream():
+    @dataclass
+    class Event:
+        n: int
+
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> AsyncIterator[Event]:
+            async def events():
+                for n in range(3):
+                    yield Event(n=n)
+
+            return events()
+
+    application = Application(Resource())
+    response = await application.handle(Request(method="GET", path="/"))
+    assert response.status == http.HTTPStatus.OK.value
+    assert response.headers["Content-Type"] == "text/event-stream"
+    assert response.body.flush
+    assert await body(response) == b'data: {"n":0}\n\ndata: {"n":1}\n\ndata: {"n":2}\n\n'
+    request = Request(method="GET", path="/")
+    request.headers["Accept"] = "application/x-ndjson"
+    response = await application.handle(request)
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert await body(response) == b'{"n":0}\n{"n":1}\n{"n":2}\n'
+
+
+async def test_event_stream_heartbeat():
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> AsyncIterator[str]:
+            async def events():
+                await asyncio.sleep(0.05)
+                yield "a"
+
+            return events()
+
+    application = Application(Resource(), heartbeat=0.01)
+    response = await application.handle(Request(method="GET", path="/"))
+    content = await body(response)
+    assert content.startswith(b":\n\n")
+    assert content.endswith(b':\n\ndata: "a"\n\n')
+
+
+async def test_event_stream_close():
+    closed = []
+
+    @resource
+    class Resource:
+        @operation
+        async def get(self, n: int) -> AsyncIterator[int]:
+            async def events():
+                try:
+                    yield n
+                    yield "not an int"
+                    await asyncio.sleep(60)
+                finally:
+                    closed.append(n)
+
+            return events()
+
+    application = Application(Resource(), heartbeat=0.01)
+    response = await application.handle(Request(method="GET", path="/", raw_query=b"n=1"))
+    assert await body(response) == b"data: 1\n\n"  # ended by invalid event
+    assert closed == [1]
+    response = await application.handle(Request(method="GET", path="/", raw_query=b"n=2"))
+    assert await response.body.__anext__() == b"data: 2\n\n"
+    await response.body.aclose()  # consumer stops early
+    assert closed == [1, 2]
+
+
+async def test_offload(monkeypatch):
+    import fondat.http
+    import fondat.monitoring
+
+    monkeypatch.setattr(fondat.http, "offload_size", 8)
+    monkeypatch.setattr(fondat.http, "offload_items", 3)
+
+    @resource
+    class Resource:
+        @operation
+        async def post(self, val: Annotated[list[int], InBody]) -> list[int]:
+            return val
+
+    measurements = []
+    monitor = fondat.monitoring.DequeMonitor(deque=measurements)
+    fondat.monitoring.monitors.append(monitor)
+    try:
+        application = Application(Resource())
+        request = Request(method="POST", path="/", body=BytesStream(b"[1,2,3,4]"))
+        request.headers["Content-Type"] = "application/json"
+        request.headers["Accept"] = "application/json"
+        response = await application.handle(request)
+    finally:
+        fondat.monitoring.monitors.remove(monitor)
+    assert response.status == http.HTTPStatus.OK.value
+    assert await body(response) == b"[1,2,3,4]"
+    names = [
+        m.tags["operation"] for m in measurements if m.tags["name"] == "http_offload_seconds"
+    ]
+    assert names == ["decode", "encode"]
+
+
+async def test_offload_dataclass(monkeypatch):
+    import fondat.http
+    import fondat.monitoring
+
+    monkeypatch.setattr(fondat.http, "offload_size", 1000)
+
+    @dataclass
+    class Document:
+        title: str
+        content: str
+
+    @resource
+    class Resource:
+        @operation
+        async def get(self) -> Document:
+            return Document(title="large", content="x" * 1000)
+
+    measurements = []
+    monitor = fondat.monitoring.DequeMonitor(deque=measurements)
+    fondat.monitoring.monitors.append(monitor)
+    try:
+        response = await Application(Resource()).handle(Request(method="GET", path="/"))
+    finally:
+        fondat.monitoring.monitors.remove(monitor)
+    assert response.status == http.HTTPStatus.OK.value
+    assert len(await body(response)) > 1000
+    names = [
+        m.tags["operation"] for m in measurements if m.tags["name"] == "http_offload_seconds"
+    ]
+    assert names == ["encode"]
+    assert not fondat.http._large(Document(title="small", content="x"))
+
+
+async def test_basic_auth_cache():
+    import base64
+    import fondat.context
+    import fondat.security
+
+    from fondat.http import HTTPBasicSecurityScheme
+
+    calls = []
+
+    class Scheme(HTTPBasicSecurityScheme):
+        async def authenticate(self, user_id, password):
+            calls.append(user_id)
+            if password == "secret":
+                return {"context": "auth", "user": user_id}
+
+    @resource
+    class Resource:
+        @operation(security=[fondat.security.ContextSecurityRequirement(context="auth")])
+        async def get(self) -> str:
+            return fondat.context.last(context="auth")["user"]
+
+    scheme = Scheme("basic", cache=fondat.security.AuthenticationCache())
+    application = Application(Resource(), filters=[scheme.filter])
+    for _ in range(2):
+        request = Request(method="GET", path="/")
+        request.headers["Authorization"] = "Basic " + base64.b64encode(b"joe:secret").decode()
+        response = await application.handle(request)
+        assert response.status == http.HTTPStatus.OK.value
+        assert await body(response) == b"joe"
+    assert calls == ["joe"]
+    response = await application.handle(Request(method="GET", path="/"))
+    assert response.status == http.HTTPStatus.UNAUTHORIZED.value
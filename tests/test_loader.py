@@ -0,0 +1,68 @@
+import asyncio
+import fondat.loader
+import pytest
+
+from fondat.error import NotFoundError
+from fondat.loader import Loader
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def _loader(**kwargs):
+    calls = []
+
+    async def batch(keys):
+        calls.append(keys)
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    return Loader(batch, **kwargs), calls
+
+
+async def test_batch():
+    loader, calls = _loader()
+    results = await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("a"))
+    assert results == ["A", "B", "A"]
+    assert calls == [["a", "b"]]
+
+
+async def test_sequential():
+    loader, calls = _loader()
+    assert await loader.load("a") == "A"
+    assert await loader.load("a") == "A"
+    assert calls == [["a"], ["a"]]
+
+
+async def test_max_batch():
+    loader, calls = _loader(max_batch=2)
+    assert await loader.load_many("abcde") == list("ABCDE")
+    assert calls == [["a", "b"], ["c", "d"], ["e"]]
+
+
+async def test_not_found():
+    loader, calls = _loader()
+    results = await asyncio.gather(
+        loader.load("a"), loader.load("missing"), return_exceptions=True
+    )
+    assert results[0] == "A"
+    assert isinstance(results[1], NotFoundError)
+
+
+async def test_batch_error():
+    async def batch(keys):
+        raise RuntimeError
+
+    loader = Loader(batch)
+    with pytest.raises(RuntimeError):
+        await loader.load_many(["a", "b"])
+
+
+async def test_scope_cache():
+    loader, calls = _loader()
+    with fondat.loader.scope():
+        assert await loader.load("a") == "A"
+        assert await loader.load("a") == "A"
+        assert await loader.load_many(["a", "b"]) == ["A", "B"]
+        loader.clear("a")
+        assert await loader.load("a") == "A"
+    assert calls == [["a"], ["b"], ["a"]]
@@ -244,3 +244,223 @@ async def test_timer():
     m = fondat.monitoring.DequeMonitor()
     async with fondat.monitoring.timer(tags=dict(foo="bar"), monitors=[m]):
         await asyncio.sleep(0.1)
+
+
+@pytest.mark.asyncio
+async def test_simple_ring_wraparound():
+    simple = fondat.monitoring.SimpleMonitor()
+    _type = "absolute"
+    simple.track("test", _type, _tags, 3, 60)
+    for minute in range(7):
+        await simple.record(
+            Measurement(_tags, _dt(f"2018-12-01T00:0{minute}:00Z"), _type, minute)
+        )
+    await simple.record(Measurement(_tags, _dt("2018-12-01T00:03:30Z"), _type, 1))  # too old
+    await simple.record(Measurement(_tags, _dt("2018-12-01T00:05:30Z"), _type, 1))
+    data = simple.series["test"].data
+    assert [dp.timestamp for dp in data] == [
+        _dt("2018-12-01T00:04:00Z"),
+        _dt("2018-12-01T00:05:00Z"),
+        _dt("2018-12-01T00:06:00Z"),
+    ]
+    assert [dp.value for dp in data] == [4, 6, 6]
+
+
+@pytest.mark.asyncio
+async def test_simple_monotonic_measurement():
+    simple = fondat.monitoring.SimpleMonitor()
+    simple.track("test", "gauge", _tags, 60, 60)
+    async with fondat.monitoring.timer(_tags, monitors=[simple], status=None, validate=False):
+        pass
+    data = simple.series["test"].data
+    assert len(data) == 1
+    assert data[0].count == 1
+    assert abs((_now() - data[0].timestamp).total_seconds()) <= 60
+
+
+@pytest.mark.asyncio
+async def test_simple_routing_index():
+    simple = fondat.monitoring.SimpleMonitor(routes=1)
+    simple.track("foo", "absolute", {"name": "foo"}, 60, 60)
+    simple.track("any", "absolute", {"name": ".+"}, 60, 60)
+    assert simple.route_hit_rate is None
+    for _ in range(3):
+        await simple.record(
+            Measurement({"name": "foo"}, _dt("2018-12-01T00:00:00Z"), "absolute", 1)
+        )
+    assert (simple.route_hits, simple.route_misses) == (2, 1)
+    await simple.record(
+        Measurement({"name": "bar"}, _dt("2018-12-01T00:00:00Z"), "absolute", 1)
+    )
+    await simple.record(
+        Measurement({"name": "foo"}, _dt("2018-12-01T00:00:00Z"), "absolute", 1)
+    )
+    assert (simple.route_hits, simple.route_misses) == (2, 3)  # evicted
+    assert simple.route_hit_rate == 0.4
+    assert simple.series["foo"].data[0].value == 4
+    assert simple.series["any"].data[0].value == 5
+    simple.untrack("foo")
+    await simple.record(
+        Measurement({"name": "foo"}, _dt("2018-12-01T00:00:00Z"), "absolute", 1)
+    )
+    assert simple.series["any"].data[0].value == 6
+
+
+def test_histogram_quantiles():
+    histogram = fondat.monitoring.Histogram(0, relative_error=0.01)
+    for n in range(1, 1001):
+        histogram.record(n / 1000)
+    assert histogram.count == 1000
+    assert histogram.min == 0.001
+    assert histogram.max == 1.0
+    for q in (0.5, 0.95, 0.99):
+        assert abs(histogram.quantile(q) - q) <= q * 0.02
+    assert histogram.quantile(0) == 0.001
+    assert histogram.quantile(1) == 1.0
+
+
+def test_histogram_merge():
+    h1 = fondat.monitoring.Histogram(0)
+    h2 = fondat.monitoring.Histogram(0)
+    for n in range(100):
+        h1.record(1)
+        h2.record(100)
+    h1.merge(h2)
+    assert h1.count == 200
+    assert abs(h1.quantile(0.25) - 1) <= 0.01
+    assert abs(h1.quantile(0.75) - 100) <= 1
+    with pytest.raises(ValueError):
+        h1.merge(fondat.monitoring.Histogram(0, relative_error=0.05))
+
+
+def test_histogram_bounded():
+    histogram = fondat.monitoring.Histogram(0, max_buckets=10)
+    for n in range(1, 10000):
+        histogram.record(n)
+    assert len(histogram._buckets) == 10
+    assert abs(histogram.quantile(0.99) - 9900) <= 9900 * 0.01
+
+
+@pytest.mark.asyncio
+async def test_simple_histogram_series():
+    simple = fondat.monitoring.SimpleMonitor()
+    simple.track("test", "histogram", _tags, 60, 60)
+    for n in range(100):
+        await simple.record(Measurement(_tags, _dt("2018-12-01T00:00:00Z"), "histogram", n))
+        await simple.record(
+            Measurement(_tags, _dt("2018-12-01T00:01:00Z"), "histogram", n + 100)
+        )
+    series = simple.series["test"]
+    assert len(series.data) == 2
+    assert abs(series.quantile(0.5) - 99.5) <= 2
+    assert abs(series.quantile(0.5, end=_dt("2018-12-01T00:01:00Z")) - 49.5) <= 1
+    async with fondat.monitoring.timer(_tags, monitors=[simple], status=None, type="histogram"):
+        pass
+    assert series.data[-1].count == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline():
+    simple = fondat.monitoring.SimpleMonitor()
+    simple.track("test", "absolute", _tags, 60, 60)
+    deque = fondat.monitoring.DequeMonitor()
+    pipeline = fondat.monitoring.Pipeline([simple, deque], batch=2, interval=0.01)
+    await pipeline.record(Measurement(_tags, _now(), "absolute", 1))
+    await pipeline.record_many([Measurement(_tags, _now(), "absolute", 2)] * 2)
+    pipeline.add(_tags, "absolute", 3)
+    assert len(deque.deque) == 0  # not recorded until drained
+    await asyncio.sleep(0.05)
+    assert len(deque.deque) == 4
+    assert simple.series["test"].data[-1].value == 8
+    await pipeline.stop()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_drop_oldest():
+    deque = fondat.monitoring.DequeMonitor()
+    pipeline = fondat.monitoring.Pipeline([deque], size=2, interval=60)
+    for n in range(5):
+        await pipeline.record(Measurement(_tags, _now(), "absolute", n))
+    await pipeline.stop()
+    assert pipeline.dropped == 3
+    values = [(m.tags["name"], m.value) for m in deque.deque]
+    assert values == [("test", 3), ("test", 4), ("monitoring_measurements_dropped", 3)]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_sample():
+    deque = fondat.monitoring.DequeMonitor()
+    pipeline = fondat.monitoring.Pipeline([deque], size=10, interval=60, overflow="sample")
+    for n in range(100):
+        await pipeline.record(Measurement(_tags, _now(), "absolute", n))
+    await pipeline.stop()
+    assert pipeline.dropped == 90
+    assert len(deque.deque) == 11  # sample and dropped count
+
+
+@pytest.mark.asyncio
+async def test_record_many_fallback():
+    class Monitor:
+        def __init__(self):
+            self.recorded = []
+
+        async def record(self, measurement):
+            self.recorded.append(measurement)
+
+    monitor = Monitor()
+    measurements = [Measurement(_tags, _now(), "absolute", n) for n in range(3)]
+    await fondat.monitoring.record_many(measurements, [monitor])
+    assert monitor.recorded == measurements
+
+
+@pytest.mark.asyncio
+async def test_simple_record_many_skips_invalid():
+    simple = fondat.monitoring.SimpleMonitor()
+    simple.track("test", "absolute", _tags, 60, 60)
+    await simple.record_many(
+        [
+            Measurement(_tags, _now(), "absolute", 1),
+            Measurement(_tags, _now(), "gauge", 10),  # type mismatch
+            Measurement(_tags, _now() + timedelta(hours=1), "absolute", 10),  # future
+            Measurement(_tags, _now(), "absolute", 2),
+        ]
+    )
+    assert sum(dp.value for dp in simple.series["test"].data) == 3
+
+
+@pytest.mark.asyncio
+async def test_add_pipeline(monkeypatch):
+    deque = fondat.monitoring.DequeMonitor()
+    pipeline = fondat.monitoring.Pipeline([deque], interval=60)
+    monkeypatch.setattr(fondat.monitoring, "monitors", [pipeline])
+    async with fondat.monitoring.timer(_tags):
+        pass
+    async with fondat.monitoring.counter(_tags):
+        pass
+    assert len(deque.deque) == 0  # buffered, not recorded inline
+    assert [type(item) for item in pipeline._buffer] == [tuple, tuple]
+    await pipeline.stop()
+    assert [m.type for m in deque.deque] == ["gauge", "counter"]
+    assert deque.deque[0].tags == {**_tags, "status": "success"}
+
+
+@pytest.mark.asyncio
+async def test_add_monitor():
+    deque = fondat.monitoring.DequeMonitor()
+    await fondat.monitoring.add(_tags, "absolute", 1, [deque])
+    (measurement,) = deque.deque
+    assert isinstance(measurement.timestamp, datetime)
+    assert measurement.value == 1
+
+
+@pytest.mark.asyncio
+async def test_series_latest_literals():
+    series = fondat.monitoring.Series("gauge", {"name": "test", "path": "/a/.*"}, 3, 60)
+    assert series.literals == {"name": "test"}
+    assert series.latest is None
+    start = _dt("2018-12-01T00:00:00Z")
+    for n in range(5):
+        tags = {"name": "test", "path": "/a/b"}
+        series.record(Measurement(tags, start + timedelta(seconds=n * 60), "gauge", n))
+    assert series.latest.timestamp == start + timedelta(seconds=240)
+    assert series.latest.max == 4
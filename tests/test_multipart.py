@@ -0,0 +1,114 @@
+import pytest
+
+import http
+
+from fondat.error import BadRequestError
+from fondat.file import directory_resource
+from fondat.http import Application, InPart, Request
+from fondat.multipart import MultipartReader, parse_params
+from fondat.resource import resource, operation
+from fondat.types import Stream
+from typing import Annotated
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class Chunks(Stream):
+    def __init__(self, content: bytes, size: int):
+        super().__init__()
+        self.chunks = [content[n : n + size] for n in range(0, len(content), size)]
+
+    async def __anext__(self):
+        if not self.chunks:
+            raise StopAsyncIteration
+        return self.chunks.pop(0)
+
+
+def _form(boundary: str, *parts: tuple[str, str, bytes]) -> bytes:
+    result = b"preamble\r\n"
+    for name, filename, content in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        result += (
+            f"--{boundary}\r\nContent-Disposition: {disposition}\r\n"
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        result += content + b"\r\n"
+    return result + f"--{boundary}--\r\n".encode()
+
+
+def test_parse_params():
+    assert parse_params('form-data; name="a"; filename="b \\"c\\""') == (
+        "form-data",
+        {"name": "a", "filename": 'b "c"'},
+    )
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+async def test_reader(size):
+    content = _form(
+        "xyz", ("a", None, b"one"), ("b", "b.bin", b"two\r\n--xy"), ("c", None, b"")
+    )
+    parts = []
+    async for part in MultipartReader(Chunks(content, size), "xyz"):
+        parts.append((part.name, part.filename, b"".join([c async for c in part])))
+    assert parts == [("a", None, b"one"), ("b", "b.bin", b"two\r\n--xy"), ("c", None, b"")]
+
+
+async def test_reader_skip_unread():
+    content = _form("xyz", ("a", None, b"x" * 100), ("b", None, b"two"))
+    names = [part.name async for part in MultipartReader(Chunks(content, 10), "xyz")]
+    assert names == ["a", "b"]
+
+
+async def test_reader_truncated():
+    content = _form("xyz", ("a", None, b"one"))[:-20]
+    with pytest.raises(BadRequestError):
+        async for part in MultipartReader(Chunks(content, 5), "xyz"):
+            async for _ in part:
+                pass
+
+
+async def test_in_part(tmp_path):
+    files = directory_resource(tmp_path, writeable=True)
+
+    @resource
+    class Resource:
+        @operation
+        async def post(
+            self,
+            count: Annotated[int, InPart("count")],
+            file: Annotated[Stream, InPart("file")],
+            title: Annotated[str, InPart("title")],
+        ) -> str:
+            await files[file.filename].put(file)
+            return f"{title}:{count}"
+
+    application = Application(Resource())
+    content = _form(
+        "b0und",
+        ("title", None, b"hello"),
+        ("file", "up.bin", b"\x00" * 1000),
+        ("count", None, b"3"),
+    )
+    request = Request(method="POST", path="/", body=Chunks(content, 64))
+    request.headers["Content-Type"] = "multipart/form-data; boundary=b0und"
+    response = await application.handle(request)
+    assert response.status == http.HTTPStatus.OK.value
+    assert b"".join([b async for b in response.body]) == b"hello:3"
+    assert (tmp_path / "up.bin").read_bytes() == b"\x00" * 1000
+
+
+async def test_in_part_not_multipart():
+    @resource
+    class Resource:
+        @operation
+        async def post(self, a: Annotated[str, InPart("a")]) -> str:
+            return a
+
+    request = Request(method="POST", path="/", body=Chunks(b"a=b", 10))
+    request.headers["Content-Type"] = "application/x-www-form-urlencoded"
+    response = await Application(Resource()).handle(request)
+    assert response.status == http.HTTPStatus.BAD_REQUEST.value
@@ -0,0 +1,124 @@
+import pytest
+
+import http
+import json
+
+from dataclasses import dataclass
+from fondat.error import NotAcceptableError, UnsupportedMediaTypeError
+from fondat.http import Application, InBody, Request
+from fondat.negotiation import media_codecs, select, select_content_type
+from fondat.resource import resource, operation
+from fondat.types import BytesStream
+from typing import Annotated
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@dataclass
+class DC:
+    a: int
+    b: str
+
+
+def test_media_codecs():
+    assert [c.media_type for c in media_codecs(str)] == ["text/plain", "application/json"]
+    assert [c.media_type for c in media_codecs(DC)] == ["application/json"]
+    assert [c.media_type for c in media_codecs(list[DC])] == [
+        "text/plain",
+        "application/json",
+        "text/csv",
+    ]
+
+
+def test_select():
+    assert select(int, None).media_type == "text/plain"
+    assert select(int, "application/json").media_type == "application/json"
+    assert select(int, "text/html, */*;q=0.8").media_type == "text/plain"
+    assert select(int, "text/*;q=0.5, application/json").media_type == "application/json"
+    with pytest.raises(NotAcceptableError):
+        select(int, "text/html")
+    with pytest.raises(NotAcceptableError):
+        select(int, "*/*;q=0")
+
+
+def test_select_content_type():
+    assert select_content_type(DC, None).media_type == "application/json"
+    assert select_content_type(list[int], "application/json").decode(b"[1]") == [1]
+    assert select_content_type(str, "application/json").decode(b'"x"') == '"x"'  # as is
+    assert select_content_type(bytes, "image/png").decode(b"x") == b"x"
+    with pytest.raises(UnsupportedMediaTypeError):
+        select_content_type(DC, "text/csv")
+
+
+def test_csv_round_trip():
+    codec = select(list[DC], "text/csv")
+    value = [DC(a=1, b="x,y"), DC(a=2, b="z")]
+    encoded = codec.encode(value)
+    assert encoded == b'a,b\r\n1,"x,y"\r\n2,z\r\n'
+    assert codec.decode(encoded) == value
+
+
+@resource
+class Resource:
+    @operation
+    async def get(self) -> list[DC]:
+        return [DC(a=1, b="one")]
+
+    @operation
+    async def post(self, value: Annotated[list[DC], InBody]) -> int:
+        return sum(v.a for v in value)
+
+    @operation
+    async def put(self, value: Annotated[str, InBody]) -> None:
+        pass
+
+    @operation
+    async def patch(self, value: Annotated[bytes, InBody]) -> None:
+        pass
+
+
+async def _handle(method, accept=None, content_type=None, body=None):
+    request = Request(method=method, path="/", body=BytesStream(body) if body else None)
+    if accept:
+        request.headers["Accept"] = accept
+    if content_type:
+        request.headers["Content-Type"] = content_type
+    response = await Application(Resource()).handle(request)
+    return response, b"".join([b async for b in response.body])
+
+
+async def test_application_accept():
+    response, body = await _handle("GET", accept="application/json")
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.headers["Vary"] == "Accept"
+    assert json.loads(body) == [{"a": 1, "b": "one"}]
+    response, body = await _handle("GET", accept="text/csv")
+    assert response.headers["Content-Type"] == "text/csv; charset=UTF-8"
+    assert body == b"a,b\r\n1,one\r\n"
+    response, _ = await _handle("GET", accept="image/png")
+    assert response.status == http.HTTPStatus.NOT_ACCEPTABLE.value
+
+
+async def test_application_content_type():
+    response, body = await _handle("POST", content_type="text/csv", body=b"a,b\n1,x\n2,y\n")
+    assert body == b"3"
+    response, body = await _handle(
+        "POST", content_type="application/json", body=b'[{"a":4,"b":"x"}]'
+    )
+    assert body == b"4"
+    response, _ = await _handle("POST", content_type="image/png", body=b"x")
+    assert response.status == http.HTTPStatus.UNSUPPORTED_MEDIA_TYPE.value
+
+
+async def test_application_content_type_raw():
+    response, _ = await _handle("PUT", content_type="application/json", body=b"not json")
+    assert response.status == http.HTTPStatus.NO_CONTENT.value
+    response, _ = await _handle("PATCH", content_type="image/png", body=b"\x89PNG")
+    assert response.status == http.HTTPStatus.NO_CONTENT.value
+
+
+async def test_application_json_error():
+    response, body = await _handle("POST", content_type="application/json", body=b"[")
+    assert response.status == http.HTTPStatus.BAD_REQUEST.value
+    assert b"Expecting value" in body
@@ -0,0 +1,104 @@
+import pytest
+
+import fondat.sql as sql
+import fondat.sqlite as sqlite
+import http
+import json
+import tempfile
+
+from dataclasses import dataclass
+from fondat.http import Application, Request
+from fondat.projection import parse_fields, projector, requested_fields
+from fondat.resource import resource, operation
+from typing import Optional
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@dataclass
+class Address:
+    city: str
+    country: str
+
+
+@dataclass
+class Person:
+    id: int
+    name: str
+    address: Optional[Address] = None
+    for_: Optional[str] = None
+
+
+def test_parse_fields():
+    assert parse_fields("a, b.c,b.d") == {"a": None, "b": {"c": None, "d": None}}
+    assert parse_fields("a,a.b") == {"a": None}
+    assert parse_fields("a.b,a") == {"a": None}
+    with pytest.raises(ValueError):
+        parse_fields("a..b")
+
+
+def test_projector():
+    people = [
+        Person(id=1, name="A", address=Address(city="X", country="Y"), for_="z"),
+        Person(id=2, name="B"),
+    ]
+    project = projector(list[Person], "id,address.city,for")
+    assert project(people) == [{"id": 1, "address": {"city": "X"}, "for": "z"}, {"id": 2}]
+    assert project([{"id": 3, "address": {"city": "W"}}]) == [
+        {"id": 3, "address": {"city": "W"}}
+    ]
+    with pytest.raises(ValueError):
+        projector(Person, "age")
+    with pytest.raises(ValueError):
+        projector(Person, "name.first")
+
+
+@dataclass
+class Row:
+    id: int
+    name: str
+    notes: str
+
+
+@resource
+class Rows:
+    def __init__(self, table):
+        self.table = table
+        self.columns = []
+
+    @operation
+    async def get(self) -> list[Row]:
+        columns = requested_fields()
+        self.columns.append(columns)
+        async with self.table.database.transaction():
+            results = await self.table.select(columns=columns, order=["id"])
+            return [row async for row in results]
+
+
+async def test_application_fields():
+    with tempfile.TemporaryDirectory() as dir:
+        table = sql.Table("rows", sqlite.Database(f"{dir}/test.db"), Row, "id")
+        await table.create()
+        async with table.database.transaction():
+            await table.insert(Row(id=1, name="one", notes="x" * 100))
+            await table.insert(Row(id=2, name="two", notes="y" * 100))
+        rows = Rows(table)
+        application = Application(rows)
+        request = Request(method="GET", path="/")
+        request.query["fields"] = "id,name"
+        response = await application.handle(request)
+        assert response.status == http.HTTPStatus.OK.value
+        assert response.headers["Content-Type"] == "application/json"
+        body = b"".join([b async for b in response.body])
+        assert json.loads(body) == [{"id": 1, "name": "one"}, {"id": 2, "name": "two"}]
+        assert rows.columns == [{"id", "name"}]
+        request = Request(method="GET", path="/")
+        request.query["fields"] = "nope"
+        response = await application.handle(request)
+        assert response.status == http.HTTPStatus.BAD_REQUEST.value
+        request = Request(method="GET", path="/")
+        request.query["fields"] = "id"
+        request.headers["Accept"] = "text/csv"
+        response = await application.handle(request)
+        assert response.status == http.HTTPStatus.NOT_ACCEPTABLE.value
@@ -0,0 +1,107 @@
+import pytest
+
+from datetime import datetime, timezone
+from fondat.http import Application, Request
+from fondat.monitoring import Measurement, SimpleMonitor
+from fondat.prometheus import Renderer, metrics_resource
+from fondat.resource import resource
+
+
+pytestmark = pytest.mark.asyncio
+
+
+_now = lambda: datetime.now(tz=timezone.utc)
+
+
+async def _record(monitor, tags, type, value):
+    await monitor.record(Measurement(tags, _now(), type, value))
+
+
+def _monitor():
+    monitor = SimpleMonitor()
+    monitor.track("requests", "counter", {"name": "requests"}, 60, 60)
+    monitor.track("errors", "absolute", {"name": "errors", "resource": "foo"}, 60, 60)
+    monitor.track("memory", "gauge", {"name": "memory"}, 60, 60)
+    monitor.track("duration", "histogram", {"name": "duration"}, 60, 60)
+    return monitor
+
+
+async def test_render_types():
+    monitor = _monitor()
+    await _record(monitor, {"name": "requests"}, "counter", 5)
+    await _record(monitor, {"name": "errors", "resource": "foo"}, "absolute", 2)
+    await _record(monitor, {"name": "memory"}, "gauge", 10)
+    await _record(monitor, {"name": "memory"}, "gauge", 20)
+    for n in range(1, 101):
+        await _record(monitor, {"name": "duration"}, "histogram", n / 100)
+    lines = Renderer(monitor).render().decode().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert "requests_total 5" in lines
+    assert 'errors_total{resource="foo"} 2' in lines
+    assert "# TYPE memory gauge" in lines
+    assert "memory 15.0" in lines
+    assert "memory_min 10" in lines
+    assert "memory_max 20" in lines
+    assert "# TYPE duration summary" in lines
+    assert "duration_count 100" in lines
+    values = dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+    assert abs(float(values["duration_sum"]) - 50.5) < 1e-9
+    assert abs(float(values['duration{quantile="0.5"}']) - 0.5) <= 0.01
+
+
+async def test_render_openmetrics():
+    monitor = _monitor()
+    await _record(monitor, {"name": "requests"}, "counter", 5)
+    text = Renderer(monitor).render(openmetrics=True).decode()
+    assert "# TYPE requests counter\nrequests_total 5\n" in text
+    assert text.endswith("# EOF\n")
+
+
+async def test_render_incremental():
+    monitor = _monitor()
+    renderer = Renderer(monitor)
+    tags = {"name": "errors", "resource": "foo"}
+    await _record(monitor, tags, "absolute", 2)
+    await _record(monitor, {"name": "memory"}, "gauge", 1)
+    first = renderer.render()
+    assert renderer.render() is first  # unchanged
+    memory = renderer._entries["memory"].render(False)
+    await _record(monitor, tags, "absolute", 3)
+    second = renderer.render()
+    assert second is not first
+    assert b'errors_total{resource="foo"} 5' in second
+    assert renderer._entries["memory"].render(False) is memory  # not rendered again
+    monitor.untrack("errors")
+    assert b"errors" not in renderer.render()
+
+
+async def test_absolute_total_monotonic():
+    monitor = SimpleMonitor()
+    monitor.track("errors", "absolute", {"name": "errors"}, 2, 1)
+    renderer = Renderer(monitor)
+    tags = {"name": "errors"}
+    for n, ts in enumerate((100, 101, 102, 103)):
+        await monitor.record(
+            Measurement(tags, datetime.fromtimestamp(ts, tz=timezone.utc), "absolute", 1)
+        )
+        assert f"errors_total {n + 1}\n".encode() in renderer.render()
+
+
+async def test_resource():
+    monitor = _monitor()
+    await _record(monitor, {"name": "requests"}, "counter", 1)
+
+    @resource
+    class Root:
+        metrics = metrics_resource(monitor)
+
+    application = Application(Root())
+    response = await application.handle(Request(method="GET", path="/metrics"))
+    assert response.status == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert b"requests_total 1" in b"".join([b async for b in response.body])
+    request = Request(method="GET", path="/metrics")
+    request.headers["Accept"] = "application/openmetrics-text; version=1.0.0"
+    response = await application.handle(request)
+    assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+    assert (b"".join([b async for b in response.body])).endswith(b"# EOF\n")
@@ -1,8 +1,13 @@
 import pytest
 
+import fondat.context
+import fondat.error
+import fondat.monitoring
 import fondat.resource
+import fondat.security
 
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from fondat.resource import resource, operation, query, mutation
 from fondat.types import Description
 from typing import Annotated, Optional
@@ -91,3 +96,55 @@ def test_nested_containers():
     assert fondat.resource.is_resource(c2.c1)
     assert fondat.resource.is_resource(c2.c1.r2)
     assert fondat.resource.is_operation(c2.c1.r2.get)
+
+
+@resource
+class Instrumented:
+    def __init__(self):
+        self.inner = Guarded()
+
+    @operation
+    async def get(self) -> str:
+        return await self.inner.get()
+
+
+@resource
+class Guarded:
+    @operation(security=[fondat.security.ContextSecurityRequirement(context="auth")])
+    async def get(self) -> str:
+        return "guarded"
+
+
+@pytest.fixture
+def deque_monitor():
+    monitor = fondat.monitoring.DequeMonitor()
+    fondat.monitoring.monitors.append(monitor)
+    yield monitor
+    fondat.monitoring.monitors.remove(monitor)
+
+
+async def test_operation_single_measurement(deque_monitor):
+    with fondat.context.push(context="auth"):
+        await Guarded().get()
+    assert len(deque_monitor.deque) == 1
+    measurement = deque_monitor.deque[0]
+    assert measurement.tags["name"] == "operation_duration_seconds"
+    assert measurement.tags["status"] == "success"
+    assert measurement.type == "gauge"
+    assert measurement.timestamp <= datetime.now(tz=timezone.utc)
+
+
+async def test_operation_sample_rate(deque_monitor, monkeypatch):
+    monkeypatch.setattr(fondat.resource, "sample_rate", 0.0)
+    with fondat.context.push(context="auth"):
+        await Guarded().get()
+    assert len(deque_monitor.deque) == 0
+
+
+async def test_operation_trust_internal(monkeypatch):
+    with pytest.raises(fondat.error.UnauthorizedError):
+        await Instrumented().get()
+    monkeypatch.setattr(fondat.resource, "trust_internal", True)
+    assert await Instrumented().get() == "guarded"
+    with pytest.raises(fondat.error.UnauthorizedError):
+        await Guarded().get()
@@ -40,3 +40,81 @@ async def test_security_req_forbidden():
     r1 = R1()
     with pytest.raises(UnauthorizedError):
         await r1.foo()
+
+
+class Counting(fondat.security.SecurityRequirement):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    async def authorize(self):
+        self.count += 1
+
+
+async def test_authorize_memoized():
+    counting = Counting()
+
+    @resource
+    class R2:
+        @mutation(security=[counting])
+        async def foo(self) -> None:
+            pass
+
+    r2 = R2()
+    with fondat.security.scope():
+        await r2.foo()
+        await r2.foo()
+    assert counting.count == 1
+    await r2.foo()
+    await r2.foo()
+    assert counting.count == 3
+
+
+async def test_authorize_not_memoized():
+    counting = Counting()
+    counting.memoize = False
+
+    @resource
+    class R3:
+        @mutation(security=[counting])
+        async def foo(self) -> None:
+            pass
+
+    with fondat.security.scope():
+        await R3().foo()
+        await R3().foo()
+    assert counting.count == 2
+
+
+async def test_authentication_cache():
+    calls = []
+
+    async def authenticate(user_id, password):
+        calls.append(user_id)
+        return {"context": "auth", "user": user_id} if password == "secret" else None
+
+    cache = fondat.security.AuthenticationCache(size=2)
+    auth = {"context": "auth", "user": "a"}
+    assert await cache.authenticate(authenticate, "a", "secret") == auth
+    assert await cache.authenticate(authenticate, "a", "secret") == auth
+    assert await cache.authenticate(authenticate, "a", "wrong") is None
+    assert await cache.authenticate(authenticate, "a", "wrong") is None
+    assert calls == ["a", "a", "a"]  # failures not cached
+    await cache.authenticate(authenticate, "b", "secret")
+    await cache.authenticate(authenticate, "c", "secret")
+    assert len(cache) == 2
+    await cache.authenticate(authenticate, "a", "secret")  # evicted
+    assert calls == ["a", "a", "a", "b", "c", "a"]
+
+
+async def test_authentication_cache_ttl():
+    calls = []
+
+    async def authenticate(token):
+        calls.append(token)
+        return {"context": "auth"}
+
+    cache = fondat.security.AuthenticationCache(ttl=0)
+    await cache.authenticate(authenticate, "t")
+    await cache.authenticate(authenticate, "t")
+    assert calls == ["t", "t"]
@@ -2,10 +2,12 @@ import dataclasses
 import pytest
 import fondat.sql as sql
 import fondat.sqlite as sqlite
+import sqlite3
 import tempfile
 
 from dataclasses import dataclass
-from datetime import date, datetime
+from datetime import date, datetime, timedelta, timezone
+from fondat.monitoring import Measurement
 from typing import Annotated, Optional, TypedDict
 from uuid import UUID, uuid4
 
@@ -148,3 +150,101 @@ async def test_index(table):
     index = sql.Index("foo_ix_str", table, ("str_",))
     await index.create()
     await index.drop()
+
+
+async def test_read_many(table):
+    rows = [
+        DC(uuid4(), f"row{n}", None, None, None, n, None, None, None, None, None)
+        for n in range(3)
+    ]
+    async with table.database.transaction():
+        for row in rows:
+            await table.insert(row)
+        missing = uuid4()
+        result = await table.read_many([rows[0].key, rows[2].key, rows[0].key, missing])
+    assert result == {rows[0].key: rows[0], rows[2].key: rows[2]}
+    assert await table.read_many([]) == {}
+
+
+def _ts(minutes: int) -> datetime:
+    return datetime(2021, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes)
+
+
+async def test_monitor_rollup(database):
+    monitor = sqlite.SQLiteMonitor(database, tiers={60: None, 3600: None, 86400: None})
+    tags = {"name": "duration"}
+    await monitor.record_many(
+        [Measurement(tags, _ts(m), "gauge", m) for m in range(0, 180, 30)]  # 0..150
+    )
+    minutes = await monitor.query(tags, _ts(0), _ts(180))
+    assert [dp.timestamp for dp in minutes] == [_ts(m) for m in range(0, 180, 30)]
+    hours = await monitor.query(tags, _ts(0), _ts(180), resolution=3600)
+    assert [(dp.min, dp.max, dp.sum, dp.count) for dp in hours] == [
+        (0, 30, 30, 2),
+        (60, 90, 150, 2),
+        (120, 150, 270, 2),
+    ]
+    day = await monitor.query(tags, _ts(0), _ts(1440), resolution=86400)
+    assert [(dp.min, dp.max, dp.count) for dp in day] == [(0, 150, 6)]
+    assert await monitor.query({"name": "other"}, _ts(0), _ts(180)) == []
+
+
+async def test_monitor_types(database):
+    monitor = sqlite.SQLiteMonitor(database, tiers={60: None, 3600: None})
+    await monitor.record(Measurement({"name": "c"}, _ts(0), "counter", 5))
+    await monitor.record(Measurement({"name": "c"}, _ts(1), "counter", 8))
+    await monitor.record(Measurement({"name": "a"}, _ts(0), "absolute", 2))
+    await monitor.record(Measurement({"name": "a"}, _ts(1), "absolute", 3))
+    (counter,) = await monitor.query({"name": "c"}, _ts(0), _ts(60), resolution=3600)
+    assert counter.value == 8
+    (absolute,) = await monitor.query({"name": "a"}, _ts(0), _ts(60), resolution=3600)
+    assert absolute.value == 5
+    assert len(await monitor.query({"name": "a"}, _ts(0), _ts(60))) == 2
+
+
+async def test_monitor_batch(database):
+    monitor = sqlite.SQLiteMonitor(database, batch=2, interval=3600)
+    tags = {"name": "requests"}
+    now = datetime.now(tz=timezone.utc)
+    await monitor.record(Measurement(tags, now, "absolute", 1))
+    assert monitor._pending  # buffered
+    await monitor.record(Measurement({"name": "errors"}, now, "absolute", 1))
+    assert not monitor._pending  # written in one transaction
+    await monitor.record(Measurement(tags, now, "absolute", 1))
+    (dp,) = await monitor.query(tags, now - timedelta(minutes=1), now + timedelta(minutes=1))
+    assert dp.value == 2
+
+
+async def test_monitor_retention(database):
+    monitor = sqlite.SQLiteMonitor(database, tiers={60: 3600, 3600: None})
+    tags = {"name": "requests"}
+    old = datetime.now(tz=timezone.utc) - timedelta(days=1)
+    await monitor.record(Measurement(tags, old, "absolute", 1))
+    start, end = old - timedelta(hours=1), old + timedelta(hours=1)
+    assert await monitor.query(tags, start, end) == []  # expired from minute tier
+    assert len(await monitor.query(tags, start, end, resolution=3600)) == 1
+
+
+async def test_monitor_resolution(database):
+    monitor = sqlite.SQLiteMonitor(database)
+    with pytest.raises(ValueError):
+        await monitor.query({"name": "x"}, _ts(0), _ts(60), resolution=90)
+
+
+async def test_monitor_write_failure(database, monkeypatch):
+    monitor = sqlite.SQLiteMonitor(database, batch=1000, interval=3600)
+    tags = {"name": "requests"}
+    now = datetime.now(tz=timezone.utc)
+    await monitor.record(Measurement(tags, now, "absolute", 1))
+    upsert = monitor._upsert
+
+    async def busy(table, rows):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(monitor, "_upsert", busy)
+    with pytest.raises(sqlite3.OperationalError):
+        await monitor.flush()
+    await monitor.record(Measurement(tags, now, "absolute", 2))
+    monkeypatch.setattr(monitor, "_upsert", upsert)
+    (dp,) = await monitor.query(tags, now - timedelta(minutes=1), now + timedelta(minutes=1))
+    assert dp.value == 3